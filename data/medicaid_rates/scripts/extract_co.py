@@ -1,45 +1,62 @@
 #!/usr/bin/env python3
 """Extract Colorado Medicaid rates from PDF."""
-import pdfplumber
 import csv
 import re
+import sys
+from pathlib import Path
 
-facilities = []
-
-with pdfplumber.open('CO_2025-26_rates.pdf') as pdf:
-    for page_num, page in enumerate(pdf.pages):
-        tables = page.extract_tables()
-
-        for table in tables:
-            for row in table:
-                # Skip header rows
-                if not row or row[0] == 'PFID' or not row[0]:
-                    continue
-
-                # Extract fields
-                pfid = row[0]
-                npi = row[1]
-                facility_name = row[2]
-
-                # Parse rate - handle dollar sign and commas
-                rate_str = row[5] if row[5] else ''
-                rate_str = rate_str.replace('$', '').replace(',', '').strip()
-
-                # Skip if no valid rate
-                if not rate_str or not pfid.isdigit():
-                    continue
-
-                try:
-                    daily_rate = float(rate_str)
-                    if daily_rate > 0:
-                        facilities.append({
-                            'pfid': pfid,
-                            'npi': npi,
-                            'facility_name': facility_name,
-                            'daily_rate': daily_rate
-                        })
-                except ValueError:
-                    continue
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "docker" / "scripts"))
+from parse_cache import cached_records
+
+SOURCE_FILE = 'CO_2025-26_rates.pdf'
+EXTRACTOR_VERSION = "1"  # Bump when the parsing below changes
+
+
+def parse_source():
+    """Parse the PDF into facility records (cached by file hash)."""
+    import pdfplumber  # Only needed on a cache miss
+
+    facilities = []
+
+    with pdfplumber.open(SOURCE_FILE) as pdf:
+        for page_num, page in enumerate(pdf.pages):
+            tables = page.extract_tables()
+
+            for table in tables:
+                for row in table:
+                    # Skip header rows
+                    if not row or row[0] == 'PFID' or not row[0]:
+                        continue
+
+                    # Extract fields
+                    pfid = row[0]
+                    npi = row[1]
+                    facility_name = row[2]
+
+                    # Parse rate - handle dollar sign and commas
+                    rate_str = row[5] if row[5] else ''
+                    rate_str = rate_str.replace('$', '').replace(',', '').strip()
+
+                    # Skip if no valid rate
+                    if not rate_str or not pfid.isdigit():
+                        continue
+
+                    try:
+                        daily_rate = float(rate_str)
+                        if daily_rate > 0:
+                            facilities.append({
+                                'pfid': pfid,
+                                'npi': npi,
+                                'facility_name': facility_name,
+                                'daily_rate': daily_rate
+                            })
+                    except ValueError:
+                        continue
+
+    return facilities
+
+
+facilities = cached_records(SOURCE_FILE, 'extract_co', EXTRACTOR_VERSION, parse_source)
 
 print(f"Extracted {len(facilities)} facilities")
 
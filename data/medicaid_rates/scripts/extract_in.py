@@ -2,46 +2,58 @@
 """Extract Indiana Medicaid rates from Excel file."""
 import pandas as pd
 import csv
+import sys
+from pathlib import Path
 
-# Read with header at row 11
-df = pd.read_excel('IN_2025-07_rates.xlsx', sheet_name='PI Prospective')
-
-# Find the header row
-header_idx = None
-for i in range(20):
-    if df.iloc[i, 0] == 'Provider Name':
-        header_idx = i
-        break
-
-# Re-read with correct header
-df = pd.read_excel('IN_2025-07_rates.xlsx', sheet_name='PI Prospective', skiprows=header_idx+1, header=None)
-df.columns = ['Provider Name', 'Provider Number', 'Chain Name', 'NSGO Entity', 'Cost Report End Date',
-              'County', 'Rate Effective Date', 'Organization Type', 'Capital Type', 'Medicare Cert.',
-              'Hosp. Based', 'CCRC', 'Unnamed', 'NF Beds', 'Occ. Percent', 'Medicaid Utiliz.',
-              'Fac. Avg. CMI', 'Medicaid CMI', 'Direct Care Comp.', 'Therapy Component',
-              'Indirect Care Comp.', 'Admin Comp.', 'Capital Comp.', 'Component Total',
-              'Assessment Add-On', 'NEMT Add-On', 'Prospective Case Mix Rate', 'Case Mix Assessment',
-              'Blended Case Mix Rate']
-
-# Filter valid rows - Provider Number should be numeric
-df = df[df['Provider Name'].notna()]
-df = df[df['Provider Number'].apply(lambda x: str(x).replace('.0', '').isdigit() if pd.notna(x) else False)]
-
-# Convert rate to numeric
-df['Blended Case Mix Rate'] = pd.to_numeric(df['Blended Case Mix Rate'], errors='coerce')
-
-# Filter valid rates
-df = df[df['Blended Case Mix Rate'].notna() & (df['Blended Case Mix Rate'] > 0)]
-
-# Extract facility data
-facilities = []
-for _, row in df.iterrows():
-    facilities.append({
-        'facility_name': str(row['Provider Name']).strip(),
-        'provider_number': str(int(float(row['Provider Number']))),
-        'county': str(row['County']).strip() if pd.notna(row['County']) else '',
-        'daily_rate': float(row['Blended Case Mix Rate'])
-    })
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "docker" / "scripts"))
+from parse_cache import cached_records
+from state_mappings import locate_header
+
+SOURCE_FILE = 'IN_2025-07_rates.xlsx'
+EXTRACTOR_VERSION = "1"  # Bump when the parsing below changes
+
+
+def parse_source():
+    """Parse the workbook into facility records (cached by file hash)."""
+    # Find the header row (row 11) from the top of the sheet, then read the data once
+    header = locate_header(Path(SOURCE_FILE), 'IN', sheet_name='PI Prospective')
+    if header is None:
+        raise ValueError(f"No header row found in {SOURCE_FILE}")
+
+    df = pd.read_excel(SOURCE_FILE, sheet_name=header['sheet_name'],
+                       skiprows=header['skip_rows'] + 1, header=None)
+    df.columns = ['Provider Name', 'Provider Number', 'Chain Name', 'NSGO Entity', 'Cost Report End Date',
+                  'County', 'Rate Effective Date', 'Organization Type', 'Capital Type', 'Medicare Cert.',
+                  'Hosp. Based', 'CCRC', 'Unnamed', 'NF Beds', 'Occ. Percent', 'Medicaid Utiliz.',
+                  'Fac. Avg. CMI', 'Medicaid CMI', 'Direct Care Comp.', 'Therapy Component',
+                  'Indirect Care Comp.', 'Admin Comp.', 'Capital Comp.', 'Component Total',
+                  'Assessment Add-On', 'NEMT Add-On', 'Prospective Case Mix Rate', 'Case Mix Assessment',
+                  'Blended Case Mix Rate']
+
+    # Filter valid rows - Provider Number should be numeric
+    df = df[df['Provider Name'].notna()]
+    df = df[df['Provider Number'].apply(lambda x: str(x).replace('.0', '').isdigit() if pd.notna(x) else False)]
+
+    # Convert rate to numeric
+    df['Blended Case Mix Rate'] = pd.to_numeric(df['Blended Case Mix Rate'], errors='coerce')
+
+    # Filter valid rates
+    df = df[df['Blended Case Mix Rate'].notna() & (df['Blended Case Mix Rate'] > 0)]
+
+    # Extract facility data
+    facilities = []
+    for _, row in df.iterrows():
+        facilities.append({
+            'facility_name': str(row['Provider Name']).strip(),
+            'provider_number': str(int(float(row['Provider Number']))),
+            'county': str(row['County']).strip() if pd.notna(row['County']) else '',
+            'daily_rate': float(row['Blended Case Mix Rate'])
+        })
+
+    return facilities
+
+
+facilities = cached_records(SOURCE_FILE, 'extract_in', EXTRACTOR_VERSION, parse_source)
 
 print(f"Extracted {len(facilities)} facilities")
 
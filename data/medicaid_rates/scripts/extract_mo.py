@@ -2,45 +2,65 @@
 """Extract Missouri Medicaid rates from Excel file."""
 import pandas as pd
 import csv
+import sys
+from pathlib import Path
 
-# Read with proper header
-df = pd.read_excel('MO_SFY2026_rates.xlsx', sheet_name=0, skiprows=14)
-
-# Map columns based on position
-# Col 1 = Pseudo (provider number)
-# Col 2 = Provider Name
-# Col 3 = Rate Type
-# Col 4 = City
-# Col 5 = County
-# Col -2 = 7/1/2025 rate (Effective.7)
-
-# Rename for clarity
-df.columns = ['Count', 'Pseudo', 'Provider_Name', 'Rate_Type', 'City', 'County',
-              'Location', 'FYE', 'Entity_Type', 'Lic_Beds', 'Mcd_Beds',
-              'Rate_2021_07', 'NA1', 'Rate_2022_07', 'Rate_2023_01', 'Rate_2023_07',
-              'Rate_2024_01', 'Rate_2024_07', 'CMI_2024_07', 'Rate_2025_01',
-              'CMI_2025_01', 'Rate_2025_07', 'CMI_2025_07']
-
-# Filter to valid rows (have provider name and pseudo number)
-df = df[df['Provider_Name'].notna() & df['Provider_Name'] != 'Provider Name']
-df = df[df['Pseudo'].notna()]
-
-# Convert rate to numeric
-df['Rate_2025_07'] = pd.to_numeric(df['Rate_2025_07'], errors='coerce')
-
-# Filter valid rates
-df = df[df['Rate_2025_07'].notna() & (df['Rate_2025_07'] > 0)]
-
-# Extract facility data
-facilities = []
-for _, row in df.iterrows():
-    facilities.append({
-        'facility_name': str(row['Provider_Name']).strip(),
-        'pseudo': str(row['Pseudo']).strip(),
-        'city': str(row['City']).strip() if pd.notna(row['City']) else '',
-        'county': str(row['County']).strip() if pd.notna(row['County']) else '',
-        'daily_rate': float(row['Rate_2025_07'])
-    })
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "docker" / "scripts"))
+from parse_cache import cached_records
+from state_mappings import HEADER_STRONG_SCORE, get_state_config, locate_header
+
+SOURCE_FILE = 'MO_SFY2026_rates.xlsx'
+EXTRACTOR_VERSION = "2"  # Bump when the parsing below changes
+
+
+def parse_source():
+    """Parse the workbook into facility records (cached by file hash)."""
+    # Header row 15 below the report title block; a shifted sheet is
+    # located, and a weak match keeps the configured skip_rows
+    header = locate_header(Path(SOURCE_FILE), 'MO', sheet_name=0, min_score=HEADER_STRONG_SCORE)
+    skip_rows = header['skip_rows'] if header else get_state_config('MO')['skip_rows']
+    df = pd.read_excel(SOURCE_FILE, sheet_name=0, skiprows=skip_rows)
+
+    # Map columns based on position
+    # Col 1 = Pseudo (provider number)
+    # Col 2 = Provider Name
+    # Col 3 = Rate Type
+    # Col 4 = City
+    # Col 5 = County
+    # Col -2 = 7/1/2025 rate (Effective.7)
+
+    # Rename for clarity
+    df.columns = ['Count', 'Pseudo', 'Provider_Name', 'Rate_Type', 'City', 'County',
+                  'Location', 'FYE', 'Entity_Type', 'Lic_Beds', 'Mcd_Beds',
+                  'Rate_2021_07', 'NA1', 'Rate_2022_07', 'Rate_2023_01', 'Rate_2023_07',
+                  'Rate_2024_01', 'Rate_2024_07', 'CMI_2024_07', 'Rate_2025_01',
+                  'CMI_2025_01', 'Rate_2025_07', 'CMI_2025_07']
+
+    # Filter to valid rows (have provider name and pseudo number)
+    df = df[df['Provider_Name'].notna() & df['Provider_Name'] != 'Provider Name']
+    df = df[df['Pseudo'].notna()]
+
+    # Convert rate to numeric
+    df['Rate_2025_07'] = pd.to_numeric(df['Rate_2025_07'], errors='coerce')
+
+    # Filter valid rates
+    df = df[df['Rate_2025_07'].notna() & (df['Rate_2025_07'] > 0)]
+
+    # Extract facility data
+    facilities = []
+    for _, row in df.iterrows():
+        facilities.append({
+            'facility_name': str(row['Provider_Name']).strip(),
+            'pseudo': str(row['Pseudo']).strip(),
+            'city': str(row['City']).strip() if pd.notna(row['City']) else '',
+            'county': str(row['County']).strip() if pd.notna(row['County']) else '',
+            'daily_rate': float(row['Rate_2025_07'])
+        })
+
+    return facilities
+
+
+facilities = cached_records(SOURCE_FILE, 'extract_mo', EXTRACTOR_VERSION, parse_source)
 
 print(f"Extracted {len(facilities)} facilities")
 
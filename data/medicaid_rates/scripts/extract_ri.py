@@ -2,37 +2,57 @@
 """Extract Rhode Island Medicaid rates from Excel file."""
 import pandas as pd
 import csv
+import sys
+from pathlib import Path
 
-# Read the Excel file, skipping the header row
-df = pd.read_excel('RI_2024-10_rates.xlsx', header=1)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "docker" / "scripts"))
+from parse_cache import cached_records
+from state_mappings import HEADER_STRONG_SCORE, get_state_config, locate_header
 
-# Rename columns for clarity
-df.columns = ['idx', 'NPI', 'Provider_Name', 'Alternate_Name', 'Direct_Care_Base',
-              'Provider_Base_Rate', 'Provider_Assessment', 'Effective_Date', 'RUG'] + list(df.columns[9:])
+SOURCE_FILE = 'RI_2024-10_rates.xlsx'
+EXTRACTOR_VERSION = "2"  # Bump when the parsing below changes
 
-# Filter to actual data rows (have NPI number)
-df = df[df['NPI'].notna() & (df['NPI'] != 'NPI #')]
-df = df[df['NPI'].astype(str).str.isdigit()]
 
-print(f"Found {len(df)} facilities")
+def parse_source():
+    """Parse the workbook into facility records (cached by file hash)."""
+    # Header row 2 below the title; a shifted sheet is located, and a
+    # weak match keeps the configured skip_rows
+    header = locate_header(Path(SOURCE_FILE), 'RI', sheet_name=0, min_score=HEADER_STRONG_SCORE)
+    skip_rows = header['skip_rows'] if header else get_state_config('RI')['skip_rows']
+    df = pd.read_excel(SOURCE_FILE, skiprows=skip_rows)
 
-# Extract facility data
-# Use AAA rate as the base rate (first RUG category)
-facilities = []
-for _, row in df.iterrows():
-    # Use alternate name if available, otherwise provider name
-    name = row['Alternate_Name'] if pd.notna(row['Alternate_Name']) else row['Provider_Name']
-    npi = str(row['NPI'])
+    # Rename columns for clarity
+    df.columns = ['idx', 'NPI', 'Provider_Name', 'Alternate_Name', 'Direct_Care_Base',
+                  'Provider_Base_Rate', 'Provider_Assessment', 'Effective_Date', 'RUG'] + list(df.columns[9:])
 
-    # AAA rate is the base rate (column index 9 after renaming)
-    aaa_rate = row.iloc[9]  # AAA column
+    # Filter to actual data rows (have NPI number)
+    df = df[df['NPI'].notna() & (df['NPI'] != 'NPI #')]
+    df = df[df['NPI'].astype(str).str.isdigit()]
 
-    if pd.notna(aaa_rate) and float(aaa_rate) > 0:
-        facilities.append({
-            'facility_name': str(name).strip(),
-            'npi': npi,
-            'daily_rate': float(aaa_rate)
-        })
+    print(f"Found {len(df)} facilities")
+
+    # Extract facility data
+    # Use AAA rate as the base rate (first RUG category)
+    facilities = []
+    for _, row in df.iterrows():
+        # Use alternate name if available, otherwise provider name
+        name = row['Alternate_Name'] if pd.notna(row['Alternate_Name']) else row['Provider_Name']
+        npi = str(row['NPI'])
+
+        # AAA rate is the base rate (column index 9 after renaming)
+        aaa_rate = row.iloc[9]  # AAA column
+
+        if pd.notna(aaa_rate) and float(aaa_rate) > 0:
+            facilities.append({
+                'facility_name': str(name).strip(),
+                'npi': npi,
+                'daily_rate': float(aaa_rate)
+            })
+
+    return facilities
+
+
+facilities = cached_records(SOURCE_FILE, 'extract_ri', EXTRACTOR_VERSION, parse_source)
 
 print(f"\nExtracted {len(facilities)} facilities with valid rates")
 print(f"\nFirst 10:")
@@ -1,40 +1,57 @@
 #!/usr/bin/env python3
 """Extract Virginia Medicaid rates from PDF."""
-import pdfplumber
 import re
 import csv
+import sys
+from pathlib import Path
 
-facilities = []
-
-with pdfplumber.open('VA_2025-10_rates.pdf') as pdf:
-    for page_num, page in enumerate(pdf.pages):
-        text = page.extract_text()
-        lines = text.split('\n')
-
-        for line in lines:
-            # Look for 10-digit NPI pattern
-            npi_match = re.search(r'(\d{10})', line)
-            if npi_match:
-                npi = npi_match.group(1)
-
-                # Get facility name (everything before NPI)
-                facility_name = line[:npi_match.start()].strip()
-
-                # Skip header rows
-                if not facility_name or facility_name.upper().startswith('FACILITY') or 'NPI' in facility_name.upper():
-                    continue
-
-                # Find all dollar amounts in the line
-                amounts = re.findall(r'\$(\d+\.\d{2})', line)
-                if amounts:
-                    # Last amount is total rate
-                    total_rate = float(amounts[-1])
-
-                    facilities.append({
-                        'facility_name': facility_name,
-                        'npi': npi,
-                        'total_rate': total_rate
-                    })
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "docker" / "scripts"))
+from parse_cache import cached_records
+
+SOURCE_FILE = 'VA_2025-10_rates.pdf'
+EXTRACTOR_VERSION = "1"  # Bump when the parsing below changes
+
+
+def parse_source():
+    """Parse the PDF into facility records (cached by file hash)."""
+    import pdfplumber  # Only needed on a cache miss
+
+    facilities = []
+
+    with pdfplumber.open(SOURCE_FILE) as pdf:
+        for page_num, page in enumerate(pdf.pages):
+            text = page.extract_text()
+            lines = text.split('\n')
+
+            for line in lines:
+                # Look for 10-digit NPI pattern
+                npi_match = re.search(r'(\d{10})', line)
+                if npi_match:
+                    npi = npi_match.group(1)
+
+                    # Get facility name (everything before NPI)
+                    facility_name = line[:npi_match.start()].strip()
+
+                    # Skip header rows
+                    if not facility_name or facility_name.upper().startswith('FACILITY') or 'NPI' in facility_name.upper():
+                        continue
+
+                    # Find all dollar amounts in the line
+                    amounts = re.findall(r'\$(\d+\.\d{2})', line)
+                    if amounts:
+                        # Last amount is total rate
+                        total_rate = float(amounts[-1])
+
+                        facilities.append({
+                            'facility_name': facility_name,
+                            'npi': npi,
+                            'total_rate': total_rate
+                        })
+
+    return facilities
+
+
+facilities = cached_records(SOURCE_FILE, 'extract_va', EXTRACTOR_VERSION, parse_source)
 
 print(f'Extracted {len(facilities)} facilities')
 print(f'\nFirst 10:')
@@ -2,7 +2,13 @@
 """Load Virginia Medicaid rates into database."""
 import csv
 import mysql.connector
+import sys
 from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "docker" / "scripts"))
+from match_memory import carry_forward_matches
+from rate_loader import upsert_rates
 
 DB_CONFIG = {
     "host": "localhost",
@@ -34,42 +40,30 @@ cursor.execute("""
 existing = cursor.fetchone()
 print(f"Existing current VA rates: {existing['cnt']} (latest: {existing['latest']})")
 
-# Close existing current rates
+# Apply the file as a delta: only new, changed and dropped facilities are written
 effective_date = date(2025, 10, 1)
-cursor.execute("""
-    UPDATE medicaid_rates
-    SET end_date = %s
-    WHERE state = 'VA' AND end_date IS NULL
-""", (effective_date,))
-closed = cursor.rowcount
-print(f"Closed {closed} existing rate records")
-
-# Insert new rates
-insert_sql = """
-INSERT INTO medicaid_rates (
-    state, facility_name, state_facility_id, daily_rate,
-    rate_type, effective_date, source_file, data_source
-) VALUES (
-    %s, %s, %s, %s, %s, %s, %s, %s
+result = upsert_rates(
+    conn,
+    'VA',
+    facilities,
+    effective_date=effective_date,
+    overrides={
+        'rate_type': 'total',
+        'data_source': 'state_medicaid_update',
+    }
 )
-"""
+inserted = result['inserted']
+closed = result['closed']
 
-inserted = 0
-for f in facilities:
-    cursor.execute(insert_sql, (
-        'VA',
-        f['facility_name'],
-        f['state_facility_id'],
-        float(f['daily_rate']),
-        'total',
-        effective_date,
-        f['source_file'],
-        'state_medicaid_update'
-    ))
-    inserted += 1
+print(f"Inserted {inserted} new rate records ({result['rows_per_sec']:,.0f} rows/sec)")
+print(f"Closed {closed} changed or dropped records, {result['unchanged']} unchanged")
+if result['rejected']:
+    print(f"Rejected {result['rejected']} rows - see {result['rejects_path']}")
 
-conn.commit()
-print(f"Inserted {inserted} new rate records")
+# Re-apply property_master matches remembered from earlier periods
+carried = carry_forward_matches(conn, 'VA')
+print(f"Carried forward {carried['facility_id'] + carried['name']} matches "
+      f"({carried['unmatched']} left for match_va.py)")
 
 # Summary
 print("\n" + "=" * 50)
@@ -77,6 +71,7 @@ print("VIRGINIA RATE UPDATE COMPLETE")
 print("=" * 50)
 print(f"  Prior records closed: {closed}")
 print(f"  New records inserted: {inserted}")
+print(f"  Unchanged records: {result['unchanged']}")
 print(f"  Effective date: {effective_date}")
 
 cursor.close()
@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 """Match Colorado Medicaid rates to property_master using fuzzy matching."""
 import mysql.connector
-import re
+import sys
+import time
+from pathlib import Path
 from rapidfuzz import fuzz
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "docker" / "scripts"))
+from candidate_blocking import CandidateBlocker
+from match_facilities import update_matches
+from match_memory import remember_matches
+from name_normalizer import make_state_script_normalizer
+
 DB_CONFIG = {
     "host": "localhost",
     "port": 3306,
@@ -12,36 +20,11 @@ DB_CONFIG = {
     "password": "devpass",
 }
 
-def normalize_name(name):
-    """Normalize facility name for matching."""
-    name = name.upper()
-    # Remove common suffixes
-    for suffix in [' LLC', ' INC', ' CORP', ' LP', ' LLP', ', LLC', ', INC', ', LP', ' OPCO']:
-        name = name.replace(suffix, '')
-    # Standardize common terms
-    replacements = {
-        'NURSING HOME': 'NH',
-        'NURSING FACILITY': 'NF',
-        'HEALTH AND REHABILITATION': 'H&R',
-        'HEALTH & REHABILITATION': 'H&R',
-        'HEALTH AND REHAB': 'H&R',
-        'HEALTH & REHAB': 'H&R',
-        'REHABILITATION': 'REHAB',
-        'CENTER': 'CTR',
-        'CONVALESCENT': 'CONV',
-        '&': 'AND',
-        'SAINT': 'ST',
-        'MOUNT': 'MT',
-        'HEALTHCARE': 'HC',
-        'SKILLED NURSING': 'SNF',
-        'POST ACUTE': 'PA',
-        'CARE AND REHAB': 'C&R',
-    }
-    for old, new in replacements.items():
-        name = name.replace(old, new)
-    # Remove special characters
-    name = re.sub(r'[^A-Z0-9 ]', '', name)
-    return ' '.join(name.split())
+# Shared single-pass normalizer plus Colorado-specific phrases
+normalize_name = make_state_script_normalizer({
+    'POST ACUTE': 'PA',
+    'CARE AND REHAB': 'C&R',
+}).normalize
 
 THRESHOLD = 85
 
@@ -72,16 +55,23 @@ for pm in pm_facilities:
     norm = normalize_name(pm['facility_name'])
     pm_lookup[norm] = pm
 
+# Block candidates on rare name tokens and city
+pm_names = list(pm_lookup.keys())
+blocker = CandidateBlocker(pm_names, [pm_lookup[n]['city'] for n in pm_names])
+
 # Match
 matched = 0
 updates = []
+start = time.perf_counter()
 
 for rate in unmatched:
     rate_norm = normalize_name(rate['facility_name'])
     best_score = 0
     best_match = None
 
-    for pm_norm, pm in pm_lookup.items():
+    for pos in blocker.candidates(rate_norm):
+        pm_norm = pm_names[pos]
+        pm = pm_lookup[pm_norm]
         score = max(
             fuzz.token_sort_ratio(rate_norm, pm_norm),
             fuzz.partial_ratio(rate_norm, pm_norm)
@@ -97,10 +87,15 @@ for rate in unmatched:
             'ccn': best_match['ccn'],
             'score': best_score,
             'rate_name': rate['facility_name'],
+            'state_facility_id': rate['state_facility_id'],
             'pm_name': best_match['facility_name']
         })
         matched += 1
 
+elapsed = time.perf_counter() - start
+print(f"\nBlocking: scored {blocker.pairs_scored:,} of {blocker.pairs_full:,} pairs "
+      f"({blocker.reduction_ratio:.1%} reduction) in {elapsed:.2f}s")
+
 print(f"\nMatched {matched}/{len(unmatched)} facilities ({matched/len(unmatched)*100:.1f}%)")
 
 # Show some matches
@@ -108,16 +103,19 @@ print("\nSample matches:")
 for u in updates[:10]:
     print(f"  {u['rate_name'][:40]:<40} -> {u['pm_name'][:40]:<40} ({u['score']}%)")
 
-# Update database
-for u in updates:
-    cursor.execute("""
-        UPDATE medicaid_rates
-        SET property_master_id = %s, ccn = %s
-        WHERE id = %s
-    """, (u['pm_id'], u['ccn'], u['rate_id']))
-
-conn.commit()
-print(f"\nUpdated {len(updates)} records in database")
+# Update database in one bulk transaction
+updated = update_matches(
+    conn,
+    [(u['rate_id'], u['pm_id'], u['ccn']) for u in updates],
+    mark_unverified=False
+)
+print(f"\nUpdated {updated} records in database")
+
+# Remember matches so later CO rate periods inherit them at load time
+remember_matches(
+    conn, 'CO',
+    [(u['state_facility_id'], u['rate_name'], u['pm_id'], u['ccn']) for u in updates]
+)
 
 # Show unmatched
 cursor.execute("""
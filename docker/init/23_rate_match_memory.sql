@@ -0,0 +1,37 @@
+-- 3G Healthcare Real Estate Atlas - Medicaid Rate Match Memory
+-- Remembers which property_master facility each rate-file facility matched,
+-- so new rate periods inherit prior matches at load time instead of being
+-- fuzzy-matched again.
+-- Run AFTER medicaid rates schema (20_medicaid_rates_schema.sql)
+
+USE atlas;
+
+-- ============================================
+-- TABLE: Match memory
+-- One row per (state, key) - keys are the rate file's state_facility_id
+-- and the normalized facility name (see docker/scripts/match_memory.py)
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS medicaid_rate_match_memory (
+    id INT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    state CHAR(2) NOT NULL COMMENT 'State code',
+    key_type ENUM('facility_id', 'name') NOT NULL COMMENT 'What key_value holds',
+    key_value VARCHAR(255) NOT NULL COMMENT 'Normalized state_facility_id or facility name',
+    property_master_id INT UNSIGNED NOT NULL COMMENT 'FK to property_master',
+    ccn VARCHAR(10) NULL COMMENT 'CCN of the matched facility',
+    first_matched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_matched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    UNIQUE KEY uq_memory_key (state, key_type, key_value),
+    INDEX idx_property (property_master_id),
+
+    CONSTRAINT fk_mrmm_property
+        FOREIGN KEY (property_master_id) REFERENCES property_master(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================
+-- SEED
+-- Keys are normalized in Python, so seed from already-matched rates with:
+--   python docker/scripts/match_facilities.py --seed-memory
+-- ============================================
@@ -0,0 +1,56 @@
+-- 3G Healthcare Real Estate Atlas - Medicaid Rate History Keys
+-- Adds a natural key to medicaid_rates so rate updates can be applied as
+-- slowly changing dimension (type 2) deltas: unchanged facilities keep
+-- their current row, changed ones are closed and re-inserted.
+-- Run AFTER medicaid rates schema (20_medicaid_rates_schema.sql)
+
+USE atlas;
+
+-- ============================================
+-- SECTION 1: natural_key column
+-- 'id:<normalized state_facility_id>' or 'name:<normalized facility name>'
+-- (see docker/scripts/rate_loader.py natural_key). Filled by upsert_rates;
+-- rows loaded before this migration keep NULL until their state is next
+-- updated.
+-- ============================================
+
+SET @col_exists = (
+    SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = 'medicaid_rates'
+    AND COLUMN_NAME = 'natural_key'
+);
+
+SET @sql = IF(@col_exists = 0,
+    'ALTER TABLE medicaid_rates
+     ADD COLUMN natural_key VARCHAR(255) NULL COMMENT "Facility key within state: id:<state_facility_id> or name:<normalized name>" AFTER ccn',
+    'SELECT "natural_key column already exists in medicaid_rates" AS status'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- SECTION 2: One rate per facility per effective date
+-- NULL natural_key rows (legacy loads) are not constrained
+-- ============================================
+
+SET @idx_exists = (
+    SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = 'medicaid_rates'
+    AND INDEX_NAME = 'uq_natural_key_period'
+);
+
+SET @sql = IF(@idx_exists = 0,
+    'ALTER TABLE medicaid_rates
+     ADD UNIQUE KEY uq_natural_key_period (state, natural_key, effective_date)',
+    'SELECT "uq_natural_key_period already exists on medicaid_rates" AS status'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SELECT 'medicaid_rates natural key ready' AS status;
@@ -0,0 +1,75 @@
+-- 3G Healthcare Real Estate Atlas - Rate Load Timings
+-- Adds load duration, throughput and per-stage timings to
+-- medicaid_rate_collection_log so slow state pipelines show up over time
+-- (update_rates.py --check).
+-- Run AFTER medicaid rates schema (20_medicaid_rates_schema.sql)
+
+USE atlas;
+
+-- ============================================
+-- SECTION 1: duration_seconds
+-- Time spent in the load's stages (read through commit)
+-- ============================================
+
+SET @col_exists = (
+    SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = 'medicaid_rate_collection_log'
+    AND COLUMN_NAME = 'duration_seconds'
+);
+
+SET @sql = IF(@col_exists = 0,
+    'ALTER TABLE medicaid_rate_collection_log
+     ADD COLUMN duration_seconds DECIMAL(10,3) NULL COMMENT "Seconds spent in the load stages" AFTER records_loaded',
+    'SELECT "duration_seconds column already exists in medicaid_rate_collection_log" AS status'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- SECTION 2: rows_per_second
+-- ============================================
+
+SET @col_exists = (
+    SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = 'medicaid_rate_collection_log'
+    AND COLUMN_NAME = 'rows_per_second'
+);
+
+SET @sql = IF(@col_exists = 0,
+    'ALTER TABLE medicaid_rate_collection_log
+     ADD COLUMN rows_per_second DECIMAL(12,1) NULL COMMENT "records_loaded / duration_seconds" AFTER duration_seconds',
+    'SELECT "rows_per_second column already exists in medicaid_rate_collection_log" AS status'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- SECTION 3: stage_timings
+-- {"read": {"seconds": 1.2, "rows": 8000, "rows_per_sec": 6666.7}, ...}
+-- (see docker/scripts/etl_metrics.py StageTimer.summary)
+-- ============================================
+
+SET @col_exists = (
+    SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = 'medicaid_rate_collection_log'
+    AND COLUMN_NAME = 'stage_timings'
+);
+
+SET @sql = IF(@col_exists = 0,
+    'ALTER TABLE medicaid_rate_collection_log
+     ADD COLUMN stage_timings JSON NULL COMMENT "Per-stage seconds, rows and rows/sec" AFTER rows_per_second',
+    'SELECT "stage_timings column already exists in medicaid_rate_collection_log" AS status'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SELECT 'medicaid_rate_collection_log timings ready' AS status;
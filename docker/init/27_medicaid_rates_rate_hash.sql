@@ -0,0 +1,33 @@
+-- 3G Healthcare Real Estate Atlas - Medicaid Rate Hashes
+-- Stores each rate row's rate_hash (normalized name, rate and rate type -
+-- see docker/scripts/rate_loader.py rate_hash) so a staged reload can be
+-- diffed against the current rates in SQL, without reading either side
+-- into the loader.
+-- Run AFTER medicaid rate history keys (24_medicaid_rates_scd2.sql)
+
+USE atlas;
+
+-- ============================================
+-- SECTION 1: rate_hash column
+-- Written by rate_loader on every insert; current rows loaded before this
+-- migration are hashed the next time their state is loaded.
+-- ============================================
+
+SET @col_exists = (
+    SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = 'medicaid_rates'
+    AND COLUMN_NAME = 'rate_hash'
+);
+
+SET @sql = IF(@col_exists = 0,
+    'ALTER TABLE medicaid_rates
+     ADD COLUMN rate_hash CHAR(40) NULL COMMENT "SHA-1 of normalized name, rate and rate type" AFTER natural_key',
+    'SELECT "rate_hash column already exists in medicaid_rates" AS status'
+);
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SELECT 'medicaid_rates rate_hash ready' AS status;
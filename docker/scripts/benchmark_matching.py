@@ -0,0 +1,701 @@
+#!/usr/bin/env python3
+"""
+Facility Matcher Benchmark
+Generates synthetic property_master / rate-file name sets at multiples of the
+production facility count, loads them into an in-memory SQLite stand-in for
+MySQL, and times name normalization, find_best_match and match_state.
+
+Reports throughput (names/sec), peak memory, and precision/recall of the
+matcher against the known synthetic truth. Runs fully offline.
+
+Usage:
+    python benchmark_matching.py                        # 1x and 10x
+    python benchmark_matching.py --scales 1,10,100      # Include 100x (slow)
+    python benchmark_matching.py --engine batch --blocking
+    python benchmark_matching.py --match-states 5 --sample 1000
+    python benchmark_matching.py --prefetch             # match_state from prefetched rows
+    python benchmark_matching.py --json results.json    # Also write results
+
+Dependencies:
+    pip install rapidfuzz numpy mysql-connector-python
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import match_facilities
+    from name_normalizer import facility_normalizer, normalize_facility_name
+except ImportError:
+    # If running from different directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import match_facilities
+    from name_normalizer import facility_normalizer, normalize_facility_name
+
+try:
+    import resource
+except ImportError:
+    # Windows - peak RSS is not available, tracemalloc peaks still are
+    resource = None
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# property_master size at 1x (SNF facilities, unique by CCN)
+BASE_FACILITY_COUNT = 14054
+
+DEFAULT_SCALES = [1, 10]
+DEFAULT_SEED = 42
+
+# Share of properties that appear in the synthetic rate file
+RATE_SHARE = 0.6
+# Rate-file facilities with no property_master counterpart, relative to
+# the matched ones (new builds, closures, out-of-scope providers)
+DECOY_SHARE = 0.1
+# Matched rate rows that carry the property's CCN as state_facility_id
+ID_SHARE = 0.2
+
+# States used for the synthetic data
+STATES = [
+    "AL", "AR", "AZ", "CA", "CO", "CT", "DE", "FL", "GA", "IA",
+    "ID", "IL", "IN", "KS", "KY", "LA", "MA", "MD", "ME", "MI",
+    "MN", "MO", "MS", "MT", "NC", "ND", "NE", "NH", "NJ", "NM",
+    "NV", "NY", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN",
+    "TX", "UT", "VA", "VT", "WA", "WI", "WV", "WY",
+]
+
+# Vocabulary for synthetic facility names
+PLACE_WORDS = [
+    "Oak", "Maple", "Cedar", "Pine", "Willow", "Birch", "Elm", "Aspen",
+    "Magnolia", "Cypress", "Laurel", "Holly", "Juniper", "Sycamore", "Hickory",
+    "Chestnut", "Dogwood", "Spruce", "Poplar", "Redwood", "River", "Lake",
+    "Brook", "Spring", "Valley", "Meadow", "Hill", "Ridge", "Summit", "Harbor",
+    "Bay", "Creek", "Forest", "Garden", "Park", "Grove", "Glen", "Haven",
+    "Heritage", "Liberty", "Pioneer", "Colonial", "Victorian", "Golden",
+    "Silver", "Crystal", "Sunny", "Bright", "Pleasant", "Peaceful", "Serene",
+    "Evergreen", "Highland", "Woodland", "Lakeview", "Riverside", "Bayview",
+    "Fairview", "Parkview", "Westwood", "Eastwood", "Northgate", "Southgate",
+    "Brookside", "Hillcrest", "Crestview", "Sunrise", "Sunset", "Wellington",
+    "Windsor", "Cambridge", "Oxford", "Hampton", "Kensington", "Ashford",
+    "Bradford", "Chatham", "Dover", "Franklin", "Jefferson", "Madison",
+    "Monroe", "Lincoln", "Washington", "Hamilton", "Jackson", "Clinton",
+    "Marion", "Greenville", "Springfield", "Fairfield", "Georgetown",
+    "Salem", "Newport", "Clayton", "Milford", "Ashland", "Oakwood", "Rosewood",
+    "Saint Joseph", "Saint Mary", "Saint Luke", "Mount Carmel", "Mount Vernon",
+    "Good Shepherd", "Good Samaritan", "Bethany", "Bethel", "Shalom",
+    "Grace", "Hope", "Mercy", "Trinity", "Providence", "Covenant",
+]
+
+FACILITY_TYPES = [
+    "Health and Rehabilitation Center", "Healthcare Center", "Health Care Center",
+    "Nursing Home", "Nursing Center", "Nursing and Rehabilitation Center",
+    "Rehabilitation Center", "Skilled Nursing Facility", "Care Center",
+    "Health Center", "Post Acute", "Senior Living", "Manor", "Village",
+    "Gardens", "Place", "Terrace", "Estates", "Community Living Center",
+    "Long Term Care",
+]
+
+CITY_WORDS = [
+    "Springfield", "Franklin", "Clinton", "Madison", "Georgetown", "Salem",
+    "Fairview", "Greenville", "Bristol", "Dover", "Oxford", "Arlington",
+    "Ashland", "Burlington", "Manchester", "Milton", "Newport", "Riverside",
+    "Lexington", "Winchester", "Jackson", "Marion", "Oakland", "Clayton",
+]
+
+# Rate-file noise: abbreviations applied to the property name
+ABBREVIATIONS = [
+    ("Rehabilitation", "Rehab"),
+    ("Healthcare", "Health Care"),
+    ("Health Care", "Healthcare"),
+    ("Center", "Ctr"),
+    ("Saint", "St"),
+    ("Mount", "Mt"),
+    ("Nursing Home", "NH"),
+    ("Skilled Nursing Facility", "SNF"),
+    (" and ", " & "),
+]
+LEGAL_SUFFIXES = [", LLC", " LLC", " Inc", ", Inc.", " Corp", " Operating LLC"]
+
+# Benchmark defaults
+DEFAULT_MATCH_STATES = 3  # States timed through match_state per scale
+DEFAULT_SAMPLE = 500      # Rate names timed through find_best_match
+
+
+# ============================================
+# SYNTHETIC DATA
+# ============================================
+
+def _typo(word: str, rng: random.Random) -> str:
+    """Swap, drop or double one character of a word."""
+    if len(word) < 5:
+        return word
+    pos = rng.randrange(1, len(word) - 2)
+    kind = rng.random()
+    if kind < 0.4:
+        return word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+    if kind < 0.7:
+        return word[:pos] + word[pos + 1:]
+    return word[:pos] + word[pos] + word[pos:]
+
+
+def add_name_noise(name: str, rng: random.Random) -> str:
+    """Apply rate-file style noise (suffixes, abbreviations, typos, case)."""
+    if rng.random() < 0.5:
+        old, new = rng.choice(ABBREVIATIONS)
+        name = name.replace(old, new)
+    if rng.random() < 0.3:
+        name += rng.choice(LEGAL_SUFFIXES)
+    if rng.random() < 0.1:
+        name = "The " + name
+    if rng.random() < 0.15:
+        words = name.split()
+        i = rng.randrange(len(words))
+        words[i] = _typo(words[i], rng)
+        name = " ".join(words)
+    if rng.random() < 0.4:
+        name = name.upper()
+    return name
+
+
+def _synthetic_ccn(state: str, serial: int) -> str:
+    """6-character CCN: state number plus a base-36 serial."""
+    digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    suffix = ""
+    for _ in range(4):
+        serial, rem = divmod(serial, 36)
+        suffix = digits[rem] + suffix
+    return f"{STATES.index(state) + 1:02d}{suffix}"
+
+
+def _unique_name(rng: random.Random, taken: set) -> str:
+    """Draw a facility name not yet used in the state."""
+    while True:
+        name = rng.choice(PLACE_WORDS)
+        if rng.random() < 0.5:
+            name += " " + rng.choice(PLACE_WORDS)
+        name += " " + rng.choice(FACILITY_TYPES)
+        key = normalize_facility_name(name)
+        if key not in taken:
+            taken.add(key)
+            return name
+
+
+def generate_dataset(scale: float, seed: int = DEFAULT_SEED) -> Dict:
+    """
+    Generate synthetic property_master rows, rate rows and match truth.
+
+    Args:
+        scale: Multiple of BASE_FACILITY_COUNT to generate
+        seed: Random seed (same seed and scale give the same data)
+
+    Returns:
+        Dict with "properties", "rates" (lists of row dicts) and "truth"
+        (rate id -> property id, or None for decoys)
+    """
+    rng = random.Random(seed)
+    facility_count = int(BASE_FACILITY_COUNT * scale)
+
+    properties: List[Dict] = []
+    rates: List[Dict] = []
+    truth: Dict[int, Optional[int]] = {}
+    taken: Dict[str, set] = {st: set() for st in STATES}
+    ccn_serial: Dict[str, int] = {st: 0 for st in STATES}
+
+    for prop_id in range(1, facility_count + 1):
+        state = STATES[prop_id % len(STATES)]
+        ccn_serial[state] += 1
+        properties.append({
+            "id": prop_id,
+            "ccn": _synthetic_ccn(state, ccn_serial[state]),
+            "facility_name": _unique_name(rng, taken[state]),
+            "city": rng.choice(CITY_WORDS),
+            "zip": f"{rng.randrange(10000, 99999)}",
+            "state": state,
+        })
+
+    for prop in properties:
+        if rng.random() >= RATE_SHARE:
+            continue
+        rate_id = len(rates) + 1
+        facility_id = prop["ccn"] if rng.random() < ID_SHARE else f"S{rate_id:07d}"
+        rates.append({
+            "id": rate_id,
+            "state": prop["state"],
+            "facility_name": add_name_noise(prop["facility_name"], rng),
+            "state_facility_id": facility_id,
+        })
+        truth[rate_id] = prop["id"]
+
+    decoy_count = int(len(rates) * DECOY_SHARE)
+    for _ in range(decoy_count):
+        rate_id = len(rates) + 1
+        state = rng.choice(STATES)
+        rates.append({
+            "id": rate_id,
+            "state": state,
+            "facility_name": add_name_noise(_unique_name(rng, taken[state]), rng),
+            "state_facility_id": f"S{rate_id:07d}",
+        })
+        truth[rate_id] = None
+
+    return {"properties": properties, "rates": rates, "truth": truth}
+
+
+# ============================================
+# SQLITE STAND-IN FOR MYSQL
+# ============================================
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over sqlite3 (%s params, dictionary rows)."""
+
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool = False):
+        self._cursor = cursor
+        self.dictionary = dictionary
+
+    def execute(self, sql: str, params: Sequence = ()):
+        self._cursor.execute(sql.replace("%s", "?"), tuple(params or ()))
+
+    def executemany(self, sql: str, rows: Sequence[Sequence]):
+        self._cursor.executemany(sql.replace("%s", "?"), rows)
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        columns = [col[0] for col in self._cursor.description]
+        return dict(zip(columns, row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size: int) -> List:
+        rows = self._cursor.fetchmany(size)
+        if not self.dictionary:
+            return rows
+        return [self._row(row) for row in rows]
+
+    def fetchall(self) -> List:
+        rows = self._cursor.fetchall()
+        if not self.dictionary:
+            return rows
+        columns = [col[0] for col in self._cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    In-memory stand-in for a mysql.connector connection.
+
+    Covers the read queries match_state runs in preview mode; MySQL-only
+    write syntax (UPDATE ... JOIN, ON DUPLICATE KEY) is not translated.
+    """
+
+    def __init__(self):
+        self._conn = sqlite3.connect(":memory:")
+
+    def cursor(self, dictionary: bool = False) -> SQLiteCursor:
+        return SQLiteCursor(self._conn.cursor(), dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def load_dataset(conn: SQLiteConnection, dataset: Dict):
+    """Create the tables match_facilities reads and load a dataset."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE property_master (
+            id INTEGER PRIMARY KEY, ccn TEXT, facility_name TEXT,
+            city TEXT, zip TEXT, state TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE medicaid_rates (
+            id INTEGER PRIMARY KEY, state TEXT, facility_name TEXT,
+            state_facility_id TEXT, property_master_id INTEGER,
+            ccn TEXT, verified INTEGER
+        )
+    """)
+    cursor.execute("CREATE TABLE cms_enrollments_staging (npi TEXT, ccn TEXT)")
+    cursor.execute("CREATE INDEX idx_pm_state ON property_master (state)")
+    cursor.execute("CREATE INDEX idx_mr_state ON medicaid_rates (state)")
+
+    cursor.executemany(
+        "INSERT INTO property_master (id, ccn, facility_name, city, zip, state) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        [(p["id"], p["ccn"], p["facility_name"], p["city"], p["zip"], p["state"])
+         for p in dataset["properties"]]
+    )
+    cursor.executemany(
+        "INSERT INTO medicaid_rates (id, state, facility_name, state_facility_id) "
+        "VALUES (%s, %s, %s, %s)",
+        [(r["id"], r["state"], r["facility_name"], r["state_facility_id"])
+         for r in dataset["rates"]]
+    )
+    conn.commit()
+    cursor.close()
+
+
+# ============================================
+# MEASUREMENT
+# ============================================
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None on Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def precision_recall(matches: List[Dict], truth: Dict[int, Optional[int]]) -> Dict:
+    """
+    Score predicted (rate -> property) matches against the synthetic truth.
+
+    A prediction is a true positive only if it names the right property;
+    a wrong property counts against both precision and recall.
+    """
+    predicted = {m["rate_id"]: m["property_id"] for m in matches}
+    true_pos = sum(1 for rate_id, prop_id in predicted.items() if truth.get(rate_id) == prop_id)
+    false_pos = len(predicted) - true_pos
+    false_neg = sum(
+        1 for rate_id, prop_id in truth.items()
+        if prop_id is not None and predicted.get(rate_id) != prop_id
+    )
+
+    return {
+        "true_positives": true_pos,
+        "false_positives": false_pos,
+        "false_negatives": false_neg,
+        "precision": true_pos / (true_pos + false_pos) if predicted else 0.0,
+        "recall": true_pos / (true_pos + false_neg) if (true_pos + false_neg) else 0.0,
+    }
+
+
+# ============================================
+# BENCHMARKS
+# ============================================
+
+def bench_normalize(dataset: Dict) -> Dict:
+    """Time normalize_facility_name over every synthetic name, cold then warm."""
+    names = [p["facility_name"] for p in dataset["properties"]]
+    names += [r["facility_name"] for r in dataset["rates"]]
+
+    facility_normalizer.normalize.cache_clear()
+    start = time.perf_counter()
+    for name in names:
+        normalize_facility_name(name)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in names:
+        normalize_facility_name(name)
+    warm = time.perf_counter() - start
+
+    # Peak Python allocations for a cold pass over the distinct names
+    facility_normalizer.normalize.cache_clear()
+    tracemalloc.start()
+    for name in names:
+        normalize_facility_name(name)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "names": len(names),
+        "cold_seconds": cold,
+        "warm_seconds": warm,
+        "cold_names_per_sec": len(names) / cold if cold else 0.0,
+        "warm_names_per_sec": len(names) / warm if warm else 0.0,
+        "traced_peak_mb": traced_peak / (1024 * 1024),
+    }
+
+
+def bench_find_best_match(
+    dataset: Dict,
+    state: str,
+    sample: int,
+    threshold: int,
+    blocking: bool,
+    seed: int = DEFAULT_SEED
+) -> Dict:
+    """Time find_best_match for a sample of one state's rate names."""
+    properties = [p for p in dataset["properties"] if p["state"] == state]
+    rates = [r for r in dataset["rates"] if r["state"] == state]
+    rates = random.Random(seed).sample(rates, min(sample, len(rates)))
+
+    start = time.perf_counter()
+    index = match_facilities.PropertyNameIndex(properties)
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = []
+    for rate in rates:
+        result = match_facilities.find_best_match(
+            rate["facility_name"], index, threshold, blocking=blocking
+        )
+        if result:
+            matches.append({"rate_id": rate["id"], "property_id": result[0]["id"]})
+    elapsed = time.perf_counter() - start
+
+    truth = {r["id"]: dataset["truth"][r["id"]] for r in rates}
+    return {
+        "state": state,
+        "properties": len(properties),
+        "names": len(rates),
+        "index_seconds": index_seconds,
+        "seconds": elapsed,
+        "names_per_sec": len(rates) / elapsed if elapsed else 0.0,
+        **precision_recall(matches, truth),
+    }
+
+
+def bench_match_state(
+    conn: SQLiteConnection,
+    dataset: Dict,
+    states: List[str],
+    threshold: int,
+    engine: str,
+    blocking: bool,
+    prefetch: bool = False
+) -> Dict:
+    """Time match_state end to end (queries + both stages) in preview mode."""
+    matches: List[Dict] = []
+    rate_count = 0
+    id_matched = 0
+    per_state = []
+
+    start = time.perf_counter()
+    prefetched = match_facilities.prefetch_state_data(conn) if prefetch else {}
+    prefetch_seconds = time.perf_counter() - start
+
+    for st in states:
+        stats = match_facilities.match_state(
+            conn, st, threshold, preview=True, engine=engine, blocking=blocking,
+            prefetched=prefetched.get(st)
+        )
+        matches.extend(stats["matches"])
+        rate_count += stats["total_unmatched"]
+        id_matched += stats["id_matched"]
+        per_state.append({
+            "state": st,
+            "rates": stats["total_unmatched"],
+            "properties": stats["total_properties"],
+            "seconds": stats["elapsed_seconds"],
+        })
+    elapsed = time.perf_counter() - start
+
+    state_set = set(states)
+    truth = {
+        r["id"]: dataset["truth"][r["id"]]
+        for r in dataset["rates"] if r["state"] in state_set
+    }
+    return {
+        "states": per_state,
+        "names": rate_count,
+        "id_matched": id_matched,
+        "prefetch_seconds": prefetch_seconds if prefetch else None,
+        "seconds": elapsed,
+        "names_per_sec": rate_count / elapsed if elapsed else 0.0,
+        **precision_recall(matches, truth),
+    }
+
+
+def run_scale(
+    scale: float,
+    match_states: int,
+    sample: int,
+    threshold: int,
+    engine: str,
+    blocking: bool,
+    seed: int,
+    prefetch: bool = False
+) -> Dict:
+    """Generate, load and benchmark one scale."""
+    start = time.perf_counter()
+    dataset = generate_dataset(scale, seed)
+    generate_seconds = time.perf_counter() - start
+
+    conn = SQLiteConnection()
+    start = time.perf_counter()
+    load_dataset(conn, dataset)
+    load_seconds = time.perf_counter() - start
+
+    states = STATES[:max(1, min(match_states, len(STATES)))]
+    results = {
+        "scale": scale,
+        "properties": len(dataset["properties"]),
+        "rates": len(dataset["rates"]),
+        "generate_seconds": generate_seconds,
+        "load_seconds": load_seconds,
+        "normalize": bench_normalize(dataset),
+        "find_best_match": bench_find_best_match(
+            dataset, states[0], sample, threshold, blocking, seed
+        ),
+        "match_state": bench_match_state(
+            conn, dataset, states, threshold, engine, blocking, prefetch
+        ),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    conn.close()
+    return results
+
+
+# ============================================
+# REPORTING
+# ============================================
+
+def print_results(results: Dict):
+    """Print one scale's results."""
+    norm = results["normalize"]
+    fbm = results["find_best_match"]
+    ms = results["match_state"]
+    peak = results["peak_rss_mb"]
+
+    print(f"\n--- {results['scale']}x: {results['properties']:,} properties, "
+          f"{results['rates']:,} rate rows ---")
+    print(f"Generate: {results['generate_seconds']:.2f}s, "
+          f"load into SQLite: {results['load_seconds']:.2f}s")
+    print(f"normalize_facility_name: {norm['names']:,} names, "
+          f"cold {norm['cold_names_per_sec']:,.0f}/sec, "
+          f"warm {norm['warm_names_per_sec']:,.0f}/sec, "
+          f"traced peak {norm['traced_peak_mb']:.1f} MB")
+    print(f"find_best_match ({fbm['state']}, {fbm['properties']:,} properties): "
+          f"{fbm['names']:,} names in {fbm['seconds']:.2f}s "
+          f"({fbm['names_per_sec']:,.0f}/sec, index {fbm['index_seconds']:.2f}s), "
+          f"precision {fbm['precision']:.3f}, recall {fbm['recall']:.3f}")
+    print(f"match_state ({', '.join(s['state'] for s in ms['states'])}): "
+          f"{ms['names']:,} names in {ms['seconds']:.2f}s "
+          f"({ms['names_per_sec']:,.0f}/sec, {ms['id_matched']:,} by ID), "
+          f"precision {ms['precision']:.3f}, recall {ms['recall']:.3f}")
+    if ms["prefetch_seconds"] is not None:
+        print(f"  (includes prefetching every state: {ms['prefetch_seconds']:.2f}s)")
+    print(f"Peak RSS: {f'{peak:,.0f} MB' if peak is not None else 'n/a'}")
+
+
+# ============================================
+# CLI ENTRY POINT
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark facility matching on synthetic data (offline)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python benchmark_matching.py
+    python benchmark_matching.py --scales 1,10,100
+    python benchmark_matching.py --engine batch --blocking
+    python benchmark_matching.py --json results.json
+        """
+    )
+
+    parser.add_argument(
+        "--scales",
+        type=str,
+        default=",".join(str(s) for s in DEFAULT_SCALES),
+        help=f"Comma-separated multiples of {BASE_FACILITY_COUNT:,} facilities "
+             f"(default: {','.join(str(s) for s in DEFAULT_SCALES)})"
+    )
+
+    parser.add_argument(
+        "--match-states",
+        type=int,
+        default=DEFAULT_MATCH_STATES,
+        help=f"States timed through match_state per scale (default: {DEFAULT_MATCH_STATES})"
+    )
+
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=DEFAULT_SAMPLE,
+        help=f"Rate names timed through find_best_match (default: {DEFAULT_SAMPLE})"
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=int,
+        default=match_facilities.DEFAULT_THRESHOLD,
+        help=f"Minimum match score (default: {match_facilities.DEFAULT_THRESHOLD})"
+    )
+
+    parser.add_argument(
+        "--engine",
+        choices=match_facilities.MATCH_ENGINES,
+        default=match_facilities.DEFAULT_ENGINE,
+        help=f"Fuzzy scoring engine (default: {match_facilities.DEFAULT_ENGINE})"
+    )
+
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="Only fuzzy-score candidates sharing a rare name token or city"
+    )
+
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Feed match_state from prefetch_state_data instead of per-state queries"
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help=f"Random seed for the synthetic data (default: {DEFAULT_SEED})"
+    )
+
+    parser.add_argument(
+        "--json",
+        type=str,
+        help="Write results to this JSON file"
+    )
+
+    args = parser.parse_args()
+    scales = [float(s) if "." in s else int(s) for s in args.scales.split(",") if s.strip()]
+
+    print("\n" + "=" * 70)
+    print("FACILITY MATCHER BENCHMARK")
+    print(f"Engine: {args.engine}{' (blocking)' if args.blocking else ''}, "
+          f"threshold: {args.threshold}, seed: {args.seed}")
+    print("=" * 70)
+
+    all_results = []
+    for scale in scales:
+        results = run_scale(
+            scale, args.match_states, args.sample, args.threshold,
+            args.engine, args.blocking, args.seed, args.prefetch
+        )
+        print_results(results)
+        all_results.append(results)
+
+    print("=" * 70)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(all_results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
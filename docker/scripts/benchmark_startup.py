@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+Measures how long the reporting CLIs take to import, using
+`python -X importtime`, and fails when any of them goes over the startup
+budget or pulls in a heavy module (pandas, numpy, openpyxl, pyarrow,
+rapidfuzz) at import time.
+
+update_rates.py --check, match_facilities.py --stats and
+load_medicaid_rates.py --report-unmatched run one SQL aggregate from cron
+and shell loops, so import time is most of their run time. The
+update_rates.py --watch process (rate_ingest) only watches the folder and
+hands files to workers. The heavy modules are imported inside the
+commands that parse or match.
+
+Each module is imported in a fresh interpreter, best of --repeat runs.
+Runs fully offline (nothing connects to MySQL at import).
+
+Usage:
+    python benchmark_startup.py                         # All reporting CLIs
+    python benchmark_startup.py --budget-ms 200         # Tighter budget
+    python benchmark_startup.py --modules update_rates  # One module
+    python benchmark_startup.py --json startup.json     # Also write results
+
+Exit status is 1 when a module is over budget or imports a heavy module.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules behind the reporting commands
+DEFAULT_MODULES = ["update_rates", "match_facilities", "load_medicaid_rates", "rate_ingest"]
+
+# Modules the reporting commands must not import at startup
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "pyarrow", "rapidfuzz", "pdfplumber"]
+
+# Cumulative import time allowed per module. Measured at 100-150 ms, most
+# of it mysql.connector; importing pandas alone costs ~500 ms.
+DEFAULT_BUDGET_MS = 300
+
+DEFAULT_REPEAT = 3
+
+# "import time:  self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+# ============================================
+# MEASUREMENT
+# ============================================
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Cumulative microseconds per imported module from -X importtime output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def import_once(module: str) -> Dict[str, int]:
+    """Import module in a fresh interpreter and return its importtime table."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"import {module} failed: {error}")
+    return parse_importtime(result.stderr)
+
+
+def measure_module(module: str, repeat: int) -> Dict:
+    """
+    Best-of-repeat import time for module.
+
+    Returns:
+        Dict with module, import_ms (best run), runs_ms, heavy (heavy
+        top-level packages that were imported) and slowest (the five
+        slowest imports by cumulative time in the best run)
+    """
+    runs = [import_once(module) for _ in range(max(1, repeat))]
+    best = min(runs, key=lambda table: table.get(module, 0))
+
+    heavy = sorted({
+        name.split(".")[0] for name in best
+        if name.split(".")[0] in HEAVY_MODULES
+    })
+    slowest = sorted(
+        ((name, us) for name, us in best.items() if name != module),
+        key=lambda item: item[1],
+        reverse=True
+    )[:5]
+
+    return {
+        "module": module,
+        "import_ms": best.get(module, 0) / 1000,
+        "runs_ms": [table.get(module, 0) / 1000 for table in runs],
+        "heavy": heavy,
+        "slowest": [{"module": name, "ms": us / 1000} for name, us in slowest],
+    }
+
+
+def check_budget(results: List[Dict], budget_ms: float) -> List[str]:
+    """Failure messages for modules over budget or importing heavy modules."""
+    failures = []
+    for result in results:
+        if result["import_ms"] > budget_ms:
+            failures.append(f"{result['module']}: {result['import_ms']:.0f} ms "
+                            f"over the {budget_ms:.0f} ms budget")
+        if result["heavy"]:
+            failures.append(f"{result['module']}: imports {', '.join(result['heavy'])} at startup")
+    return failures
+
+
+# ============================================
+# REPORTING
+# ============================================
+
+def print_results(results: List[Dict], budget_ms: float):
+    """Print one line per module plus its slowest imports."""
+    for result in results:
+        status = "OK" if result["import_ms"] <= budget_ms and not result["heavy"] else "FAIL"
+        runs = ", ".join(f"{ms:.0f}" for ms in result["runs_ms"])
+        print(f"\n{result['module']}: {result['import_ms']:.0f} ms (runs: {runs} ms) [{status}]")
+        if result["heavy"]:
+            print(f"  Heavy modules imported: {', '.join(result['heavy'])}")
+        for entry in result["slowest"]:
+            print(f"  {entry['ms']:8.1f} ms  {entry['module']}")
+
+
+# ============================================
+# CLI ENTRY POINT
+# ============================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check import time of the reporting CLIs against a budget",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python benchmark_startup.py
+    python benchmark_startup.py --budget-ms 200 --repeat 5
+    python benchmark_startup.py --json startup.json
+        """
+    )
+
+    parser.add_argument(
+        "--modules",
+        type=str,
+        default=",".join(DEFAULT_MODULES),
+        help=f"Comma-separated modules to import (default: {','.join(DEFAULT_MODULES)})"
+    )
+
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Maximum import time per module in ms (default: {DEFAULT_BUDGET_MS})"
+    )
+
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Imports per module; the fastest counts (default: {DEFAULT_REPEAT})"
+    )
+
+    parser.add_argument(
+        "--json",
+        type=str,
+        help="Write results to this JSON file"
+    )
+
+    args = parser.parse_args(argv)
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+
+    print("\n" + "=" * 70)
+    print("CLI STARTUP BENCHMARK")
+    print(f"Budget: {args.budget_ms:.0f} ms per module, best of {args.repeat}")
+    print("=" * 70)
+
+    try:
+        results = [measure_module(module, args.repeat) for module in modules]
+    except RuntimeError as e:
+        print(f"\nERROR: {e}")
+        return 1
+
+    print_results(results, args.budget_ms)
+    failures = check_budget(results, args.budget_ms)
+
+    print("\n" + "=" * 70)
+    if failures:
+        print("FAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+    else:
+        print("All modules within budget")
+    print("=" * 70)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"budget_ms": args.budget_ms, "results": results,
+                       "failures": failures}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Candidate blocking for facility name matching.
+Narrows the property_master facilities a rate name is fuzzy-scored against,
+using an inverted index on rare name tokens and, when known, on city.
+
+Usage:
+    from candidate_blocking import CandidateBlocker
+
+    blocker = CandidateBlocker(normalized_names, cities)
+    for pos in blocker.candidates(normalized_rate_name, rate_city):
+        ...
+    print(blocker.reduction_ratio)
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+# A token is "rare" (usable as a blocking key) when it appears in at most
+# this share of a state's names, or in at most RARE_TOKEN_MIN_POSTINGS names.
+# Words like "center", "nursing" or "rehab" never qualify in large states.
+RARE_TOKEN_MAX_SHARE = 0.02
+RARE_TOKEN_MIN_POSTINGS = 5
+
+# Tokens shorter than this are ignored (same rule as the token-overlap fallback)
+MIN_TOKEN_LENGTH = 3
+
+
+def name_tokens(name: str) -> set:
+    """Split a normalized name into blocking tokens."""
+    return {t for t in name.lower().split() if len(t) >= MIN_TOKEN_LENGTH}
+
+
+def normalize_city(city: Optional[str]) -> Optional[str]:
+    """Normalize a city name for use as a blocking key."""
+    if not city or not isinstance(city, str):
+        return None
+    city = " ".join(city.upper().replace(".", " ").split())
+    return city or None
+
+
+class CandidateBlocker:
+    """
+    Inverted index over a state's normalized facility names.
+
+    candidates() returns positions into the names list the blocker was built
+    from. Positions are returned in ascending order so that scoring a block
+    resolves ties the same way as scoring the full list. When a rate name has
+    no rare token and no city hit, every position is returned (full-state
+    fallback).
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        cities: Optional[Sequence[Optional[str]]] = None,
+        max_token_share: float = RARE_TOKEN_MAX_SHARE,
+        min_token_postings: int = RARE_TOKEN_MIN_POSTINGS
+    ):
+        self.size = len(names)
+
+        postings: Dict[str, List[int]] = {}
+        for pos, name in enumerate(names):
+            for token in name_tokens(name):
+                postings.setdefault(token, []).append(pos)
+
+        max_postings = max(min_token_postings, int(self.size * max_token_share))
+        self.token_postings: Dict[str, List[int]] = {
+            token: positions
+            for token, positions in postings.items()
+            if len(positions) <= max_postings
+        }
+
+        self.city_postings: Dict[str, List[int]] = {}
+        if cities is not None:
+            for pos, city in enumerate(cities):
+                key = normalize_city(city)
+                if key:
+                    self.city_postings.setdefault(key, []).append(pos)
+
+        # Running totals for reporting
+        self.queries = 0
+        self.fallbacks = 0
+        self.pairs_scored = 0
+
+    def candidates(self, name: str, city: Optional[str] = None) -> List[int]:
+        """Positions of names worth scoring against a normalized rate name."""
+        block = set()
+        for token in name_tokens(name):
+            block.update(self.token_postings.get(token, ()))
+
+        city_key = normalize_city(city)
+        if city_key:
+            block.update(self.city_postings.get(city_key, ()))
+
+        self.queries += 1
+        if block:
+            result = sorted(block)
+        else:
+            self.fallbacks += 1
+            result = list(range(self.size))
+
+        self.pairs_scored += len(result)
+        return result
+
+    @property
+    def pairs_full(self) -> int:
+        """Pairs that would have been scored without blocking."""
+        return self.queries * self.size
+
+    @property
+    def reduction_ratio(self) -> float:
+        """Share of name pairs skipped thanks to blocking (0.0 - 1.0)."""
+        if not self.pairs_full:
+            return 0.0
+        return 1 - self.pairs_scored / self.pairs_full
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Stage timing for the rates ETL.
+Times the named stages of a load (read, detect, normalize, dedupe, insert,
+match, commit) with row counts and rows/sec, and writes one JSONL metrics
+file per run so slow stages can be compared across runs.
+
+Code that does the work marks its stages with the module-level stage();
+the caller decides where the numbers go by activating a StageTimer around
+it. With no active timer stage() only runs the block, so parsers can be
+instrumented without every caller having to pass a timer in. The active
+timer is per process: pool workers activate their own and return
+timer.stages with their result.
+
+Usage:
+    from etl_metrics import RunMetrics, StageTimer, stage, timed_iter
+
+    with stage("read") as s:
+        df = pd.read_excel(path)
+        s.rows = len(df)
+
+    metrics = RunMetrics("load_medicaid_rates")
+    with metrics.timer("FL") as timer:              # stage() calls land here
+        df = process_file(path, "FL")
+    metrics.finish_state("FL", "success", rows=len(df))
+    metrics.close()                                 # metrics/load_medicaid_rates_<run>.jsonl
+"""
+
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+METRICS_DIR = Path(os.getenv("RATE_METRICS_DIR", Path(__file__).parent / "metrics"))
+
+# Stage order for reports; stages not listed here follow in first-seen order
+STAGE_ORDER = ["read", "detect", "normalize", "dedupe", "insert", "match", "commit"]
+
+
+# ============================================
+# STAGE TIMING
+# ============================================
+
+class StageRows:
+    """Handle yielded by stage(); set rows to the number of rows handled."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows: Optional[int] = None
+
+
+def rows_per_sec(rows: Optional[int], seconds: float) -> Optional[float]:
+    """Throughput, or None when there is no row count or no measurable time."""
+    if rows is None or seconds <= 0:
+        return None
+    return rows / seconds
+
+
+class StageTimer:
+    """
+    Accumulated seconds and rows per stage name.
+
+    Repeated stages (one per streamed chunk, say) add up, so stages holds
+    one total per name. It is a plain dict and pickles with worker results.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict] = {}
+
+    def add(self, name: str, seconds: float, rows: Optional[int] = None):
+        """Record time (and rows) spent in a stage."""
+        entry = self.stages.setdefault(name, {"seconds": 0.0, "rows": None, "calls": 0})
+        entry["seconds"] += seconds
+        entry["calls"] += 1
+        if rows is not None:
+            entry["rows"] = (entry["rows"] or 0) + rows
+
+    def merge(self, stages: Optional[Dict[str, Dict]]):
+        """Add another timer's stages (e.g. from a pool worker)."""
+        for name, other in (stages or {}).items():
+            entry = self.stages.setdefault(name, {"seconds": 0.0, "rows": None, "calls": 0})
+            entry["seconds"] += other["seconds"]
+            entry["calls"] += other.get("calls", 1)
+            if other.get("rows") is not None:
+                entry["rows"] = (entry["rows"] or 0) + other["rows"]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRows]:
+        """Time the block as stage name; set .rows on the handle to count rows."""
+        handle = StageRows()
+        start = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            self.add(name, time.perf_counter() - start, handle.rows)
+
+    @contextmanager
+    def activate(self) -> Iterator["StageTimer"]:
+        """Make this the timer that module-level stage() records into."""
+        global _active
+        previous, _active = _active, self
+        try:
+            yield self
+        finally:
+            _active = previous
+
+    @property
+    def seconds(self) -> float:
+        """Total time across stages."""
+        return sum(entry["seconds"] for entry in self.stages.values())
+
+    def ordered(self) -> Iterator[tuple]:
+        """(name, entry) pairs in STAGE_ORDER, then any other stages."""
+        names = [name for name in STAGE_ORDER if name in self.stages]
+        names += [name for name in self.stages if name not in STAGE_ORDER]
+        for name in names:
+            yield name, self.stages[name]
+
+    def summary(self) -> Dict[str, Dict]:
+        """Stages with rounded seconds and rows/sec, for JSON and the collection log."""
+        result = {}
+        for name, entry in self.ordered():
+            rate = rows_per_sec(entry["rows"], entry["seconds"])
+            result[name] = {
+                "seconds": round(entry["seconds"], 4),
+                "rows": entry["rows"],
+                "rows_per_sec": round(rate, 1) if rate is not None else None,
+            }
+        return result
+
+
+# Timer that stage() records into (see StageTimer.activate)
+_active: Optional[StageTimer] = None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[StageRows]:
+    """Time the block into the active StageTimer, if there is one."""
+    if _active is None:
+        yield StageRows()
+        return
+    with _active.stage(name) as handle:
+        yield handle
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of stage(); counts rows when the result has a length."""
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as handle:
+                result = func(*args, **kwargs)
+                if hasattr(result, "__len__"):
+                    handle.rows = len(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def timed_iter(items: Iterable, name: str) -> Iterator:
+    """
+    Yield from items, timing each step as stage name.
+
+    For lazy readers (chunked CSV/workbook readers) whose work happens
+    inside next(); each item's len() is counted as rows.
+    """
+    iterator = iter(items)
+    while True:
+        with stage(name) as handle:
+            item = next(iterator, None)
+            if item is not None and hasattr(item, "__len__"):
+                handle.rows = len(item)
+        if item is None:
+            return
+        yield item
+
+
+# ============================================
+# RUN METRICS
+# ============================================
+
+class RunMetrics:
+    """
+    Stage timings for one run of an ETL script, per state.
+
+    Each finished state is appended to METRICS_DIR/<script>_<run_id>.jsonl
+    as one "stage" line per stage and one "state" line; close() adds a
+    "run" line with the totals.
+    """
+
+    def __init__(self, script: str, metrics_dir: Optional[Path] = None, write: bool = True):
+        self.script = script
+        self.run_id = f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
+        self.path = Path(metrics_dir or METRICS_DIR) / f"{script}_{self.run_id}.jsonl"
+        self.write = write
+        self.timers: Dict[str, StageTimer] = {}
+        self.totals = StageTimer()
+        self.started = time.perf_counter()
+        self.states = 0
+        self.rows = 0
+
+    def timer_for(self, state: str) -> StageTimer:
+        """The state's StageTimer, created on first use."""
+        return self.timers.setdefault(state, StageTimer())
+
+    @contextmanager
+    def timer(self, state: str) -> Iterator[StageTimer]:
+        """Activate the state's timer for the block."""
+        with self.timer_for(state).activate() as timer:
+            yield timer
+
+    def finish_state(
+        self,
+        state: str,
+        status: str,
+        rows: int = 0,
+        error: Optional[str] = None,
+        **extra
+    ) -> Dict:
+        """
+        Write the state's stage timings to the metrics file.
+
+        Returns:
+            Dict with seconds, rows_per_sec and stages (see StageTimer.summary),
+            as stored in medicaid_rate_collection_log
+        """
+        timer = self.timer_for(state)
+        self.totals.merge(timer.stages)
+        self.states += 1
+        self.rows += rows
+
+        seconds = timer.seconds
+        rate = rows_per_sec(rows, seconds)
+        record = {
+            "seconds": round(seconds, 4),
+            "rows_per_sec": round(rate, 1) if rate is not None else None,
+            "stages": timer.summary(),
+        }
+
+        lines = [
+            {"event": "stage", "state": state, "stage": name, **entry}
+            for name, entry in record["stages"].items()
+        ]
+        lines.append({
+            "event": "state", "state": state, "status": status, "rows": rows,
+            "seconds": record["seconds"], "rows_per_sec": record["rows_per_sec"],
+            "error": error, **extra
+        })
+        self._write(lines)
+        return record
+
+    def close(self, **extra) -> Dict:
+        """Write the run totals line and return it."""
+        elapsed = time.perf_counter() - self.started
+        rate = rows_per_sec(self.rows, elapsed)
+        line = {
+            "event": "run", "states": self.states, "rows": self.rows,
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(rate, 1) if rate is not None else None,
+            "stages": self.totals.summary(), **extra
+        }
+        self._write([line])
+        return line
+
+    def print_stages(self):
+        """Print the run's stage totals with rows/sec."""
+        print("\nSTAGE TIMINGS:")
+        for name, entry in self.totals.summary().items():
+            throughput = (f", {entry['rows']:,} rows, {entry['rows_per_sec']:,.0f} rows/sec"
+                          if entry["rows_per_sec"] is not None else "")
+            print(f"  {name.capitalize() + ':':<14}{entry['seconds']:8.2f}s{throughput}")
+        if self.write:
+            print(f"  Metrics: {self.path}")
+
+    def _write(self, lines):
+        if not self.write:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            now = datetime.now().isoformat(timespec="seconds")
+            with open(self.path, "a", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(json.dumps(
+                        {"run_id": self.run_id, "script": self.script, "time": now, **line},
+                        default=str
+                    ) + "\n")
+        except OSError as e:
+            # Metrics must never fail the load itself
+            logger.warning(f"Could not write metrics to {self.path}: {e}")
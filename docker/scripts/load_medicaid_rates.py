@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """
 Medicaid Rates ETL Pipeline
-Loads compiled rate files from 9 states into the medicaid_rates table.
+Loads compiled rate files into the medicaid_rates table: the normalized
+XX_YYYY-MM_rates.csv files in data/medicaid_rates/compiled/ and the
+"XX - Compiled Rates.xlsx" workbooks.
 
 Usage:
     python load_medicaid_rates.py --scan-only        # Scan files and report columns
     python load_medicaid_rates.py --execute          # Load data to database
+    python load_medicaid_rates.py --execute --jobs 4 # Parse files in 4 worker processes
+    python load_medicaid_rates.py --execute --stream # Stream large files in chunks
+    python load_medicaid_rates.py --execute --backfill # Load every period column as history
     python load_medicaid_rates.py --report-unmatched # Show facilities without property_master match
 
 Dependencies:
@@ -13,32 +18,56 @@ Dependencies:
 """
 
 import argparse
+import json
 import os
+import queue
+import re
 import sys
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
 import logging
 
-import pandas as pd
 import mysql.connector
 from mysql.connector import Error
 
+# pandas is imported by the commands that parse files, so reporting
+# commands start without it
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Import our column mapping module
 try:
+    from etl_metrics import RunMetrics, StageTimer, stage, timed_iter
+    from match_memory import carry_forward_matches
+    from parse_cache import cached_frame, config_version
+    from rate_loader import RateStage, backfill_rates
     from state_mappings import (
         detect_columns,
+        find_period_columns,
+        locate_header,
         validate_required_columns,
         get_state_config
     )
+    from workbook_reader import iter_sheet_chunks, open_workbook, release_workbook
 except ImportError:
     # If running from different directory
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from etl_metrics import RunMetrics, StageTimer, stage, timed_iter
+    from match_memory import carry_forward_matches
+    from parse_cache import cached_frame, config_version
+    from rate_loader import RateStage, backfill_rates
     from state_mappings import (
         detect_columns,
+        find_period_columns,
+        locate_header,
         validate_required_columns,
         get_state_config
     )
+    from workbook_reader import iter_sheet_chunks, open_workbook, release_workbook
 
 # ============================================
 # CONFIGURATION
@@ -55,7 +84,31 @@ DB_CONFIG = {
 
 # Path to compiled rate files (relative to script location)
 # Adjust based on where script is run from
-COMPILED_RATES_DIR = Path(__file__).parent.parent.parent / "data" / "medicaid_rates" / "compiled" / "Compiled NF Rates"
+COMPILED_DIR = Path(__file__).parent.parent.parent / "data" / "medicaid_rates" / "compiled"
+COMPILED_RATES_DIR = COMPILED_DIR / "Compiled NF Rates"
+
+# Normalized compiled CSVs: XX_YYYY-MM_rates.csv (XX_YYYY-YY for a state
+# fiscal year, e.g. CO_2025-26_rates.csv)
+COMPILED_CSV_PATTERN = re.compile(r"^([A-Z]{2})_(\d{4})-(\d{2})_rates\.csv$", re.IGNORECASE)
+
+# Compiled CSV columns that may hold the state's provider ID, in order of preference
+COMPILED_ID_COLUMNS = ["state_facility_id", "provider_number"]
+
+# States whose compiled rate is not a plain total rate
+COMPILED_RATE_TYPES = {
+    "IN": "case_mix",  # Blended case-mix rate
+    "RI": "base",      # Base RUG (AAA) rate
+}
+
+# Bump when process_file's output changes (state config changes are
+# picked up automatically - see parse_cache.config_version)
+PROCESS_FILE_VERSION = "4"
+
+# Rows per normalized chunk in streaming mode (iter_process_file)
+STREAM_CHUNK_SIZE = 5000
+
+# Parsed files allowed to wait for the DB writer, per parse worker
+PIPELINE_QUEUE_PER_JOB = 2
 
 # Expected states in compiled directory
 EXPECTED_STATES = ["FL", "GA", "IL", "IN", "MS", "NY", "OH", "PA", "VA"]
@@ -84,53 +137,79 @@ def get_db_connection():
         raise
 
 
-def insert_rates(conn, rates_df: pd.DataFrame) -> int:
+def reload_rates(
+    conn,
+    state: str,
+    rates: Union["pd.DataFrame", Iterator["pd.DataFrame"]]
+) -> Dict:
     """
-    Insert rates dataframe into medicaid_rates table.
+    Replace a state's current rates with a parsed file.
+
+    The rows are staged in a temporary table, validated and published
+    through rate_loader.upsert_rates in one transaction (see
+    rate_loader.RateStage), so readers never see a partially loaded state
+    and reloading a file keeps the history an update would.
 
     Args:
         conn: Database connection
-        rates_df: DataFrame with standardized columns
+        state: State code
+        rates: Normalized DataFrame, or chunks from iter_process_file
 
     Returns:
-        Number of rows inserted
+        Dict with inserted, closed, unchanged, stale, rejected and
+        publish_seconds
     """
-    cursor = conn.cursor()
-
-    insert_sql = """
-    INSERT INTO medicaid_rates (
-        state, facility_name, state_facility_id, daily_rate,
-        rate_type, effective_date, source_file, data_source
-    ) VALUES (
-        %(state)s, %(facility_name)s, %(state_facility_id)s, %(daily_rate)s,
-        %(rate_type)s, %(effective_date)s, %(source_file)s, %(data_source)s
-    )
+    import pandas as pd
+
+    chunks = [rates] if isinstance(rates, pd.DataFrame) else rates
+
+    with RateStage(conn, state) as staging:
+        # Streamed chunks are read and normalized as they are pulled here,
+        # timed by their own stages
+        for chunk in chunks:
+            with stage("insert") as timed:
+                result = staging.insert(
+                    chunk,
+                    defaults={
+                        "rate_type": "total",
+                        "effective_date": datetime.now().date(),
+                    },
+                    overrides={"data_source": "state_medicaid_compiled"}
+                )
+                timed.rows = result["inserted"]
+
+        with stage("commit") as timed:
+            staging.check()
+            published = staging.publish()
+            timed.rows = published["inserted"]
+
+    return {
+        "inserted": published["inserted"],
+        "closed": published["closed"],
+        "unchanged": published["unchanged"],
+        "stale": published["stale"],
+        "rejected": staging.rejected,
+        "publish_seconds": published["seconds"],
+    }
+
+
+def log_collection(
+    conn,
+    state: str,
+    status: str,
+    files: int,
+    records: int,
+    error: str = None,
+    metrics: Optional[Dict] = None
+):
     """
+    Log collection attempt to medicaid_rate_collection_log.
 
-    rows_inserted = 0
-    for _, row in rates_df.iterrows():
-        try:
-            cursor.execute(insert_sql, {
-                "state": row["state"],
-                "facility_name": row["facility_name"],
-                "state_facility_id": row.get("state_facility_id"),
-                "daily_rate": row["daily_rate"],
-                "rate_type": row.get("rate_type", "total"),
-                "effective_date": row.get("effective_date", datetime.now().date()),
-                "source_file": row.get("source_file"),
-                "data_source": "state_medicaid_compiled"
-            })
-            rows_inserted += 1
-        except Error as e:
-            logger.warning(f"Insert failed for {row['facility_name']}: {e}")
-
-    conn.commit()
-    cursor.close()
-    return rows_inserted
-
-
-def log_collection(conn, state: str, status: str, files: int, records: int, error: str = None):
-    """Log collection attempt to medicaid_rate_collection_log."""
+    metrics is the state's RunMetrics.finish_state record: its duration,
+    rows/sec and per-stage timings are stored with the attempt so
+    update_rates.py --check can show load times over time.
+    """
+    metrics = metrics or {}
     cursor = conn.cursor()
 
     # Get rate_source_id for state
@@ -145,10 +224,15 @@ def log_collection(conn, state: str, status: str, files: int, records: int, erro
         cursor.execute(
             """
             INSERT INTO medicaid_rate_collection_log
-            (rate_source_id, status, files_found, records_loaded, error_message)
-            VALUES (%s, %s, %s, %s, %s)
+            (rate_source_id, status, files_found, records_loaded, error_message,
+             duration_seconds, rows_per_second, stage_timings)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             """,
-            (source_id, status, files, records, error)
+            (
+                source_id, status, files, records, error,
+                metrics.get("seconds"), metrics.get("rows_per_sec"),
+                json.dumps(metrics["stages"]) if metrics.get("stages") else None
+            )
         )
         conn.commit()
 
@@ -159,10 +243,43 @@ def log_collection(conn, state: str, status: str, files: int, records: int, erro
 # FILE PROCESSING FUNCTIONS
 # ============================================
 
+def parse_compiled_filename(
+    filepath: Path,
+    pattern: re.Pattern = COMPILED_CSV_PATTERN
+) -> Optional[Tuple[str, date]]:
+    """
+    Parse state and rate period from a compiled CSV name.
+
+    XX_YYYY-MM_rates.csv is the period starting that month; XX_YYYY-YY
+    (e.g. CO_2025-26) is a state fiscal year starting July 1.
+
+    Args:
+        filepath: File to parse the name of
+        pattern: Name pattern with (state, year, month or YY) groups
+
+    Returns:
+        (state, period start) or None if the name does not match
+    """
+    match = pattern.match(filepath.name)
+    if not match:
+        return None
+
+    state, year, suffix = match.group(1).upper(), int(match.group(2)), int(match.group(3))
+    if 1 <= suffix <= 12:
+        return state, date(year, suffix, 1)
+    if suffix == (year + 1) % 100:
+        return state, date(year, 7, 1)
+    return None
+
+
 def find_rate_files(directory: Path) -> Dict[str, Path]:
     """
     Find all rate files in the compiled directory.
 
+    Picks up "XX - Compiled Rates.xlsx" workbooks (in the directory or its
+    "Compiled NF Rates" folder) and XX_YYYY-MM_rates.csv files. A state
+    with several CSV periods uses the latest; a CSV wins over a workbook.
+
     Returns:
         Dict mapping state code to file path
     """
@@ -172,18 +289,64 @@ def find_rate_files(directory: Path) -> Dict[str, Path]:
         logger.error(f"Directory not found: {directory}")
         return files
 
-    for file in directory.glob("*.xlsx"):
-        # Extract state from filename pattern: "XX - Compiled Rates.xlsx"
-        parts = file.stem.split(" - ")
-        if len(parts) >= 1:
-            state = parts[0].strip().upper()
-            if len(state) == 2:
-                files[state] = file
-                logger.debug(f"Found: {state} -> {file.name}")
+    for xlsx_dir in (directory, directory / COMPILED_RATES_DIR.name):
+        for file in sorted(xlsx_dir.glob("*.xlsx")):
+            # Extract state from filename pattern: "XX - Compiled Rates.xlsx"
+            parts = file.stem.split(" - ")
+            if len(parts) >= 1:
+                state = parts[0].strip().upper()
+                if len(state) == 2:
+                    files[state] = file
+                    logger.debug(f"Found: {state} -> {file.name}")
+
+    periods: Dict[str, date] = {}
+    for file in sorted(directory.glob("*_rates.csv")):
+        parsed = parse_compiled_filename(file)
+        if not parsed:
+            logger.warning(f"Skipping {file.name}: not XX_YYYY-MM_rates.csv")
+            continue
+        state, period = parsed
+        if state not in periods or period > periods[state]:
+            periods[state] = period
+            files[state] = file
+            logger.debug(f"Found: {state} ({period}) -> {file.name}")
 
     return files
 
 
+def sheet_layout(filepath: Path, state: str) -> Tuple[Union[int, str], int]:
+    """
+    Sheet and header row of a rate workbook.
+
+    Located from the top rows of the file (state_mappings.locate_header),
+    once per file per run, so title blocks above the header need no
+    skip_rows in the state config. Falls back to the configured sheet_name
+    and skip_rows when no row looks like a header.
+
+    Returns:
+        (sheet_name, skip_rows) for open_workbook / iter_sheet_chunks
+    """
+    key = (Path(filepath).resolve(), state)
+    if key not in _sheet_layouts:
+        config = get_state_config(state)
+        layout = (config.get("sheet_name", 0), config.get("skip_rows", 0))
+        located = locate_header(filepath, state)
+        if located is None:
+            logger.warning(f"{filepath.name}: no header row found in the first rows, "
+                           f"using sheet {layout[0]}, skip_rows {layout[1]}")
+        else:
+            if (located["sheet_name"], located["skip_rows"]) != layout:
+                logger.info(f"{filepath.name}: header found on sheet {located['sheet_name']}, "
+                            f"row {located['skip_rows'] + 1}")
+            layout = (located["sheet_name"], located["skip_rows"])
+        _sheet_layouts[key] = layout
+    return _sheet_layouts[key]
+
+
+# Located (sheet_name, skip_rows) per (file, state) for the current run
+_sheet_layouts: Dict[Tuple[Path, str], Tuple[Union[int, str], int]] = {}
+
+
 def scan_file(filepath: Path, state: str) -> Dict:
     """
     Scan a rate file and report detected columns.
@@ -191,16 +354,15 @@ def scan_file(filepath: Path, state: str) -> Dict:
     Returns:
         Dict with scan results
     """
-    config = get_state_config(state)
+    if filepath.suffix.lower() == ".csv":
+        return scan_compiled_csv(filepath, state)
 
     try:
-        df = pd.read_excel(
-            filepath,
-            sheet_name=config.get("sheet_name", 0),
-            nrows=5  # Just peek at first few rows
-        )
+        # Header sample and dimension-based row count - no full parse
+        sheet_name, skip_rows = sheet_layout(filepath, state)
+        workbook = open_workbook(filepath, sheet_name=sheet_name, skip_rows=skip_rows)
 
-        columns = list(df.columns)
+        columns = workbook.columns
         detected = detect_columns(state, columns)
         valid = validate_required_columns(detected)
 
@@ -218,7 +380,8 @@ def scan_file(filepath: Path, state: str) -> Dict:
             "columns_found": display_columns,
             "detected_mapping": detected,
             "valid": valid,
-            "row_count": len(pd.read_excel(filepath, sheet_name=config.get("sheet_name", 0))),
+            "row_count": workbook.row_count,
+            "header_row": skip_rows + 1,
             "error": None
         }
 
@@ -234,55 +397,96 @@ def scan_file(filepath: Path, state: str) -> Dict:
         }
 
 
-def process_file(filepath: Path, state: str) -> pd.DataFrame:
+def process_file(filepath: Path, state: str, use_cache: bool = True) -> "pd.DataFrame":
     """
     Process a rate file and return normalized DataFrame.
 
+    Unchanged workbooks are served from the parse cache (see parse_cache.py).
+
     Args:
-        filepath: Path to Excel file
+        filepath: Path to Excel file or compiled CSV
         state: State code
+        use_cache: If False, always re-parse the file
 
     Returns:
         Normalized DataFrame ready for insertion
     """
-    config = get_state_config(state)
+    if filepath.suffix.lower() == ".csv":
+        # Already normalized and fast to read - not worth caching
+        return read_compiled_csv(filepath, state)
 
-    # Read full file
-    df = pd.read_excel(
+    config = get_state_config(state)
+    return default_effective_date(cached_frame(
         filepath,
-        sheet_name=config.get("sheet_name", 0),
-        skiprows=config.get("skip_rows", 0)
-    )
+        f"process_file_{state}",
+        config_version(PROCESS_FILE_VERSION, config),
+        lambda: _parse_file(filepath, state, config),
+        use_cache=use_cache
+    ))
+
+
+def default_effective_date(df: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Date a sheet with no effective date column as of today.
+
+    Applied after the parse cache, so a cached parse is dated when it is
+    loaded, not when the workbook was first parsed.
+    """
+    if len(df) and df["effective_date"].isna().all():
+        df = df.copy()
+        df["effective_date"] = datetime.now().date()
+    return df
+
+
+def _parse_file(filepath: Path, state: str, config: Dict) -> "pd.DataFrame":
+    """Parse and normalize a rate file (uncached body of process_file)."""
+
+    # Read full file (shared with scan_file in the same run)
+    with stage("read") as timed:
+        sheet_name, skip_rows = sheet_layout(filepath, state)
+        df = open_workbook(filepath, sheet_name=sheet_name, skip_rows=skip_rows).frame()
+        timed.rows = len(df)
+
+    with stage("detect"):
+        detected = _detect_required(state, list(df.columns))
+
+    with stage("normalize") as timed:
+        normalized = _normalize_sheet(df, detected, state, filepath)
+        timed.rows = len(normalized)
+
+    with stage("dedupe") as timed:
+        cleaned = clean_rates(normalized)
+        timed.rows = len(cleaned)
+    return cleaned
+
 
-    # Detect columns
-    detected = detect_columns(state, list(df.columns))
+def _detect_required(state: str, columns: List) -> Dict:
+    """detect_columns, raising if a required column is missing."""
+    detected = detect_columns(state, columns)
 
     if not validate_required_columns(detected):
         raise ValueError(
             f"Missing required columns for {state}. "
             f"Detected: {detected}"
         )
+    return detected
+
+
+def _normalize_sheet(df: "pd.DataFrame", detected: Dict, state: str, filepath: Path) -> "pd.DataFrame":
+    """Map a sheet (or a chunk of one) onto the medicaid_rates columns."""
+    import pandas as pd
 
     # Build normalized dataframe - start with facility_name to set index length
     normalized = pd.DataFrame()
-    normalized["facility_name"] = df[detected["facility_name"]].astype(str).str.strip()
+    normalized["facility_name"] = _clean_names(df[detected["facility_name"]])
     normalized["state"] = state  # Now this will broadcast to all rows
 
-    # Daily rate - handle various formats
-    rate_col = detected["daily_rate"]
-    # Handle datetime column headers
-    rate_values = df[rate_col]
-    if hasattr(rate_values.iloc[0] if len(rate_values) > 0 else None, 'strip'):
-        normalized["daily_rate"] = pd.to_numeric(
-            rate_values.astype(str).str.replace(r'[\$,]', '', regex=True),
-            errors='coerce'
-        )
-    else:
-        normalized["daily_rate"] = pd.to_numeric(rate_values, errors='coerce')
+    # Daily rate - handle various formats (column may have a datetime header)
+    normalized["daily_rate"] = _parse_rates(df[detected["daily_rate"]])
 
     # Optional columns
     if detected.get("state_facility_id"):
-        normalized["state_facility_id"] = df[detected["state_facility_id"]].astype(str).str.strip()
+        normalized["state_facility_id"] = _clean_ids(df[detected["state_facility_id"]])
     else:
         normalized["state_facility_id"] = None
 
@@ -300,14 +504,45 @@ def process_file(filepath: Path, state: str) -> pd.DataFrame:
                 df[detected["effective_date"]], errors='coerce'
             ).dt.date
         except Exception:
-            normalized["effective_date"] = datetime.now().date()
+            normalized["effective_date"] = None
     else:
-        # Default to current date if not found
-        normalized["effective_date"] = datetime.now().date()
+        # Left empty so the cached frame carries no load date;
+        # default_effective_date fills it after the cache
+        normalized["effective_date"] = None
 
     normalized["rate_type"] = "total"
     normalized["source_file"] = filepath.name
 
+    return normalized
+
+
+def _clean_names(names: "pd.Series") -> "pd.Series":
+    """Stripped facility names; blank cells become "" (dropped by clean_rates), not "nan"."""
+    return names.astype("string").str.strip().fillna("").astype(str)
+
+
+def _clean_ids(ids: "pd.Series") -> "pd.Series":
+    """Stripped IDs without the ".0" of IDs pandas read as floats; blanks as None."""
+    ids = ids.astype("string").str.strip().str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+    return ids.astype(object).where(ids.notna(), None)
+
+
+def _parse_rates(values: "pd.Series") -> "pd.Series":
+    """Numeric rates from a rate column."""
+    import pandas as pd
+
+    # Any text in the column (e.g. "$1,234.56") - decided by dtype rather
+    # than the first value so every streamed chunk is parsed the same way
+    if not pd.api.types.is_numeric_dtype(values):
+        return pd.to_numeric(
+            values.astype(str).str.replace(r'[\$,]', '', regex=True),
+            errors='coerce'
+        )
+    return pd.to_numeric(values, errors='coerce')
+
+
+def clean_rates(normalized: "pd.DataFrame") -> "pd.DataFrame":
+    """Drop invalid rates, blank names and duplicate facilities (keep first)."""
     # Clean up - remove rows with invalid rates
     normalized = normalized[normalized["daily_rate"].notna()]
     normalized = normalized[normalized["daily_rate"] > 0]
@@ -322,17 +557,466 @@ def process_file(filepath: Path, state: str) -> pd.DataFrame:
     return normalized
 
 
+def _read_csv(filepath: Path) -> "pd.DataFrame":
+    """
+    Read a compiled CSV as strings with pyarrow's CSV reader.
+
+    Every column is declared a string up front: pandas' pyarrow engine with
+    dtype=str infers numbers first and casts back, losing the leading zeros
+    of IDs like 031140.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    columns = pd.read_csv(filepath, nrows=0).columns
+    table = pa_csv.read_csv(
+        filepath,
+        convert_options=pa_csv.ConvertOptions(
+            column_types={column: pa.string() for column in columns},
+            strings_can_be_null=True
+        )
+    )
+    return table.to_pandas()
+
+
+def read_compiled_csv(filepath: Path, state: str) -> "pd.DataFrame":
+    """
+    Read a normalized XX_YYYY-MM_rates.csv into the process_file layout.
+
+    Rows without an effective_date get the period from the filename.
+
+    Args:
+        filepath: Path to compiled CSV
+        state: State code (from the filename)
+
+    Returns:
+        Normalized DataFrame ready for insertion
+    """
+    with stage("read") as timed:
+        df = _read_csv(filepath)
+        timed.rows = len(df)
+
+    with stage("normalize") as timed:
+        normalized = _normalize_compiled(df, filepath, state)
+        timed.rows = len(normalized)
+
+    with stage("dedupe") as timed:
+        cleaned = clean_rates(normalized)
+        timed.rows = len(cleaned)
+    return cleaned
+
+
+def _normalize_compiled(df: "pd.DataFrame", filepath: Path, state: str) -> "pd.DataFrame":
+    """Map compiled CSV rows (or a chunk of them) onto the medicaid_rates columns."""
+    import pandas as pd
+
+    parsed = parse_compiled_filename(filepath)
+    period = parsed[1] if parsed else datetime.now().date()
+
+    if "state" in df.columns:
+        other = set(df["state"].dropna().str.strip().str.upper()) - {state}
+        if other:
+            logger.warning(f"{filepath.name}: rows for {sorted(other)} loaded as {state}")
+
+    normalized = pd.DataFrame()
+    normalized["facility_name"] = df["facility_name"].fillna("").str.strip()
+    normalized["state"] = state
+    normalized["daily_rate"] = pd.to_numeric(
+        df["daily_rate"].str.replace(r'[\$,]', '', regex=True),
+        errors='coerce'
+    )
+
+    id_col = next((col for col in COMPILED_ID_COLUMNS if col in df.columns), None)
+    if id_col:
+        # IDs that went through a float column ("206344001.0")
+        normalized["state_facility_id"] = (
+            df[id_col].str.strip().str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+        )
+    else:
+        normalized["state_facility_id"] = None
+
+    if "effective_date" in df.columns:
+        effective = pd.to_datetime(df["effective_date"], errors='coerce')
+        normalized["effective_date"] = [
+            value.date() if pd.notna(value) else period for value in effective
+        ]
+    else:
+        normalized["effective_date"] = period
+
+    normalized["rate_type"] = COMPILED_RATE_TYPES.get(state, "total")
+    if "source_file" in df.columns:
+        normalized["source_file"] = df["source_file"].fillna(filepath.name)
+    else:
+        normalized["source_file"] = filepath.name
+
+    return normalized
+
+
+def iter_process_file(
+    filepath: Path,
+    state: str,
+    chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator["pd.DataFrame"]:
+    """
+    Streaming process_file: yield the normalized rates in chunks.
+
+    Workbooks are read row by row (see workbook_reader.iter_sheet_chunks)
+    and compiled CSVs with a chunked reader, so memory stays flat however
+    large the file is. Duplicates are dropped across chunks with a rolling
+    set of facility names seen so far (keep first, as process_file does).
+    The parse cache is not used.
+
+    Args:
+        filepath: Path to Excel file or compiled CSV
+        state: State code
+        chunk_size: Rows per chunk
+
+    Yields:
+        Normalized DataFrames ready for insertion
+    """
+    if filepath.suffix.lower() == ".csv":
+        chunks = _iter_csv_normalized(filepath, state, chunk_size)
+    else:
+        chunks = _iter_sheet_normalized(filepath, state, chunk_size)
+
+    seen = set()
+    for chunk in chunks:
+        with stage("dedupe") as timed:
+            chunk = clean_rates(chunk)
+            chunk = chunk[~chunk["facility_name"].isin(seen)]
+            seen.update(chunk["facility_name"])
+            timed.rows = len(chunk)
+        if len(chunk):
+            yield chunk
+
+
+def _iter_csv_normalized(filepath: Path, state: str, chunk_size: int) -> Iterator["pd.DataFrame"]:
+    """Normalized chunks of a compiled CSV."""
+    import pandas as pd
+
+    for raw in timed_iter(pd.read_csv(filepath, dtype=str, chunksize=chunk_size), "read"):
+        with stage("normalize") as timed:
+            normalized = _normalize_compiled(raw, filepath, state)
+            timed.rows = len(normalized)
+        yield normalized
+
+
+def _iter_sheet_normalized(filepath: Path, state: str, chunk_size: int) -> Iterator["pd.DataFrame"]:
+    """Normalized chunks of a workbook, detecting columns from the header once."""
+    detected = None
+    with stage("read"):
+        sheet_name, skip_rows = sheet_layout(filepath, state)
+    raw_chunks = iter_sheet_chunks(
+        filepath, sheet_name=sheet_name, skip_rows=skip_rows, chunk_rows=chunk_size
+    )
+    for raw in timed_iter(raw_chunks, "read"):
+        if detected is None:
+            with stage("detect"):
+                detected = _detect_required(state, list(raw.columns))
+        with stage("normalize") as timed:
+            normalized = default_effective_date(_normalize_sheet(raw, detected, state, filepath))
+            timed.rows = len(normalized)
+        yield normalized
+
+
+def process_file_periods(filepath: Path, state: str, use_cache: bool = True) -> "pd.DataFrame":
+    """
+    Process every period in a rate file, for historical backfill.
+
+    Wide workbooks with one rate column per period (date headers such as
+    7/1/2025, or Rate_2025_07 - see state_mappings.find_period_columns)
+    are melted into one row per facility per period. Compiled CSVs already
+    carry an effective_date per row.
+
+    Args:
+        filepath: Path to Excel file or compiled CSV
+        state: State code
+        use_cache: If False, always re-parse the file
+
+    Returns:
+        Long DataFrame with one row per facility per effective_date
+    """
+    if filepath.suffix.lower() == ".csv":
+        return read_compiled_csv(filepath, state)
+
+    config = get_state_config(state)
+    return cached_frame(
+        filepath,
+        f"process_file_periods_{state}",
+        config_version(PROCESS_FILE_VERSION, config),
+        lambda: _parse_file_periods(filepath, state, config),
+        use_cache=use_cache
+    )
+
+
+def _parse_file_periods(filepath: Path, state: str, config: Dict) -> "pd.DataFrame":
+    """Uncached body of process_file_periods for workbooks."""
+    with stage("read") as timed:
+        sheet_name, skip_rows = sheet_layout(filepath, state)
+        df = open_workbook(filepath, sheet_name=sheet_name, skip_rows=skip_rows).frame()
+        timed.rows = len(df)
+
+    with stage("detect"):
+        columns = list(df.columns)
+        detected = detect_columns(state, columns)
+        period_columns = find_period_columns(columns)
+
+    if not detected.get("facility_name") or not period_columns:
+        raise ValueError(
+            f"{filepath.name}: backfill needs a facility name column and dated rate "
+            f"columns. Detected: {detected}, periods: {[col for col, _ in period_columns]}"
+        )
+
+    with stage("normalize") as timed:
+        melted = melt_rate_periods(df, detected, period_columns, state, filepath)
+        timed.rows = len(melted)
+    return melted
+
+
+def melt_rate_periods(
+    df: "pd.DataFrame",
+    detected: Dict,
+    period_columns: List[Tuple],
+    state: str,
+    filepath: Path
+) -> "pd.DataFrame":
+    """
+    Melt wide period rate columns into long form in one vectorized pass.
+
+    Args:
+        df: Wide sheet
+        detected: detect_columns result (facility_name, state_facility_id)
+        period_columns: (column, period date) pairs from find_period_columns
+        state: State code
+        filepath: Source file (for source_file)
+
+    Returns:
+        One row per facility per period with a valid rate
+    """
+    import pandas as pd
+
+    wide = pd.DataFrame({"facility_name": _clean_names(df[detected["facility_name"]])})
+    if detected.get("state_facility_id"):
+        wide["state_facility_id"] = _clean_ids(df[detected["state_facility_id"]])
+    else:
+        wide["state_facility_id"] = None
+
+    # Positional names avoid clashes between datetime and text headers
+    value_names = [f"_period_{i}" for i in range(len(period_columns))]
+    for name, (column, _) in zip(value_names, period_columns):
+        wide[name] = df[column].to_numpy()
+
+    long = wide.melt(
+        id_vars=["facility_name", "state_facility_id"],
+        value_vars=value_names,
+        var_name="effective_date",
+        value_name="daily_rate"
+    )
+    periods = {
+        name: period.date() if hasattr(period, "date") else period
+        for name, (_, period) in zip(value_names, period_columns)
+    }
+    long["effective_date"] = long["effective_date"].map(periods)
+    long["daily_rate"] = _parse_rates(long["daily_rate"])
+    long["state"] = state
+    long["rate_type"] = "total"
+    long["source_file"] = filepath.name
+
+    long = long[long["daily_rate"].notna() & (long["daily_rate"] > 0)]
+    long = long[long["facility_name"].str.len() > 0]
+    return long.drop_duplicates(subset=["facility_name", "effective_date"], keep="first")
+
+
+def scan_compiled_csv(filepath: Path, state: str) -> Dict:
+    """scan_file for a compiled CSV (fixed, already-normalized columns)."""
+    try:
+        df = _read_csv(filepath)
+        columns = list(df.columns)
+
+        detected = {
+            "facility_name": "facility_name" if "facility_name" in columns else None,
+            "daily_rate": "daily_rate" if "daily_rate" in columns else None,
+            "state_facility_id": next((c for c in COMPILED_ID_COLUMNS if c in columns), None),
+            "effective_date": "effective_date" if "effective_date" in columns else None,
+        }
+
+        return {
+            "state": state,
+            "file": filepath.name,
+            "columns_found": columns,
+            "detected_mapping": detected,
+            "valid": validate_required_columns(detected),
+            "row_count": len(df),
+            "error": None
+        }
+
+    except Exception as e:
+        return {
+            "state": state,
+            "file": filepath.name,
+            "columns_found": [],
+            "detected_mapping": {},
+            "valid": False,
+            "row_count": 0,
+            "error": str(e)
+        }
+
+
+# ============================================
+# PARSE PIPELINE
+# ============================================
+
+def _parse_in_worker(filepath: Path, state: str, use_cache: bool, backfill: bool = False) -> Dict:
+    """Parse one file, returning the frame (or the error), the parse time and its stages."""
+    parse = process_file_periods if backfill else process_file
+    timer = StageTimer()
+    start = time.perf_counter()
+    try:
+        with timer.activate():
+            df, error = parse(filepath, state, use_cache=use_cache), None
+    except Exception as e:
+        df, error = None, str(e)
+    finally:
+        release_workbook(filepath)
+    parse_seconds = time.perf_counter() - start
+
+    if df is not None and not timer.stages:
+        # Parse cache hit - the whole parse was one read
+        timer.add("read", parse_seconds, len(df))
+
+    return {
+        "state": state,
+        "filepath": filepath,
+        "df": df,
+        "error": error,
+        "parse_seconds": parse_seconds,
+        "stages": timer.stages,
+    }
+
+
+def iter_parsed_files(
+    files: Dict[str, Path],
+    use_cache: bool = True,
+    jobs: int = 1,
+    backfill: bool = False
+) -> Iterator[Dict]:
+    """
+    Parse rate files and yield each result as it becomes available.
+
+    With jobs > 1 a process pool parses files while the caller writes the
+    previous ones: a feeder thread keeps up to jobs files in flight and
+    hands finished frames to the caller through a bounded queue, so at
+    most jobs * (1 + PIPELINE_QUEUE_PER_JOB) frames are held in memory.
+    Files are submitted largest first and yielded in completion order.
+    With backfill=True files go through process_file_periods instead.
+
+    Yields:
+        Dict with state, filepath, df (None on error), error, parse_seconds
+        and stages (the parse's StageTimer.stages)
+    """
+    states = sorted(files, key=lambda st: files[st].stat().st_size, reverse=True)
+
+    if jobs <= 1 or len(states) <= 1:
+        for state in sorted(states):
+            yield _parse_in_worker(files[state], state, use_cache, backfill)
+        return
+
+    jobs = min(jobs, len(states))
+    parsed: queue.Queue = queue.Queue(maxsize=jobs * PIPELINE_QUEUE_PER_JOB)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        # Blocks while the writer is behind; gives up once the consumer is gone
+        while not stop.is_set():
+            try:
+                parsed.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def feed():
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                pending = set()
+                remaining = iter(states)
+                for state in remaining:
+                    pending.add(executor.submit(
+                        _parse_in_worker, files[state], state, use_cache, backfill
+                    ))
+                    if len(pending) >= jobs:
+                        break
+
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        if not put(future.result()):
+                            for future in pending:
+                                future.cancel()
+                            return
+                        state = next(remaining, None)
+                        if state is not None:
+                            pending.add(executor.submit(
+                                _parse_in_worker, files[state], state, use_cache, backfill
+                            ))
+            put(done)
+        except Exception as e:
+            # e.g. a worker died - surface it in the writer
+            put(e)
+
+    feeder = threading.Thread(target=feed, name="rate-parse-feeder", daemon=True)
+    feeder.start()
+    try:
+        while True:
+            item = parsed.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        feeder.join()
+
+
+def iter_streamed_files(files: Dict[str, Path]) -> Iterator[Dict]:
+    """
+    iter_parsed_files for streaming mode: each item carries a lazy chunk
+    iterator instead of a parsed frame, consumed by the writer itself.
+    """
+    for state in sorted(files):
+        yield {
+            "state": state,
+            "filepath": files[state],
+            "df": None,
+            "chunks": iter_process_file(files[state], state),
+            "error": None,
+            "parse_seconds": 0.0,
+            "stages": {},
+        }
+
+
 # ============================================
 # MAIN OPERATIONS
 # ============================================
 
-def scan_only(directory: Path):
+def _select_state(files: Dict[str, Path], state: Optional[str]) -> Dict[str, Path]:
+    """Limit found files to one state when --state is given."""
+    if not state:
+        return files
+    state = state.upper()
+    return {state: files[state]} if state in files else {}
+
+
+def scan_only(directory: Path, state: Optional[str] = None):
     """Scan all files and report column mappings."""
     print("\n" + "=" * 70)
     print("MEDICAID RATES FILE SCAN")
     print("=" * 70)
 
-    files = find_rate_files(directory)
+    files = _select_state(find_rate_files(directory), state)
 
     if not files:
         print(f"\nNo files found in: {directory}")
@@ -355,6 +1039,8 @@ def scan_only(directory: Path):
         print(f"\n=== {state} - {result['file']} ===")
         print(f"Status: {status}")
         print(f"Rows: {result['row_count']}")
+        if result.get("header_row", 1) > 1:
+            print(f"Header row: {result['header_row']}")
 
         if result["error"]:
             print(f"Error: {result['error']}")
@@ -385,13 +1071,34 @@ def scan_only(directory: Path):
     print("=" * 70)
 
 
-def execute_load(directory: Path):
-    """Load all valid files to database."""
+def execute_load(
+    directory: Path,
+    use_cache: bool = True,
+    jobs: int = 1,
+    stream: bool = False,
+    backfill: bool = False,
+    state: Optional[str] = None
+):
+    """
+    Load all valid files to database.
+
+    Files are parsed by iter_parsed_files (in a process pool when jobs > 1)
+    while this process, the only one holding a DB connection, loads them.
+    Each file replaces its state's current rates through a staged reload
+    (reload_rates), published as one upsert transaction. With stream=True
+    each file is instead read and inserted chunk by chunk in this process
+    (iter_process_file), keeping memory flat. With backfill=True every
+    period in each file is loaded as history (process_file_periods +
+    rate_loader.backfill_rates).
+
+    Stage timings (see etl_metrics) are written to a JSONL metrics file
+    and, per state, to medicaid_rate_collection_log.
+    """
     print("\n" + "=" * 70)
     print("MEDICAID RATES ETL - EXECUTE MODE")
     print("=" * 70)
 
-    files = find_rate_files(directory)
+    files = _select_state(find_rate_files(directory), state)
     if not files:
         print(f"\nNo files found in: {directory}")
         return
@@ -400,32 +1107,96 @@ def execute_load(directory: Path):
     total_loaded = 0
     states_loaded = []
     states_failed = []
-
-    for state in sorted(files.keys()):
-        filepath = files[state]
-        print(f"\nProcessing {state}...")
+    metrics = RunMetrics("load_medicaid_rates")
+    parse_seconds = 0.0
+    waited = 0.0
+
+    if stream:
+        if jobs > 1:
+            logger.warning("--stream parses in the writer process; ignoring --jobs")
+        jobs = 1
+        print(f"Streaming files in chunks of {STREAM_CHUNK_SIZE:,} rows")
+        parsed_files = iter_streamed_files(files)
+    else:
+        print(f"Parse jobs: {jobs}")
+        parsed_files = iter_parsed_files(files, use_cache=use_cache, jobs=jobs, backfill=backfill)
+    while True:
+        # Time the writer spends waiting on the parsers
+        wait_start = time.perf_counter()
+        result = next(parsed_files, None)
+        waited += time.perf_counter() - wait_start
+        if result is None:
+            break
+
+        state, filepath = result["state"], result["filepath"]
+        parse_seconds += result["parse_seconds"]
+        timer = metrics.timer_for(state)
+        timer.merge(result["stages"])
+        if stream:
+            print(f"\nProcessing {state}... (streaming)")
+        else:
+            print(f"\nProcessing {state}... (parsed in {result['parse_seconds']:.2f}s)")
 
         try:
-            df = process_file(filepath, state)
-            rows = insert_rates(conn, df)
-            log_collection(conn, state, "success", 1, rows)
-
-            print(f"  Loaded {rows:,} rates from {filepath.name}")
+            if result["error"]:
+                raise ValueError(result["error"])
+
+            with timer.activate():
+                if backfill:
+                    with stage("insert") as timed:
+                        loaded = backfill_rates(
+                            conn, state, result["df"],
+                            overrides={"data_source": "state_medicaid_compiled"}
+                        )
+                        timed.rows = loaded["inserted"]
+                    rows = loaded["inserted"]
+                    print(f"  {loaded['periods']} periods -> {loaded['runs']:,} rate runs "
+                          f"({loaded['already_loaded']:,} already loaded, "
+                          f"{loaded['extended']:,} extended existing rows, "
+                          f"{loaded['end_dates_updated']:,} rows updated)")
+                else:
+                    reloaded = reload_rates(
+                        conn, state, result["chunks"] if stream else result["df"]
+                    )
+                    rows = reloaded["inserted"]
+                    print(f"  Published in {reloaded['publish_seconds'] * 1000:.0f} ms, "
+                          f"closed {reloaded['closed']:,} previous rates, "
+                          f"{reloaded['unchanged']:,} unchanged, {reloaded['stale']:,} stale")
+
+                print(f"  Loaded {rows:,} rates from {filepath.name}")
+
+                with stage("match") as timed:
+                    carried = carry_forward_matches(conn, state)
+                    timed.rows = carried["facility_id"] + carried["name"]
+                print(f"  Carried forward {carried['facility_id'] + carried['name']:,} matches "
+                      f"({carried['unmatched']:,} left for match_facilities.py)")
+
+            record = metrics.finish_state(state, "success", rows=rows, file=filepath.name)
+            log_collection(conn, state, "success", 1, rows, metrics=record)
+            print(f"  {record['seconds']:.2f}s in stages"
+                  + (f", {record['rows_per_sec']:,.0f} rows/sec" if record["rows_per_sec"] else ""))
             total_loaded += rows
             states_loaded.append(state)
 
         except Exception as e:
             logger.error(f"  Failed: {e}")
-            log_collection(conn, state, "failed", 1, 0, str(e))
+            record = metrics.finish_state(state, "failed", error=str(e), file=filepath.name)
+            log_collection(conn, state, "failed", 1, 0, str(e), metrics=record)
             states_failed.append(state)
 
     conn.close()
+    run = metrics.close(jobs=jobs, stream=stream, backfill=backfill)
 
     print("\n" + "-" * 70)
     print(f"RESULTS:")
-    print(f"  Loaded: {', '.join(states_loaded)} ({len(states_loaded)} states)")
-    print(f"  Failed: {', '.join(states_failed) if states_failed else 'None'}")
+    print(f"  Loaded: {', '.join(sorted(states_loaded))} ({len(states_loaded)} states)")
+    print(f"  Failed: {', '.join(sorted(states_failed)) if states_failed else 'None'}")
     print(f"  Total rates: {total_loaded:,}")
+    print(f"  Elapsed: {run['seconds']:.2f}s")
+    metrics.print_stages()
+    if not stream:
+        print(f"  Parse total:  {parse_seconds:8.2f}s (summed over {jobs} job(s))")
+    print(f"  Writer waited:{waited:8.2f}s")
     print("=" * 70)
 
 
@@ -499,6 +1270,10 @@ Examples:
     python load_medicaid_rates.py --execute
     python load_medicaid_rates.py --report-unmatched
     python load_medicaid_rates.py --directory /path/to/files --scan-only
+    python load_medicaid_rates.py --execute --no-cache
+    python load_medicaid_rates.py --execute --jobs 4
+    python load_medicaid_rates.py --execute --stream
+    python load_medicaid_rates.py --execute --backfill --state MO
         """
     )
 
@@ -523,8 +1298,8 @@ Examples:
     parser.add_argument(
         "--directory",
         type=Path,
-        default=COMPILED_RATES_DIR,
-        help=f"Directory containing rate files (default: {COMPILED_RATES_DIR})"
+        default=COMPILED_DIR,
+        help=f"Directory containing rate files (default: {COMPILED_DIR})"
     )
 
     parser.add_argument(
@@ -533,8 +1308,36 @@ Examples:
         help="Process only a specific state (e.g., FL)"
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse every file instead of using the parse cache"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for parsing files in parallel (default: 1)"
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read and insert each file in fixed-size chunks (flat memory, no parse cache)"
+    )
+
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Load every dated rate column of each file as rate history"
+    )
+
     args = parser.parse_args()
 
+    if args.stream and args.backfill:
+        parser.error("--stream and --backfill cannot be combined")
+
     if not any([args.scan_only, args.execute, args.report_unmatched]):
         parser.print_help()
         print("\nError: Must specify --scan-only, --execute, or --report-unmatched")
@@ -544,9 +1347,12 @@ Examples:
     directory = args.directory
 
     if args.scan_only:
-        scan_only(directory)
+        scan_only(directory, state=args.state)
     elif args.execute:
-        execute_load(directory)
+        execute_load(
+            directory, use_cache=not args.no_cache, jobs=args.jobs, stream=args.stream,
+            backfill=args.backfill, state=args.state
+        )
     elif args.report_unmatched:
         report_unmatched()
 
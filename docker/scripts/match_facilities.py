@@ -1,28 +1,55 @@
 #!/usr/bin/env python3
 """
 Facility Name Matching Script
-Matches medicaid_rates facilities to property_master using fuzzy matching.
+Matches medicaid_rates facilities to property_master - first on exact IDs
+(NPI / CCN in state_facility_id), then by fuzzy name matching.
 
 Usage:
     python match_facilities.py --preview        # Preview matches without updating
     python match_facilities.py --execute        # Execute matching and update database
     python match_facilities.py --state FL       # Match only specific state
     python match_facilities.py --threshold 85   # Custom match threshold
+    python match_facilities.py --engine batch   # Score each state in one cdist call
+    python match_facilities.py --blocking       # Only score candidates sharing a rare token/city
+    python match_facilities.py --jobs 4         # Match states in 4 worker processes
+    python match_facilities.py --prefetch       # Load all states in two queries up front
+    python match_facilities.py --seed-memory    # Build match memory from matched rates
 
 Dependencies:
-    pip install mysql-connector-python rapidfuzz
+    pip install mysql-connector-python rapidfuzz numpy
 """
 
 import argparse
+import atexit
+import multiprocessing.util
 import os
-import re
 import sys
-from typing import Dict, List, Optional, Tuple
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
 import logging
 
 import mysql.connector
 from mysql.connector import Error
-from rapidfuzz import fuzz, process
+
+if TYPE_CHECKING:
+    import numpy as np
+
+try:
+    from candidate_blocking import CandidateBlocker
+    from etl_metrics import RunMetrics, StageTimer
+    from match_memory import normalize_facility_id, remember_matches, seed_match_memory
+    from name_normalizer import normalize_facility_name
+    from state_mappings import get_state_config
+except ImportError:
+    # If running from different directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from candidate_blocking import CandidateBlocker
+    from etl_metrics import RunMetrics, StageTimer
+    from match_memory import normalize_facility_id, remember_matches, seed_match_memory
+    from name_normalizer import normalize_facility_name
+    from state_mappings import get_state_config
 
 # ============================================
 # CONFIGURATION
@@ -40,27 +67,21 @@ DB_CONFIG = {
 # Matching thresholds
 DEFAULT_THRESHOLD = 85  # Minimum fuzzy match score
 HIGH_CONFIDENCE_THRESHOLD = 95  # Auto-accept threshold
+# Minimum name score for a CCN-shaped ID hit in states whose IDs are not
+# flagged as CCNs (ids_are_ccns in state_mappings.STATE_CONFIGS)
+ID_NAME_FLOOR = 60
+
+# Matching engines: "legacy" scores one rate name at a time with
+# process.extract, "batch" scores a whole state with one process.cdist call
+MATCH_ENGINES = ["legacy", "batch"]
+DEFAULT_ENGINE = "legacy"
+FUZZY_TOP_K = 3  # Candidates considered per rate name
 
-# Common nursing facility name variations to normalize
-NAME_NORMALIZATIONS = [
-    (r'\bskilled nursing facility\b', 'snf', re.IGNORECASE),
-    (r'\bnursing home\b', 'nh', re.IGNORECASE),
-    (r'\bnursing center\b', 'nc', re.IGNORECASE),
-    (r'\brehabilitation\b', 'rehab', re.IGNORECASE),
-    (r'\bhealthcare\b', 'hc', re.IGNORECASE),
-    (r'\bhealth care\b', 'hc', re.IGNORECASE),
-    (r'\bhealth center\b', 'hc', re.IGNORECASE),
-    (r'\bcommunity\b', 'comm', re.IGNORECASE),
-    (r'\bassisted living\b', 'al', re.IGNORECASE),
-    (r'\blong term care\b', 'ltc', re.IGNORECASE),
-    (r'\bltc\b', 'ltc', re.IGNORECASE),
-    (r'\bllc\b', '', re.IGNORECASE),
-    (r'\binc\.?\b', '', re.IGNORECASE),
-    (r'\bcorp\.?\b', '', re.IGNORECASE),
-    (r'\bthe\b', '', re.IGNORECASE),
-    (r'[,\.\-\'\"]+', ' ', 0),  # Remove punctuation
-    (r'\s+', ' ', 0),  # Collapse whitespace
-]
+# Rows per executemany batch when writing matches back
+MATCH_WRITE_CHUNK_SIZE = 1000
+
+# Rows per fetchmany call when prefetching all states
+PREFETCH_BATCH_SIZE = 10000
 
 # Logging configuration
 logging.basicConfig(
@@ -75,31 +96,14 @@ logger = logging.getLogger(__name__)
 # NAME NORMALIZATION
 # ============================================
 
-def normalize_facility_name(name: str) -> str:
-    """
-    Normalize facility name for matching.
-    Removes common suffixes, standardizes abbreviations, etc.
-    """
-    if not name:
-        return ""
-
-    normalized = name.strip().lower()
-
-    for pattern, replacement, flags in NAME_NORMALIZATIONS:
-        if flags:
-            normalized = re.sub(pattern, replacement, normalized, flags=flags)
-        else:
-            normalized = re.sub(pattern, replacement, normalized)
-
-    return normalized.strip()
-
-
 def get_name_tokens(name: str) -> set:
     """Extract significant tokens from a name."""
-    normalized = normalize_facility_name(name)
-    tokens = set(normalized.split())
-    # Remove very short tokens
-    return {t for t in tokens if len(t) > 2}
+    return _significant_tokens(normalize_facility_name(name))
+
+
+def _significant_tokens(normalized: str) -> set:
+    """Tokenize an already-normalized name, dropping very short tokens."""
+    return {t for t in normalized.split() if len(t) > 2}
 
 
 # ============================================
@@ -117,6 +121,29 @@ def get_db_connection():
         raise
 
 
+def get_states_to_match(conn, state: Optional[str] = None) -> List[str]:
+    """
+    States with unmatched rates, largest first.
+
+    Largest-first ordering keeps a worker pool busy: NY, OH, PA and IL are
+    started before the small states instead of finishing last.
+    """
+    if state:
+        return [state]
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT state, COUNT(*) AS unmatched
+        FROM medicaid_rates
+        WHERE property_master_id IS NULL
+        GROUP BY state
+        ORDER BY unmatched DESC, state
+    """)
+    states = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return states
+
+
 def get_unmatched_rates(conn, state: Optional[str] = None) -> List[Dict]:
     """Get medicaid_rates records without property_master match."""
     cursor = conn.cursor(dictionary=True)
@@ -153,36 +180,376 @@ def get_property_master_facilities(conn, state: str) -> List[Dict]:
     return results
 
 
-def update_match(conn, rate_id: int, property_id: int, ccn: str = None):
-    """Update medicaid_rates record with property_master match."""
+def get_property_npis(conn, state: str) -> List[Tuple[str, str]]:
+    """Get (npi, ccn) pairs from CMS enrollments for a state's properties."""
     cursor = conn.cursor()
 
     cursor.execute("""
-        UPDATE medicaid_rates
-        SET property_master_id = %s, ccn = %s, verified = FALSE
-        WHERE id = %s
-    """, (property_id, ccn, rate_id))
+        SELECT DISTINCT TRIM(e.npi), pm.ccn
+        FROM property_master pm
+        JOIN cms_enrollments_staging e ON TRIM(e.ccn) = pm.ccn
+        WHERE pm.state = %s
+          AND e.npi IS NOT NULL AND TRIM(e.npi) != ''
+    """, (state,))
 
-    conn.commit()
+    results = cursor.fetchall()
     cursor.close()
+    return results
+
+
+def update_matches(
+    conn,
+    matches: List[Tuple[int, int, Optional[str]]],
+    mark_unverified: bool = True
+) -> int:
+    """
+    Write matches back to medicaid_rates in one transaction.
+
+    Matches are staged in a temporary table with chunked executemany
+    (sent as multi-row INSERTs) and applied with a single joined UPDATE,
+    instead of one UPDATE and commit per rate.
+
+    Args:
+        conn: Database connection
+        matches: (rate_id, property_master_id, ccn) tuples
+        mark_unverified: Also reset verified = FALSE on matched rows
+
+    Returns:
+        Number of medicaid_rates rows changed
+    """
+    if not matches:
+        return 0
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS tmp_rate_matches")
+        cursor.execute("""
+            CREATE TEMPORARY TABLE tmp_rate_matches (
+                rate_id INT UNSIGNED NOT NULL PRIMARY KEY,
+                property_master_id INT UNSIGNED NOT NULL,
+                ccn VARCHAR(10) NULL
+            )
+        """)
+
+        insert_sql = """
+            INSERT INTO tmp_rate_matches (rate_id, property_master_id, ccn)
+            VALUES (%s, %s, %s)
+        """
+        for start in range(0, len(matches), MATCH_WRITE_CHUNK_SIZE):
+            cursor.executemany(insert_sql, matches[start:start + MATCH_WRITE_CHUNK_SIZE])
+
+        verified_sql = ", mr.verified = FALSE" if mark_unverified else ""
+        cursor.execute(f"""
+            UPDATE medicaid_rates mr
+            JOIN tmp_rate_matches t ON t.rate_id = mr.id
+            SET mr.property_master_id = t.property_master_id,
+                mr.ccn = t.ccn{verified_sql}
+        """)
+        updated = cursor.rowcount
+
+        cursor.execute("DROP TEMPORARY TABLE tmp_rate_matches")
+        conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return updated
+
+
+# ============================================
+# PREFETCH
+# ============================================
+
+class ColumnBatch:
+    """
+    Column-oriented rows for one state.
+
+    Holds each column as one list (ids as an int64 array) rather than a
+    dict per row, so every state can sit in memory at once and be pickled
+    cheaply to pool workers. rows() rebuilds dict rows for the matcher.
+    """
+
+    __slots__ = ("columns", "data")
+
+    def __init__(self, columns: Tuple[str, ...]):
+        self.columns = columns
+        self.data = {
+            column: array("q") if column == "id" else []
+            for column in columns
+        }
+
+    def append(self, values: Tuple):
+        for column, value in zip(self.columns, values):
+            self.data[column].append(value)
+
+    def __len__(self) -> int:
+        return len(self.data[self.columns[0]])
+
+    def rows(self) -> List[Dict]:
+        return [
+            dict(zip(self.columns, values))
+            for values in zip(*(self.data[column] for column in self.columns))
+        ]
+
+
+RATE_COLUMNS = ("id", "state", "facility_name", "state_facility_id")
+PROPERTY_COLUMNS = ("id", "ccn", "facility_name", "city", "zip")
+
+
+def _stream_rows(cursor) -> Iterator[Tuple]:
+    """Yield rows from an executed cursor in fetchmany batches."""
+    while True:
+        batch = cursor.fetchmany(PREFETCH_BATCH_SIZE)
+        if not batch:
+            return
+        yield from batch
+
+
+def prefetch_state_data(conn, state: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Load unmatched rates and properties for every state up front.
+
+    Replaces the per-state get_unmatched_rates / get_property_master_facilities
+    / get_property_npis round trips with one streaming query each.
+
+    Args:
+        conn: Database connection
+        state: Limit the prefetch to one state
+
+    Returns:
+        {state: {"rates": ColumnBatch, "properties": ColumnBatch,
+                 "npis": [(npi, ccn), ...]}} for states with unmatched rates
+    """
+    state_sql = " AND {col} = %s" if state else ""
+    params = (state,) if state else ()
+    data: Dict[str, Dict] = {}
+
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT id, state, facility_name, state_facility_id
+        FROM medicaid_rates
+        WHERE property_master_id IS NULL
+    """ + state_sql.format(col="state"), params)
+    for row in _stream_rows(cursor):
+        if row[1] not in data:
+            data[row[1]] = {
+                "rates": ColumnBatch(RATE_COLUMNS),
+                "properties": ColumnBatch(PROPERTY_COLUMNS),
+                "npis": [],
+            }
+        data[row[1]]["rates"].append(row)
+
+    cursor.execute("""
+        SELECT id, ccn, facility_name, city, zip, state
+        FROM property_master
+        WHERE state IS NOT NULL
+    """ + state_sql.format(col="state"), params)
+    for row in _stream_rows(cursor):
+        if row[5] in data:
+            data[row[5]]["properties"].append(row[:5])
+
+    cursor.execute("""
+        SELECT DISTINCT TRIM(e.npi), pm.ccn, pm.state
+        FROM property_master pm
+        JOIN cms_enrollments_staging e ON TRIM(e.ccn) = pm.ccn
+        WHERE e.npi IS NOT NULL AND TRIM(e.npi) != ''
+    """ + state_sql.format(col="pm.state"), params)
+    for npi, ccn, st in _stream_rows(cursor):
+        if st in data:
+            data[st]["npis"].append((npi, ccn))
+
+    cursor.close()
+    return data
+
+
+def states_by_size(prefetched: Dict[str, Dict]) -> List[str]:
+    """Prefetched states, most unmatched rates first (as get_states_to_match)."""
+    return sorted(prefetched, key=lambda st: (-len(prefetched[st]["rates"]), st))
 
 
 # ============================================
 # MATCHING LOGIC
 # ============================================
 
+class FacilityIdCrosswalk:
+    """
+    Exact-ID lookup from rate file IDs to property_master facilities.
+
+    Rate files carry NPIs (VA, RI, CO, IA) or six-character provider
+    numbers in state_facility_id. NPIs resolve through
+    cms_enrollments_staging. Six-character IDs resolve directly as CCNs
+    only in states whose config sets ids_are_ccns; elsewhere (FL, AK, KS
+    and HI state IDs share the shape) a CCN hit also needs the names to
+    score at least ID_NAME_FLOOR. An NPI enrolled under more than one of
+    the state's CCNs is ambiguous and left to name matching.
+    """
+
+    def __init__(self, property_facilities: List[Dict], npi_rows: List[Tuple[str, str]],
+                 ids_are_ccns: bool = False):
+        self.ids_are_ccns = ids_are_ccns
+        self.by_ccn: Dict[str, Dict] = {}
+        for facility in property_facilities:
+            key = normalize_facility_id(facility["ccn"])
+            if key:
+                self.by_ccn[key] = facility
+
+        self.by_npi: Dict[str, Dict] = {}
+        ambiguous = set()
+        for npi, ccn in npi_rows:
+            npi_key = normalize_facility_id(npi)
+            facility = self.by_ccn.get(normalize_facility_id(ccn))
+            if not npi_key or facility is None:
+                continue
+            existing = self.by_npi.get(npi_key)
+            if existing is not None and existing is not facility:
+                ambiguous.add(npi_key)
+            self.by_npi[npi_key] = facility
+
+        for npi_key in ambiguous:
+            del self.by_npi[npi_key]
+
+    def lookup(self, facility_id, facility_name: Optional[str] = None) -> Optional[Dict]:
+        """Return the facility for an exact NPI or (confirmed) CCN hit, else None."""
+        key = normalize_facility_id(facility_id)
+        if not key:
+            return None
+
+        if len(key) == 10 and key.isdigit():
+            return self.by_npi.get(key)
+        if len(key) == 6:
+            facility = self.by_ccn.get(key)
+            if facility is None or self.ids_are_ccns:
+                return facility
+            from rapidfuzz import fuzz
+
+            score = fuzz.token_sort_ratio(
+                normalize_facility_name(facility_name or ""),
+                normalize_facility_name(facility["facility_name"])
+            )
+            return facility if score >= ID_NAME_FLOOR else None
+        return None
+
+
+class PropertyNameIndex:
+    """
+    Per-state lookup structure over property_master facilities.
+
+    Normalizes every facility name and tokenizes it once, so matching a
+    rate row no longer repeats that regex work for every property.
+    """
+
+    def __init__(self, property_facilities: List[Dict]):
+        self.facilities = property_facilities
+
+        # Normalized name -> facility (last one wins, as before)
+        self.name_to_facility: Dict[str, Dict] = {}
+        # Token sets per facility, parallel to self.facilities
+        self.facility_tokens: List[set] = []
+        # Token -> positions in self.facilities, for the overlap fallback
+        self.token_postings: Dict[str, List[int]] = {}
+
+        for pos, facility in enumerate(property_facilities):
+            norm_name = normalize_facility_name(facility["facility_name"])
+            self.name_to_facility[norm_name] = facility
+
+            tokens = _significant_tokens(norm_name)
+            self.facility_tokens.append(tokens)
+            for token in tokens:
+                self.token_postings.setdefault(token, []).append(pos)
+
+        self.names: List[str] = list(self.name_to_facility.keys())
+        self._blocker: Optional[CandidateBlocker] = None
+
+    def __len__(self) -> int:
+        return len(self.facilities)
+
+    def exact(self, norm_name: str) -> Optional[Dict]:
+        """Return the facility whose normalized name equals norm_name."""
+        return self.name_to_facility.get(norm_name)
+
+    @property
+    def blocker(self) -> CandidateBlocker:
+        """Candidate blocker over the normalized names, built on first use."""
+        if self._blocker is None:
+            cities = [self.name_to_facility[name].get("city") for name in self.names]
+            self._blocker = CandidateBlocker(self.names, cities)
+        return self._blocker
+
+    def block(self, norm_name: str, city: Optional[str] = None) -> List[str]:
+        """Normalized names worth fuzzy-scoring against norm_name."""
+        return [self.names[pos] for pos in self.blocker.candidates(norm_name, city)]
+
+    def best_token_overlap(self, rate_tokens: set) -> Tuple[Optional[Dict], float]:
+        """
+        Find the facility with the highest token overlap ratio.
+
+        Only facilities sharing at least one token can score above zero,
+        so candidates come from the token postings. They are visited in
+        original order so ties resolve exactly as a full scan would.
+        """
+        if not rate_tokens:
+            return None, 0
+
+        candidates = set()
+        for token in rate_tokens:
+            candidates.update(self.token_postings.get(token, ()))
+
+        best_overlap = 0
+        best_facility = None
+        for pos in sorted(candidates):
+            property_tokens = self.facility_tokens[pos]
+            overlap = len(rate_tokens & property_tokens) / max(len(rate_tokens), len(property_tokens))
+            if overlap > best_overlap:
+                best_overlap = overlap
+                best_facility = self.facilities[pos]
+
+        return best_facility, best_overlap
+
+
+def _best_fuzzy_match(
+    norm_rate: str,
+    choices: List[str],
+    index: PropertyNameIndex,
+    threshold: int,
+    top_k: int = FUZZY_TOP_K
+) -> Optional[Tuple[Dict, float]]:
+    """Score norm_rate against choices and return the best hit above threshold."""
+    from rapidfuzz import fuzz, process
+
+    matches = process.extract(
+        norm_rate,
+        choices,
+        scorer=fuzz.token_sort_ratio,
+        limit=top_k
+    )
+
+    for match_name, score, _ in matches:
+        if score >= threshold:
+            return (index.name_to_facility[match_name], score)
+
+    return None
+
+
 def find_best_match(
     rate_name: str,
-    property_facilities: List[Dict],
-    threshold: int = DEFAULT_THRESHOLD
+    property_facilities,
+    threshold: int = DEFAULT_THRESHOLD,
+    city: Optional[str] = None,
+    blocking: bool = False
 ) -> Optional[Tuple[Dict, int]]:
     """
     Find the best matching property_master facility for a rate facility name.
 
     Args:
         rate_name: Facility name from medicaid_rates
-        property_facilities: List of property_master records for the same state
+        property_facilities: PropertyNameIndex for the state (a plain list of
+            property_master records is also accepted and indexed on the fly)
         threshold: Minimum match score (0-100)
+        city: City from the rate file, if it has one (used for blocking)
+        blocking: If True, only fuzzy-score candidates from the blocker
 
     Returns:
         Tuple of (matched facility dict, score) or None
@@ -190,43 +557,29 @@ def find_best_match(
     if not rate_name or not property_facilities:
         return None
 
+    if isinstance(property_facilities, PropertyNameIndex):
+        index = property_facilities
+    else:
+        index = PropertyNameIndex(property_facilities)
+
     # Normalize the rate name
     norm_rate = normalize_facility_name(rate_name)
-    rate_tokens = get_name_tokens(rate_name)
-
-    # Create lookup of normalized names to facilities
-    name_to_facility = {}
-    for facility in property_facilities:
-        norm_name = normalize_facility_name(facility["facility_name"])
-        name_to_facility[norm_name] = facility
+    rate_tokens = _significant_tokens(norm_rate)
 
     # Try exact match first
-    if norm_rate in name_to_facility:
-        return (name_to_facility[norm_rate], 100)
-
-    # Fuzzy match against all normalized names
-    if name_to_facility:
-        matches = process.extract(
-            norm_rate,
-            list(name_to_facility.keys()),
-            scorer=fuzz.token_sort_ratio,
-            limit=3
-        )
-
-        for match_name, score, _ in matches:
-            if score >= threshold:
-                return (name_to_facility[match_name], score)
+    exact = index.exact(norm_rate)
+    if exact is not None:
+        return (exact, 100)
+
+    # Fuzzy match against all normalized names (or just the rate's block)
+    if index.names:
+        choices = index.block(norm_rate, city) if blocking else index.names
+        result = _best_fuzzy_match(norm_rate, choices, index, threshold)
+        if result:
+            return result
 
     # Token overlap as fallback
-    best_overlap = 0
-    best_facility = None
-    for facility in property_facilities:
-        property_tokens = get_name_tokens(facility["facility_name"])
-        if rate_tokens and property_tokens:
-            overlap = len(rate_tokens & property_tokens) / max(len(rate_tokens), len(property_tokens))
-            if overlap > best_overlap:
-                best_overlap = overlap
-                best_facility = facility
+    best_facility, best_overlap = index.best_token_overlap(rate_tokens)
 
     if best_overlap >= 0.6:  # 60% token overlap
         return (best_facility, int(best_overlap * 100))
@@ -234,11 +587,129 @@ def find_best_match(
     return None
 
 
+def top_k_per_row(scores: "np.ndarray", k: int) -> "np.ndarray":
+    """
+    Column indices of the k highest scores in each row, best first.
+
+    A stable sort keeps equal scores in column order, so ties resolve the
+    same way as process.extract.
+    """
+    import numpy as np
+
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return order[:, :k]
+
+
+def match_rates_batch(
+    rate_names: List[str],
+    index: PropertyNameIndex,
+    threshold: int = DEFAULT_THRESHOLD,
+    top_k: int = FUZZY_TOP_K,
+    cities: Optional[List[Optional[str]]] = None,
+    blocking: bool = False,
+    cdist_workers: int = -1
+) -> List[Optional[Tuple[Dict, int]]]:
+    """
+    Match a state's rate names in one pass.
+
+    Produces the same results as calling find_best_match per name, but
+    scores every name that has no exact hit against every normalized
+    property name in a single process.cdist call using all cores. With
+    blocking, names that have a candidate block are scored against that
+    block only and the rest fall back to the full-state matrix.
+
+    Args:
+        rate_names: Facility names from medicaid_rates
+        index: PropertyNameIndex for the state
+        threshold: Minimum match score (0-100)
+        top_k: Number of best candidates kept per rate name
+        cities: Cities parallel to rate_names, if the rate file has them
+        blocking: If True, only fuzzy-score candidates from the blocker
+        cdist_workers: Threads for process.cdist (-1 = all cores)
+
+    Returns:
+        List parallel to rate_names of (matched facility dict, score) or None
+    """
+    results: List[Optional[Tuple[Dict, int]]] = [None] * len(rate_names)
+    if not index:
+        return results
+
+    # Exact matches resolve without scoring
+    pending: List[int] = []
+    pending_norms: List[str] = []
+    for i, rate_name in enumerate(rate_names):
+        if not rate_name:
+            continue
+        norm_rate = normalize_facility_name(rate_name)
+        exact = index.exact(norm_rate)
+        if exact is not None:
+            results[i] = (exact, 100)
+        else:
+            pending.append(i)
+            pending_norms.append(norm_rate)
+
+    if not pending:
+        return results
+
+    fuzzy_hits: Dict[int, Tuple[Dict, float]] = {}
+    matrix_rows = list(range(len(pending)))
+
+    # Blocked names are scored against their own candidates
+    if blocking and index.names:
+        matrix_rows = []
+        for row, (i, norm_rate) in enumerate(zip(pending, pending_norms)):
+            choices = index.block(norm_rate, cities[i] if cities else None)
+            if len(choices) == len(index.names):
+                matrix_rows.append(row)
+                continue
+            result = _best_fuzzy_match(norm_rate, choices, index, threshold, top_k)
+            if result:
+                fuzzy_hits[i] = result
+
+    # Fuzzy match all remaining names in one matrix
+    if index.names and matrix_rows:
+        import numpy as np
+        from rapidfuzz import fuzz, process
+
+        scores = process.cdist(
+            [pending_norms[row] for row in matrix_rows],
+            index.names,
+            scorer=fuzz.token_sort_ratio,
+            dtype=np.float64,
+            workers=cdist_workers
+        )
+        best = top_k_per_row(scores, top_k)
+
+        for row, pending_row in enumerate(matrix_rows):
+            i = pending[pending_row]
+            for col in best[row]:
+                score = float(scores[row, col])
+                if score >= threshold:
+                    fuzzy_hits[i] = (index.name_to_facility[index.names[col]], score)
+                    break
+
+    # Token overlap as fallback
+    for i, norm_rate in zip(pending, pending_norms):
+        if i in fuzzy_hits:
+            results[i] = fuzzy_hits[i]
+            continue
+
+        best_facility, best_overlap = index.best_token_overlap(_significant_tokens(norm_rate))
+        if best_overlap >= 0.6:  # 60% token overlap
+            results[i] = (best_facility, int(best_overlap * 100))
+
+    return results
+
+
 def match_state(
     conn,
     state: str,
     threshold: int = DEFAULT_THRESHOLD,
-    preview: bool = True
+    preview: bool = True,
+    engine: str = DEFAULT_ENGINE,
+    blocking: bool = False,
+    cdist_workers: int = -1,
+    prefetched: Optional[Dict] = None
 ) -> Dict:
     """
     Match all unmatched rates in a state to property_master.
@@ -248,13 +719,29 @@ def match_state(
         state: Two-letter state code
         threshold: Minimum match score
         preview: If True, don't update database
+        engine: "legacy" (per-name scoring) or "batch" (one cdist per state)
+        blocking: If True, only fuzzy-score candidates sharing a rare name
+            token or city with the rate (full-state fallback otherwise)
+        cdist_workers: Threads for the batch engine's process.cdist call
+        prefetched: The state's entry from prefetch_state_data, used
+            instead of querying the database
 
     Returns:
-        Dict with match statistics
+        Dict with match statistics, including stages (read / match / commit
+        timings, see etl_metrics.StageTimer)
     """
+    start = time.perf_counter()
+    timer = StageTimer()
+
     # Get unmatched rates and property facilities
-    unmatched_rates = get_unmatched_rates(conn, state)
-    property_facilities = get_property_master_facilities(conn, state)
+    with timer.stage("read") as timed:
+        if prefetched is not None:
+            unmatched_rates = prefetched["rates"].rows()
+            property_facilities = prefetched["properties"].rows()
+        else:
+            unmatched_rates = get_unmatched_rates(conn, state)
+            property_facilities = get_property_master_facilities(conn, state)
+        timed.rows = len(unmatched_rates)
 
     stats = {
         "state": state,
@@ -264,6 +751,11 @@ def match_state(
         "high_confidence": 0,
         "low_confidence": 0,
         "unmatched": 0,
+        "id_matched": 0,
+        "name_matched": 0,
+        "elapsed_seconds": 0.0,
+        "candidate_reduction": None,
+        "stages": timer.stages,
         "matches": []
     }
 
@@ -278,87 +770,258 @@ def match_state(
 
     logger.info(f"{state}: Matching {len(unmatched_rates)} rates against {len(property_facilities)} properties")
 
-    for rate in unmatched_rates:
-        result = find_best_match(
-            rate["facility_name"],
-            property_facilities,
-            threshold
+    # Stage 1: exact NPI / CCN hits skip name matching entirely
+    with timer.stage("read"):
+        npi_rows = prefetched["npis"] if prefetched is not None else get_property_npis(conn, state)
+    match_start = time.perf_counter()
+    crosswalk = FacilityIdCrosswalk(
+        property_facilities, npi_rows, ids_are_ccns=get_state_config(state).get("ids_are_ccns", False)
+    )
+    results: List[Optional[Tuple[Dict, int]]] = []
+    stages: List[Optional[str]] = []
+    leftovers: List[int] = []
+    for i, rate in enumerate(unmatched_rates):
+        facility = crosswalk.lookup(rate.get("state_facility_id"), rate["facility_name"])
+        if facility is not None:
+            results.append((facility, 100))
+            stages.append("id")
+        else:
+            results.append(None)
+            stages.append(None)
+            leftovers.append(i)
+
+    # Stage 2: fuzzy name matching for the leftovers
+    # Normalize and tokenize the state's properties once
+    index = PropertyNameIndex(property_facilities)
+
+    rate_names = [unmatched_rates[i]["facility_name"] for i in leftovers]
+    # medicaid_rates has no city column; callers that carry one get city blocking
+    cities = [unmatched_rates[i].get("city") for i in leftovers]
+    if engine == "batch":
+        name_results = match_rates_batch(
+            rate_names, index, threshold, cities=cities, blocking=blocking,
+            cdist_workers=cdist_workers
         )
+    else:
+        name_results = [
+            find_best_match(name, index, threshold, city=city, blocking=blocking)
+            for name, city in zip(rate_names, cities)
+        ]
+
+    for i, result in zip(leftovers, name_results):
+        if result:
+            results[i] = result
+            stages[i] = "name"
 
+    for rate, result, stage in zip(unmatched_rates, results, stages):
         if result:
             matched_facility, score = result
 
             match_info = {
                 "rate_id": rate["id"],
                 "rate_name": rate["facility_name"],
+                "state_facility_id": rate.get("state_facility_id"),
                 "property_id": matched_facility["id"],
                 "property_name": matched_facility["facility_name"],
                 "ccn": matched_facility["ccn"],
-                "score": score
+                "score": score,
+                "stage": stage
             }
             stats["matches"].append(match_info)
             stats["matched"] += 1
+            stats[f"{stage}_matched"] += 1
 
             if score >= HIGH_CONFIDENCE_THRESHOLD:
                 stats["high_confidence"] += 1
             else:
                 stats["low_confidence"] += 1
-
-            if not preview:
-                update_match(
-                    conn,
-                    rate["id"],
-                    matched_facility["id"],
-                    matched_facility["ccn"]
-                )
         else:
             stats["unmatched"] += 1
 
+    timer.add("match", time.perf_counter() - match_start, len(unmatched_rates))
+
+    # Write the whole state back in one transaction, and remember the
+    # matches so later rate periods inherit them at load time
+    if not preview:
+        with timer.stage("commit") as timed:
+            update_matches(conn, [
+                (match["rate_id"], match["property_id"], match["ccn"])
+                for match in stats["matches"]
+            ])
+            remember_matches(conn, state, [
+                (match["state_facility_id"], match["rate_name"], match["property_id"], match["ccn"])
+                for match in stats["matches"]
+            ])
+            timed.rows = len(stats["matches"])
+
+    if blocking:
+        stats["candidate_reduction"] = index.blocker.reduction_ratio
+    stats["elapsed_seconds"] = time.perf_counter() - start
+
     return stats
 
 
+def format_timing(stats: Dict) -> str:
+    """Format wall-clock time and blocking reduction for a state's stats."""
+    text = f"{stats['elapsed_seconds']:.2f}s"
+    if stats.get("candidate_reduction") is not None:
+        text += f", {stats['candidate_reduction']:.1%} of candidate pairs skipped"
+    return text
+
+
+# ============================================
+# PARALLEL EXECUTION
+# ============================================
+
+# Per-process connection for pool workers
+_worker_conn = None
+
+
+def _close_worker_conn():
+    """Close the pool worker's connection when the worker exits."""
+    if _worker_conn is not None and _worker_conn.is_connected():
+        _worker_conn.close()
+
+
+def _init_worker():
+    """Open a dedicated database connection in each pool worker."""
+    global _worker_conn
+    _worker_conn = get_db_connection()
+    # atexit runs in spawned workers; forked ones leave through os._exit,
+    # which only runs multiprocessing's finalizers
+    atexit.register(_close_worker_conn)
+    multiprocessing.util.Finalize(None, _close_worker_conn, exitpriority=10)
+
+
+def _match_state_in_worker(
+    state: str,
+    threshold: int,
+    preview: bool,
+    engine: str,
+    blocking: bool,
+    prefetched: Optional[Dict] = None
+) -> Dict:
+    """Run match_state on the worker's own connection."""
+    # One cdist thread per worker - the pool already spreads states over cores
+    return match_state(
+        _worker_conn, state, threshold, preview=preview, engine=engine,
+        blocking=blocking, cdist_workers=1, prefetched=prefetched
+    )
+
+
+def iter_state_matches(
+    conn,
+    states: List[str],
+    threshold: int = DEFAULT_THRESHOLD,
+    preview: bool = True,
+    engine: str = DEFAULT_ENGINE,
+    blocking: bool = False,
+    jobs: int = 1,
+    prefetched: Optional[Dict[str, Dict]] = None
+) -> Iterator[Dict]:
+    """
+    Match each state and yield its stats.
+
+    With jobs > 1 states run in a process pool, each worker holding its own
+    connection, and stats are yielded as states finish. States are submitted
+    in the order given, so pass them largest first. With prefetched data
+    (see prefetch_state_data) each state's rows are handed to the matcher,
+    or shipped to the worker, instead of being queried per state.
+    """
+    prefetched = prefetched or {}
+
+    if jobs <= 1 or len(states) <= 1:
+        for st in states:
+            yield match_state(
+                conn, st, threshold, preview=preview, engine=engine, blocking=blocking,
+                prefetched=prefetched.get(st)
+            )
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(states)),
+        initializer=_init_worker
+    ) as executor:
+        futures = [
+            executor.submit(
+                _match_state_in_worker, st, threshold, preview, engine, blocking,
+                prefetched.get(st)
+            )
+            for st in states
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
 # ============================================
 # MAIN OPERATIONS
 # ============================================
 
-def preview_matches(conn, state: Optional[str] = None, threshold: int = DEFAULT_THRESHOLD):
+def _states_and_data(
+    conn,
+    state: Optional[str],
+    prefetch: bool
+) -> Tuple[List[str], Optional[Dict[str, Dict]]]:
+    """States to match, plus their prefetched rows when prefetch is on."""
+    if not prefetch:
+        return get_states_to_match(conn, state), None
+
+    start = time.perf_counter()
+    prefetched = prefetch_state_data(conn, state)
+    rate_count = sum(len(data["rates"]) for data in prefetched.values())
+    print(f"Prefetched {rate_count:,} unmatched rates across {len(prefetched)} states "
+          f"in {time.perf_counter() - start:.2f}s")
+    return states_by_size(prefetched), prefetched
+
+
+def preview_matches(
+    conn,
+    state: Optional[str] = None,
+    threshold: int = DEFAULT_THRESHOLD,
+    engine: str = DEFAULT_ENGINE,
+    blocking: bool = False,
+    jobs: int = 1,
+    prefetch: bool = False
+):
     """Preview matches without updating database."""
     print("\n" + "=" * 70)
     print("FACILITY MATCHING - PREVIEW MODE")
+    print(f"Engine: {engine}{' (blocking)' if blocking else ''}, jobs: {jobs}"
+          f"{', prefetch' if prefetch else ''}")
     print("=" * 70)
 
     # Get states to process
-    cursor = conn.cursor()
-    if state:
-        states = [state]
-    else:
-        cursor.execute("SELECT DISTINCT state FROM medicaid_rates WHERE property_master_id IS NULL ORDER BY state")
-        states = [row[0] for row in cursor.fetchall()]
-    cursor.close()
+    states, prefetched = _states_and_data(conn, state, prefetch)
 
     total_stats = {
         "total_unmatched": 0,
         "matched": 0,
         "high_confidence": 0,
         "low_confidence": 0,
-        "unmatched": 0
+        "unmatched": 0,
+        "id_matched": 0,
+        "name_matched": 0
     }
 
-    for st in states:
-        stats = match_state(conn, st, threshold, preview=True)
-
+    for stats in iter_state_matches(
+        conn, states, threshold, preview=True, engine=engine,
+        blocking=blocking, jobs=jobs, prefetched=prefetched
+    ):
+        st = stats["state"]
         print(f"\n--- {st} ---")
         print(f"Unmatched rates: {stats['total_unmatched']}")
         print(f"Property master facilities: {stats['total_properties']}")
         print(f"Matches found: {stats['matched']} ({stats['high_confidence']} high confidence, {stats['low_confidence']} low)")
         print(f"Still unmatched: {stats['unmatched']}")
+        print(f"Resolved by stage: {stats['id_matched']} by ID, {stats['name_matched']} by name")
+        print(f"Time: {format_timing(stats)}")
 
         # Show sample matches
         if stats["matches"]:
             print("\nSample matches:")
             for match in stats["matches"][:5]:
                 confidence = "HIGH" if match["score"] >= HIGH_CONFIDENCE_THRESHOLD else "LOW"
-                print(f"  [{match['score']}% {confidence}] '{match['rate_name']}' -> '{match['property_name']}' (CCN: {match['ccn']})")
+                print(f"  [{match['score']}% {confidence} {match['stage']}] '{match['rate_name']}' -> '{match['property_name']}' (CCN: {match['ccn']})")
 
         for key in total_stats:
             total_stats[key] += stats.get(key, 0)
@@ -368,38 +1031,59 @@ def preview_matches(conn, state: Optional[str] = None, threshold: int = DEFAULT_
     print(f"  Total unmatched: {total_stats['total_unmatched']}")
     print(f"  Would match: {total_stats['matched']} ({total_stats['high_confidence']} high, {total_stats['low_confidence']} low)")
     print(f"  Would remain unmatched: {total_stats['unmatched']}")
+    print(f"  Resolved by ID: {total_stats['id_matched']}, by name: {total_stats['name_matched']}")
     match_rate = (total_stats['matched'] / total_stats['total_unmatched'] * 100) if total_stats['total_unmatched'] > 0 else 0
     print(f"  Match rate: {match_rate:.1f}%")
     print("=" * 70)
 
 
-def execute_matches(conn, state: Optional[str] = None, threshold: int = DEFAULT_THRESHOLD):
+def execute_matches(
+    conn,
+    state: Optional[str] = None,
+    threshold: int = DEFAULT_THRESHOLD,
+    engine: str = DEFAULT_ENGINE,
+    blocking: bool = False,
+    jobs: int = 1,
+    prefetch: bool = False
+):
     """Execute matches and update database."""
     print("\n" + "=" * 70)
     print("FACILITY MATCHING - EXECUTE MODE")
+    print(f"Engine: {engine}{' (blocking)' if blocking else ''}, jobs: {jobs}"
+          f"{', prefetch' if prefetch else ''}")
     print("=" * 70)
 
     # Get states to process
-    cursor = conn.cursor()
-    if state:
-        states = [state]
-    else:
-        cursor.execute("SELECT DISTINCT state FROM medicaid_rates WHERE property_master_id IS NULL ORDER BY state")
-        states = [row[0] for row in cursor.fetchall()]
-    cursor.close()
+    states, prefetched = _states_and_data(conn, state, prefetch)
 
     total_matched = 0
     total_unmatched = 0
-
-    for st in states:
-        stats = match_state(conn, st, threshold, preview=False)
-
-        print(f"{st}: Matched {stats['matched']}, Unmatched {stats['unmatched']}")
+    total_id_matched = 0
+    metrics = RunMetrics("match_facilities")
+
+    for stats in iter_state_matches(
+        conn, states, threshold, preview=False, engine=engine,
+        blocking=blocking, jobs=jobs, prefetched=prefetched
+    ):
+        st = stats["state"]
+        print(
+            f"{st}: Matched {stats['matched']} ({stats['id_matched']} by ID), "
+            f"Unmatched {stats['unmatched']} ({format_timing(stats)})"
+        )
         total_matched += stats["matched"]
         total_unmatched += stats["unmatched"]
+        total_id_matched += stats["id_matched"]
+        metrics.timer_for(st).merge(stats["stages"])
+        metrics.finish_state(
+            st, "success", rows=stats["total_unmatched"], matched=stats["matched"],
+            id_matched=stats["id_matched"], engine=engine
+        )
+
+    metrics.close(jobs=jobs, blocking=blocking, prefetch=prefetch)
 
     print("\n" + "-" * 70)
-    print(f"TOTAL: {total_matched} matched, {total_unmatched} unmatched")
+    print(f"TOTAL: {total_matched} matched ({total_id_matched} by ID), {total_unmatched} unmatched")
+    metrics.print_stages()
     print("=" * 70)
 
 
@@ -456,6 +1140,11 @@ Examples:
     python match_facilities.py --execute
     python match_facilities.py --state FL --preview
     python match_facilities.py --threshold 90 --execute
+    python match_facilities.py --engine batch --preview
+    python match_facilities.py --blocking --preview
+    python match_facilities.py --jobs 4 --execute
+    python match_facilities.py --prefetch --engine batch --preview
+    python match_facilities.py --seed-memory
     python match_facilities.py --stats
         """
     )
@@ -478,6 +1167,12 @@ Examples:
         help="Show current matching statistics"
     )
 
+    parser.add_argument(
+        "--seed-memory",
+        action="store_true",
+        help="Build match memory from already-matched rates"
+    )
+
     parser.add_argument(
         "--state",
         type=str,
@@ -491,11 +1186,37 @@ Examples:
         help=f"Minimum match score (default: {DEFAULT_THRESHOLD})"
     )
 
+    parser.add_argument(
+        "--engine",
+        choices=MATCH_ENGINES,
+        default=DEFAULT_ENGINE,
+        help=f"Fuzzy scoring engine (default: {DEFAULT_ENGINE})"
+    )
+
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="Only fuzzy-score candidates sharing a rare name token or city"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for matching states in parallel (default: 1)"
+    )
+
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Load all unmatched rates and properties in two queries up front"
+    )
+
     args = parser.parse_args()
 
-    if not any([args.preview, args.execute, args.stats]):
+    if not any([args.preview, args.execute, args.stats, args.seed_memory]):
         parser.print_help()
-        print("\nError: Must specify --preview, --execute, or --stats")
+        print("\nError: Must specify --preview, --execute, --stats, or --seed-memory")
         sys.exit(1)
 
     conn = get_db_connection()
@@ -503,10 +1224,19 @@ Examples:
     try:
         if args.stats:
             show_match_stats(conn)
+        elif args.seed_memory:
+            written = seed_match_memory(conn, args.state)
+            print(f"Match memory: {written} keys written")
         elif args.preview:
-            preview_matches(conn, args.state, args.threshold)
+            preview_matches(
+                conn, args.state, args.threshold, args.engine, args.blocking, args.jobs,
+                args.prefetch
+            )
         elif args.execute:
-            execute_matches(conn, args.state, args.threshold)
+            execute_matches(
+                conn, args.state, args.threshold, args.engine, args.blocking, args.jobs,
+                args.prefetch
+            )
     finally:
         conn.close()
 
@@ -0,0 +1,221 @@
+"""
+Persistent match memory for medicaid_rates.
+Remembers which property_master facility each rate-file facility matched,
+keyed by (state, state_facility_id) and (state, normalized facility name),
+and carries those matches forward onto newly loaded rate periods so only
+genuinely new facilities need fuzzy matching.
+
+Usage:
+    from match_memory import remember_matches, carry_forward_matches
+
+    remember_matches(conn, "FL", [(state_facility_id, facility_name, pm_id, ccn)])
+    carry_forward_matches(conn, "FL")   # after inserting a new FL period
+"""
+
+import logging
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from name_normalizer import normalize_facility_name
+except ImportError:
+    # If running from different directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from name_normalizer import normalize_facility_name
+
+logger = logging.getLogger(__name__)
+
+# Rows per executemany batch when writing memory
+MEMORY_WRITE_CHUNK_SIZE = 1000
+
+# medicaid_rate_match_memory.key_value column width
+MAX_KEY_LENGTH = 255
+
+
+def normalize_facility_id(value) -> Optional[str]:
+    """Normalize a provider ID (NPI, CCN, state ID) for exact lookups."""
+    if value is None:
+        return None
+
+    key = str(value).strip().upper()
+    # IDs that passed through a float column (e.g. "1285638148.0")
+    if key.endswith(".0") and key[:-2].isdigit():
+        key = key[:-2]
+
+    if not key or key in ("NONE", "NAN"):
+        return None
+    return key
+
+
+def memory_keys(state_facility_id, facility_name: Optional[str]) -> List[Tuple[str, str]]:
+    """(key_type, key_value) pairs a rate row is remembered under."""
+    keys = []
+
+    facility_id = normalize_facility_id(state_facility_id)
+    if facility_id:
+        keys.append(("facility_id", facility_id[:MAX_KEY_LENGTH]))
+
+    name = normalize_facility_name(facility_name)
+    if name:
+        keys.append(("name", name[:MAX_KEY_LENGTH]))
+
+    return keys
+
+
+def remember_matches(
+    conn,
+    state: str,
+    matches: Iterable[Tuple[Optional[str], Optional[str], int, Optional[str]]]
+) -> int:
+    """
+    Record matches in medicaid_rate_match_memory.
+
+    Args:
+        conn: Database connection
+        state: Two-letter state code
+        matches: (state_facility_id, facility_name, property_master_id, ccn)
+
+    Returns:
+        Number of memory keys written
+    """
+    rows = []
+    for facility_id, facility_name, property_id, ccn in matches:
+        for key_type, key_value in memory_keys(facility_id, facility_name):
+            rows.append((state, key_type, key_value, property_id, ccn))
+
+    if not rows:
+        return 0
+
+    insert_sql = """
+        INSERT INTO medicaid_rate_match_memory
+            (state, key_type, key_value, property_master_id, ccn)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            property_master_id = VALUES(property_master_id),
+            ccn = VALUES(ccn)
+    """
+
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(rows), MEMORY_WRITE_CHUNK_SIZE):
+            cursor.executemany(insert_sql, rows[start:start + MEMORY_WRITE_CHUNK_SIZE])
+        conn.commit()
+    finally:
+        cursor.close()
+
+    return len(rows)
+
+
+def load_match_memory(conn, state: str) -> Dict[str, Dict[str, Tuple[int, Optional[str]]]]:
+    """
+    Load a state's match memory.
+
+    Returns:
+        {key_type: {key_value: (property_master_id, ccn)}}
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT key_type, key_value, property_master_id, ccn
+        FROM medicaid_rate_match_memory
+        WHERE state = %s
+    """, (state,))
+
+    memory: Dict[str, Dict[str, Tuple[int, Optional[str]]]] = {
+        "facility_id": {},
+        "name": {},
+    }
+    for key_type, key_value, property_id, ccn in cursor.fetchall():
+        memory[key_type][key_value] = (property_id, ccn)
+
+    cursor.close()
+    return memory
+
+
+def carry_forward_matches(conn, state: str) -> Dict[str, int]:
+    """
+    Apply remembered matches to a state's unmatched rates.
+
+    The facility ID key is tried first, then the normalized name.
+
+    Returns:
+        Dict with rows resolved per key type and rows still unmatched
+    """
+    # Imported here: match_facilities imports this module
+    from match_facilities import update_matches
+
+    counts = {"facility_id": 0, "name": 0, "unmatched": 0}
+
+    memory = load_match_memory(conn, state)
+
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT id, state_facility_id, facility_name
+        FROM medicaid_rates
+        WHERE state = %s AND property_master_id IS NULL
+    """, (state,))
+    unmatched = cursor.fetchall()
+    cursor.close()
+
+    matches = []
+    for rate in unmatched:
+        hit = None
+        for key_type, key_value in memory_keys(rate["state_facility_id"], rate["facility_name"]):
+            hit = memory[key_type].get(key_value)
+            if hit:
+                counts[key_type] += 1
+                break
+
+        if hit:
+            property_id, ccn = hit
+            matches.append((rate["id"], property_id, ccn))
+        else:
+            counts["unmatched"] += 1
+
+    update_matches(conn, matches)
+
+    logger.info(
+        f"{state}: Carried forward {len(matches)} matches "
+        f"({counts['facility_id']} by ID, {counts['name']} by name), "
+        f"{counts['unmatched']} left for fuzzy matching"
+    )
+    return counts
+
+
+def seed_match_memory(conn, state: Optional[str] = None) -> int:
+    """
+    Build match memory from rates that are already matched.
+
+    Rows are replayed oldest period first, so the newest match wins.
+
+    Returns:
+        Number of memory keys written
+    """
+    cursor = conn.cursor(dictionary=True)
+
+    sql = """
+        SELECT state, state_facility_id, facility_name, property_master_id, ccn
+        FROM medicaid_rates
+        WHERE property_master_id IS NOT NULL
+    """
+    if state:
+        sql += " AND state = %s ORDER BY effective_date, id"
+        cursor.execute(sql, (state,))
+    else:
+        sql += " ORDER BY effective_date, id"
+        cursor.execute(sql)
+
+    by_state: Dict[str, List[Tuple]] = {}
+    for row in cursor.fetchall():
+        by_state.setdefault(row["state"], []).append((
+            row["state_facility_id"],
+            row["facility_name"],
+            row["property_master_id"],
+            row["ccn"],
+        ))
+    cursor.close()
+
+    written = 0
+    for st, matches in sorted(by_state.items()):
+        written += remember_matches(conn, st, matches)
+    return written
@@ -0,0 +1,196 @@
+"""
+Shared facility name normalization for rate-to-property matching.
+Compiles an ordered list of rewrite rules into a single alternation regex,
+so each name is normalized in one scan, and memoizes results in a bounded
+LRU cache keyed by the raw name.
+
+Usage:
+    from name_normalizer import normalize_facility_name, normalize_series
+
+    normalize_facility_name("The Oaks Healthcare, LLC")   # -> "oaks hc"
+    normalize_series(df["facility_name"])                 # vectorized
+"""
+
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Bounded cache size per normalizer - comfortably holds every principal,
+# entity and facility name in the database
+NORMALIZE_CACHE_SIZE = 262144
+
+# ============================================
+# RULE SETS
+# Rules are (regex, replacement) pairs applied in order: at each position
+# the first rule that matches wins.
+# ============================================
+
+# Common nursing facility name variations (match_facilities.py)
+FACILITY_NAME_RULES: List[Tuple[str, str]] = [
+    (r'\bskilled nursing facility\b', 'snf'),
+    (r'\bnursing home\b', 'nh'),
+    (r'\bnursing center\b', 'nc'),
+    (r'\brehabilitation\b', 'rehab'),
+    (r'\bhealthcare\b', 'hc'),
+    (r'\bhealth care\b', 'hc'),
+    (r'\bhealth center\b', 'hc'),
+    (r'\bcommunity\b', 'comm'),
+    (r'\bassisted living\b', 'al'),
+    (r'\blong term care\b', 'ltc'),
+    (r'\bllc\b', ''),
+    (r'\binc\.?\b', ''),
+    (r'\bcorp\.?\b', ''),
+    (r'\bthe\b', ''),
+    (r'[,\.\-\'\"]+', ' '),  # Remove punctuation
+]
+
+# Upper-case phrase rules used by the per-state match_*.py scripts
+STATE_SCRIPT_SUFFIXES: List[str] = [
+    ' LLC', ' INC', ' CORP', ' LP', ' LLP', ', LLC', ', INC', ', LP', ' OPCO'
+]
+
+STATE_SCRIPT_REPLACEMENTS: Dict[str, str] = {
+    'NURSING HOME': 'NH',
+    'NURSING FACILITY': 'NF',
+    'HEALTH AND REHABILITATION': 'H&R',
+    'HEALTH & REHABILITATION': 'H&R',
+    'HEALTH AND REHAB': 'H&R',
+    'HEALTH & REHAB': 'H&R',
+    'REHABILITATION': 'REHAB',
+    'CENTER': 'CTR',
+    'CONVALESCENT': 'CONV',
+    '&': 'AND',
+    'SAINT': 'ST',
+    'MOUNT': 'MT',
+    'HEALTHCARE': 'HC',
+    'SKILLED NURSING': 'SNF',
+}
+
+
+# ============================================
+# NORMALIZER
+# ============================================
+
+class NameNormalizer:
+    """
+    Single-pass, memoized name normalizer.
+
+    Each rule's replacement text is pre-expanded through the rules that
+    follow it, so output is never left half-normalized (e.g. 'H&R' is
+    still rewritten by a later '&' -> 'AND' rule).
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Tuple[str, str]],
+        case: str = "lower",
+        cache_size: int = NORMALIZE_CACHE_SIZE
+    ):
+        if case not in ("lower", "upper"):
+            raise ValueError(f"case must be 'lower' or 'upper', got {case!r}")
+        self.case = case
+
+        self._replacements: List[str] = []
+        for i, (_, replacement) in enumerate(rules):
+            for later_pattern, later_replacement in rules[i + 1:]:
+                replacement = re.sub(later_pattern, later_replacement, replacement)
+            self._replacements.append(replacement)
+
+        self._pattern = re.compile(
+            "|".join(f"({pattern})" for pattern, _ in rules)
+        )
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _substitute(self, match: "re.Match") -> str:
+        return self._replacements[match.lastindex - 1]
+
+    def _normalize(self, name: str) -> str:
+        if not name:
+            return ""
+
+        name = name.strip()
+        name = name.lower() if self.case == "lower" else name.upper()
+        name = self._pattern.sub(self._substitute, name)
+
+        # Collapse whitespace
+        return " ".join(name.split())
+
+    def normalize_series(self, names: "pd.Series") -> "pd.Series":
+        """
+        Normalize a pandas Series of names.
+
+        Each distinct name is normalized once; missing values become "".
+        """
+        import numpy as np
+        import pandas as pd
+
+        codes, uniques = pd.factorize(names)
+        normalized = [
+            self.normalize(value if isinstance(value, str) else str(value))
+            for value in uniques
+        ]
+        # Code -1 (missing) picks the trailing empty string
+        lookup = np.array(normalized + [""], dtype=object)
+        return pd.Series(lookup[codes], index=names.index, name=names.name)
+
+    def cache_info(self):
+        """LRU cache statistics (hits, misses, maxsize, currsize)."""
+        return self.normalize.cache_info()
+
+
+def _literal_rule(text: str) -> str:
+    """Regex for a literal, anchored on word boundaries at word-character ends."""
+    pattern = re.escape(text)
+    if text[:1].isalnum():
+        pattern = r'\b' + pattern
+    if text[-1:].isalnum():
+        pattern += r'\b'
+    return pattern
+
+
+def make_state_script_normalizer(
+    extra_replacements: Optional[Dict[str, str]] = None
+) -> NameNormalizer:
+    """
+    Build the upper-case normalizer used by the per-state match_*.py scripts.
+
+    Replacements match whole words, and where two phrases start at the same
+    word the longer one wins ("HEALTH AND REHABILITATION" over "HEALTH AND
+    REHAB").
+
+    Args:
+        extra_replacements: State-specific replacements added to the shared ones
+
+    Returns:
+        NameNormalizer producing A-Z/0-9 names
+    """
+    replacements = dict(STATE_SCRIPT_REPLACEMENTS)
+    replacements.update(extra_replacements or {})
+
+    rules = [(_literal_rule(suffix), '') for suffix in STATE_SCRIPT_SUFFIXES]
+    rules += [
+        (_literal_rule(old), replacements[old])
+        for old in sorted(replacements, key=len, reverse=True)
+    ]
+    rules.append((r'[^A-Z0-9 ]', ''))  # Remove special characters
+    return NameNormalizer(rules, case="upper")
+
+
+# Default normalizer for property_master / medicaid_rates matching
+facility_normalizer = NameNormalizer(FACILITY_NAME_RULES)
+
+
+def normalize_facility_name(name: str) -> str:
+    """
+    Normalize facility name for matching.
+    Removes common suffixes, standardizes abbreviations, etc.
+    """
+    return facility_normalizer.normalize(name)
+
+
+def normalize_series(names: "pd.Series") -> "pd.Series":
+    """Vectorized normalize_facility_name over a pandas Series."""
+    return facility_normalizer.normalize_series(names)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Parsed-file cache for rate sources.
+Stores the normalized output of process_file and the extract_*.py parsers
+as Parquet, keyed by the source file's SHA-256 and the parser's version,
+so unchanged workbooks and PDFs load in milliseconds instead of being
+parsed again.
+
+Usage:
+    python parse_cache.py --list                    # Show cached entries
+    python parse_cache.py --purge                   # Delete everything
+    python parse_cache.py --purge --parser extract_va
+    python parse_cache.py --purge --older-than 30   # Entries older than 30 days
+
+    from parse_cache import cached_frame, cached_records
+
+    df = cached_frame(path, "process_file_FL", "1", lambda: parse(path))
+
+Dependencies:
+    pip install pandas pyarrow
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CACHE_DIR = Path(os.getenv("RATE_PARSE_CACHE_DIR", Path(__file__).parent / ".parse_cache"))
+
+# Read size when hashing source files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Parquet key-value metadata field holding the entry description
+METADATA_KEY = b"atlas_parse_cache"
+
+
+# ============================================
+# KEYS
+# ============================================
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_version(base_version: str, config: Dict) -> str:
+    """
+    Parser version that also changes when a parser's config changes.
+
+    Used for process_file, whose output depends on the state's mapping in
+    state_mappings.py as well as the code.
+    """
+    blob = json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+    return f"{base_version}-{hashlib.sha1(blob).hexdigest()[:8]}"
+
+
+def _entry_path(parser: str, sha256: str, version: str) -> Path:
+    return CACHE_DIR / parser / f"{sha256}-v{version}.parquet"
+
+
+# ============================================
+# CACHE ACCESS
+# ============================================
+
+def cached_frame(
+    path: Path,
+    parser: str,
+    version: str,
+    parse: Callable[[], "pd.DataFrame"],
+    use_cache: bool = True
+) -> "pd.DataFrame":
+    """
+    Return parse()'s DataFrame for a source file, from cache when possible.
+
+    Args:
+        path: Source file (workbook, PDF, ...)
+        parser: Parser name, e.g. "process_file_FL" or "extract_va"
+        version: Parser version - bump it when the parser's output changes
+        parse: Callable producing the DataFrame on a cache miss
+        use_cache: If False, always parse (and do not write the cache)
+
+    Returns:
+        Parsed DataFrame
+    """
+    if not use_cache:
+        return parse()
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    sha256 = file_sha256(path)
+    entry = _entry_path(parser, sha256, version)
+
+    if entry.exists():
+        try:
+            start = time.perf_counter()
+            df = pq.read_table(entry).to_pandas()
+            logger.info(f"Parse cache hit: {path.name} ({parser} v{version}, "
+                        f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+            return df
+        except Exception as e:
+            logger.warning(f"Unreadable cache entry {entry.name}, re-parsing: {e}")
+
+    df = parse()
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        description = json.dumps({
+            "parser": parser,
+            "version": version,
+            "sha256": sha256,
+            "source": str(path.resolve()),
+            "rows": len(df),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }).encode("utf-8")
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            METADATA_KEY: description,
+        })
+
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry.with_suffix(".tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, entry)
+    except Exception as e:
+        # A cache write failure must never fail the load itself
+        logger.warning(f"Could not cache {path.name} ({parser}): {e}")
+
+    return df
+
+
+def cached_records(
+    path: Path,
+    parser: str,
+    version: str,
+    parse: Callable[[], List[Dict]],
+    use_cache: bool = True
+) -> List[Dict]:
+    """cached_frame for parsers that produce a list of dict records."""
+    import pandas as pd
+
+    df = cached_frame(
+        path, parser, version, lambda: pd.DataFrame(parse()), use_cache=use_cache
+    )
+    # Missing values come back as None, as the parser produced them
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+# ============================================
+# INSPECTION
+# ============================================
+
+def list_entries(parser: Optional[str] = None) -> List[Dict]:
+    """Describe cached entries (reads Parquet footers only)."""
+    import pyarrow.parquet as pq
+
+    entries = []
+    if not CACHE_DIR.exists():
+        return entries
+
+    pattern = f"{parser}/*.parquet" if parser else "*/*.parquet"
+    for entry in sorted(CACHE_DIR.glob(pattern)):
+        info = {"parser": entry.parent.name, "path": entry}
+        try:
+            metadata = pq.read_metadata(entry).metadata or {}
+            info.update(json.loads(metadata.get(METADATA_KEY, b"{}")))
+        except Exception as e:
+            info["error"] = str(e)
+        stat = entry.stat()
+        info["bytes"] = stat.st_size
+        info["mtime"] = stat.st_mtime
+        entries.append(info)
+
+    return entries
+
+
+def purge(parser: Optional[str] = None, older_than_days: Optional[float] = None) -> int:
+    """
+    Delete cache entries.
+
+    Args:
+        parser: Only entries for this parser
+        older_than_days: Only entries last written more than this many days ago
+
+    Returns:
+        Number of entries deleted
+    """
+    cutoff = time.time() - older_than_days * 86400 if older_than_days is not None else None
+
+    deleted = 0
+    for info in list_entries(parser):
+        if cutoff is not None and info["mtime"] >= cutoff:
+            continue
+        info["path"].unlink()
+        deleted += 1
+    return deleted
+
+
+def show_entries(parser: Optional[str] = None):
+    """Print cached entries."""
+    entries = list_entries(parser)
+
+    print("\n" + "=" * 90)
+    print(f"PARSE CACHE: {CACHE_DIR}")
+    print("=" * 90)
+
+    if not entries:
+        print("\nCache is empty")
+        return
+
+    print(f"\n{'Parser':<22} {'Version':<14} {'Rows':>7} {'Size':>10} {'Created':<20} Source")
+    print("-" * 90)
+    for info in entries:
+        source = Path(info.get("source", "?")).name
+        print(f"{info['parser']:<22} {info.get('version', '?'):<14} {info.get('rows', 0):>7} "
+              f"{info['bytes'] / 1024:>8.1f}KB {info.get('created', '?'):<20} {source}")
+
+    total = sum(info["bytes"] for info in entries)
+    print("-" * 90)
+    print(f"{len(entries)} entries, {total / 1024:,.1f} KB")
+
+
+# ============================================
+# CLI ENTRY POINT
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect and purge the parsed rate file cache",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python parse_cache.py --list
+    python parse_cache.py --list --parser process_file_FL
+    python parse_cache.py --purge
+    python parse_cache.py --purge --older-than 30
+        """
+    )
+
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Show cached entries"
+    )
+
+    parser.add_argument(
+        "--purge",
+        action="store_true",
+        help="Delete cached entries"
+    )
+
+    parser.add_argument(
+        "--parser",
+        type=str,
+        help="Limit to one parser (e.g., extract_va, process_file_FL)"
+    )
+
+    parser.add_argument(
+        "--older-than",
+        type=float,
+        help="With --purge: only entries older than this many days"
+    )
+
+    args = parser.parse_args()
+
+    if args.purge:
+        deleted = purge(args.parser, args.older_than)
+        print(f"Deleted {deleted} cache entries from {CACHE_DIR}")
+    elif args.list:
+        show_entries(args.parser)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Rate file fetcher for medicaid_rate_sources.
+Downloads the current rate files for many states concurrently. Each
+source's page (source_url) is searched with its regex_pattern for file
+links, and every link is downloaded with a conditional GET
+(If-None-Match / If-Modified-Since) so files that have not changed since
+the last fetch cost one 304 response. Downloads are SHA-256 hashed; a file
+whose contents are already on disk is kept once, however it is linked.
+
+The validators and hashes of past downloads are kept in a manifest
+(.fetch_manifest.json) in the download directory, and files are saved
+under <dest>/<STATE>/.
+
+HTTP runs through urllib in worker threads driven by asyncio, limited per
+host so one agency site is never hit by more than a few requests at once.
+Sources are plain dicts, so the fetcher can be pointed at a local HTTP
+server and a fixture rate_sources.csv to test it offline.
+
+Usage:
+    from rate_fetcher import fetch_sources, load_sources_csv
+
+    sources = load_sources_csv(Path("rate_sources.csv"), states=["GA", "MS"])
+    results = fetch_sources(sources, Path("downloads"))
+    for result in results:
+        print(result["state"], result["status"], result["downloaded"])
+"""
+
+import asyncio
+import csv
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from email.message import Message
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote, unquote, urljoin, urlsplit
+from urllib.request import Request, urlopen
+
+try:
+    from etl_metrics import StageTimer
+except ImportError:
+    # If running from different directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from etl_metrics import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Source configuration loaded into medicaid_rate_sources (21_load_rate_sources.sql)
+SOURCES_CSV = Path(os.getenv(
+    "RATE_SOURCES_CSV",
+    Path(__file__).resolve().parents[2] / "data" / "medicaid_rates" / "rate_sources.csv"
+))
+
+# Validators and hashes of past downloads, kept in the download directory
+MANIFEST_NAME = ".fetch_manifest.json"
+
+# Requests in flight overall and per host
+MAX_CONCURRENCY = 8
+PER_HOST_LIMIT = 2
+
+REQUEST_TIMEOUT = 60
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Guard against a loose regex_pattern matching every link on a page
+MAX_FILES_PER_SOURCE = 25
+
+USER_AGENT = "atlas-rate-fetcher/1.0"
+
+# Characters kept as-is when re-quoting links scraped from HTML
+URL_SAFE_CHARS = ":/?#[]@!$&'()*+,;=%~"
+
+# Links used when a source has no regex_pattern: anything ending in its file type
+GENERIC_LINK_PATTERN = r"""href=["']([^"']+\.{ext}(?:\?[^"']*)?)["']"""
+
+# rate_sources.csv header -> medicaid_rate_sources column
+CSV_COLUMNS = {
+    "State": "state",
+    "updated": "update_frequency",
+    "baseUrl": "base_url",
+    "sourceUrl": "source_url",
+    "requiresUser": "requires_user_auth",
+    "regexPattern": "regex_pattern",
+    "fileType": "file_type",
+    "notes": "notes",
+}
+
+
+# ============================================
+# SOURCES
+# ============================================
+
+def load_sources_csv(path: Optional[Path] = None, states: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Read rate sources from rate_sources.csv.
+
+    Args:
+        path: CSV in the rate_sources.csv layout (default: SOURCES_CSV)
+        states: Only these states (default: every row with a state code)
+
+    Returns:
+        List of source dicts keyed like medicaid_rate_sources columns
+    """
+    wanted = {s.upper() for s in states} if states else None
+    sources = []
+    with open(path or SOURCES_CSV, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            source = {column: (row.get(header) or "").strip() for header, column in CSV_COLUMNS.items()}
+            if not source["state"]:
+                continue
+            source["state"] = source["state"].upper()
+            source["requires_user_auth"] = source["requires_user_auth"].upper() == "TRUE"
+            if wanted is None or source["state"] in wanted:
+                sources.append(source)
+    return sources
+
+
+def load_sources_db(conn, states: Optional[Iterable[str]] = None) -> List[Dict]:
+    """Read active rate sources from medicaid_rate_sources."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT state, update_frequency, base_url, source_url, requires_user_auth,
+               regex_pattern, file_type, notes
+        FROM medicaid_rate_sources
+        WHERE is_active = TRUE
+        ORDER BY state
+    """)
+    rows = cursor.fetchall()
+    cursor.close()
+
+    wanted = {s.upper() for s in states} if states else None
+    return [row for row in rows if wanted is None or row["state"] in wanted]
+
+
+# ============================================
+# LINK DISCOVERY
+# ============================================
+
+def _link_from_match(match: "re.Match") -> str:
+    """
+    The URL in a regex_pattern match.
+
+    Patterns either match the link itself (/wp-content/.../NF-Rates.pdf) or
+    a whole href="..." attribute, with or without a group around the URL.
+    """
+    text = match.group(0)
+    if not text.lower().startswith("href="):
+        return text
+    for group in match.groups():
+        if group and not group.lower().startswith("href="):
+            return group
+    return text[5:].strip("\"'")
+
+
+def discover_links(
+    page: str,
+    page_url: str,
+    regex_pattern: Optional[str],
+    file_type: Optional[str] = None
+) -> List[str]:
+    """
+    Absolute file URLs on a source page, in page order without repeats.
+
+    Args:
+        page: HTML of the source page
+        page_url: URL the page was served from (relative links resolve against it)
+        regex_pattern: medicaid_rate_sources.regex_pattern; when empty, every
+            link ending in .file_type is taken
+        file_type: medicaid_rate_sources.file_type (xlsx, pdf, csv)
+
+    Returns:
+        List of URLs
+    """
+    if regex_pattern:
+        pattern = re.compile(regex_pattern, re.IGNORECASE)
+    elif file_type:
+        pattern = re.compile(GENERIC_LINK_PATTERN.format(ext=re.escape(file_type)), re.IGNORECASE)
+    else:
+        return []
+
+    links = []
+    for match in pattern.finditer(page):
+        link = html.unescape(_link_from_match(match)).strip()
+        url = quote(urljoin(page_url, link), safe=URL_SAFE_CHARS)
+        if url not in links:
+            links.append(url)
+    return links
+
+
+def _filename_for(url: str, headers: Dict[str, str], file_type: Optional[str]) -> str:
+    """File name for a download: Content-Disposition, else the URL path."""
+    name = None
+    disposition = headers.get("content-disposition")
+    if disposition:
+        message = Message()
+        message["content-disposition"] = disposition
+        name = message.get_filename()
+
+    if not name:
+        segments = [unquote(s) for s in urlsplit(url).path.split("/") if s]
+        # /document/<slug>/download style links name the file in the segment before
+        while segments and segments[-1].lower() == "download":
+            segments.pop()
+        name = segments[-1] if segments else "index"
+
+    name = re.sub(r"[^\w.\-]+", "_", Path(name).name).strip("._") or "download"
+    if file_type and "." not in name:
+        name = f"{name}.{file_type}"
+    return name
+
+
+# ============================================
+# HTTP
+# ============================================
+
+def _request(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    sink: Optional[Path] = None,
+    timeout: float = REQUEST_TIMEOUT
+) -> Dict:
+    """
+    Blocking GET (run in a worker thread).
+
+    With sink the body is streamed to that path and hashed; otherwise it is
+    returned as bytes.
+
+    Returns:
+        Dict with status (200 or 304), url (after redirects), headers
+        (lower-cased names), and body or sha256/size
+    """
+    request = Request(url, headers={"User-Agent": USER_AGENT, **(headers or {})})
+    try:
+        response = urlopen(request, timeout=timeout)
+    except HTTPError as e:
+        if e.code == 304:
+            return {"status": 304, "url": url, "headers": {k.lower(): v for k, v in e.headers.items()}}
+        raise
+
+    with response:
+        result = {
+            "status": response.status,
+            "url": response.geturl(),
+            "headers": {k.lower(): v for k, v in response.headers.items()},
+        }
+        if sink is None:
+            result["body"] = response.read()
+            return result
+
+        digest = hashlib.sha256()
+        size = 0
+        with open(sink, "wb") as f:
+            for block in iter(lambda: response.read(DOWNLOAD_CHUNK_SIZE), b""):
+                digest.update(block)
+                f.write(block)
+                size += len(block)
+        result["sha256"] = digest.hexdigest()
+        result["size"] = size
+        return result
+
+
+def _conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since for a manifest entry (none without one)."""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _is_html(headers: Dict[str, str]) -> bool:
+    return "html" in headers.get("content-type", "").lower()
+
+
+# ============================================
+# FETCHER
+# ============================================
+
+class RateFetcher:
+    """
+    Concurrent, conditional downloads of rate files into dest_dir.
+
+    One instance per run: the manifest is read on creation and written by
+    save_manifest() (fetch_sources does both).
+    """
+
+    def __init__(
+        self,
+        dest_dir: Path,
+        concurrency: int = MAX_CONCURRENCY,
+        per_host: int = PER_HOST_LIMIT,
+        timeout: float = REQUEST_TIMEOUT,
+        max_files: int = MAX_FILES_PER_SOURCE
+    ):
+        self.dest_dir = Path(dest_dir)
+        self.manifest_path = self.dest_dir / MANIFEST_NAME
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_files = max_files
+        self.manifest: Dict[str, Dict] = self._load_manifest()
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    # ---------- manifest ----------
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable fetch manifest {self.manifest_path}: {e}")
+            return {}
+
+    def save_manifest(self):
+        """Write the manifest atomically."""
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def _known(self, url: str) -> Optional[Dict]:
+        """Manifest entry for url whose file is still on disk."""
+        entry = self.manifest.get(url)
+        if entry and (self.dest_dir / entry["path"]).exists():
+            return entry
+        return None
+
+    def _same_content(self, state: str, sha256: str) -> Optional[Dict]:
+        """Manifest entry of a file of state's with these contents, if on disk."""
+        for entry in self.manifest.values():
+            if (entry.get("state") == state and entry.get("sha256") == sha256
+                    and (self.dest_dir / entry["path"]).exists()):
+                return entry
+        return None
+
+    # ---------- HTTP ----------
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def _get(self, url: str, headers: Optional[Dict] = None, sink: Optional[Path] = None) -> Dict:
+        # Host slot first: requests queued behind a busy host must not hold
+        # global slots other hosts could use
+        async with self._host_limit(url), self._limit:
+            return await asyncio.to_thread(_request, url, headers, sink, self.timeout)
+
+    # ---------- fetching ----------
+
+    async def fetch_file(self, source: Dict, url: str, response: Optional[Dict] = None) -> Dict:
+        """
+        Download one file unless it is unchanged.
+
+        Args:
+            source: Source dict (state, file_type)
+            url: File URL
+            response: Already-fetched response for url (when the source
+                page turned out to be the file itself)
+
+        Returns:
+            Dict with url, status (downloaded, unchanged, failed), path,
+            sha256 and error
+        """
+        state = source["state"]
+        state_dir = self.dest_dir / state
+        state_dir.mkdir(parents=True, exist_ok=True)
+        known = self._known(url)
+        tmp = state_dir / f".partial_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}"
+
+        try:
+            if response is None:
+                response = await self._get(url, _conditional_headers(known), sink=tmp)
+            elif response["status"] != 304:
+                body = response.pop("body")
+                tmp.write_bytes(body)
+                response["sha256"] = hashlib.sha256(body).hexdigest()
+
+            now = datetime.now().isoformat(timespec="seconds")
+            if response["status"] == 304:
+                if not known:
+                    raise ValueError("304 Not Modified for a file that is not on disk")
+                known["checked_at"] = now
+                return {"url": url, "status": "unchanged", "path": known["path"],
+                        "sha256": known["sha256"], "error": None}
+
+            sha256 = response["sha256"]
+            existing = self._same_content(state, sha256)
+            if existing:
+                tmp.unlink()
+                path = existing["path"]
+                status = "unchanged"
+            else:
+                name = _filename_for(response["url"], response["headers"], source.get("file_type"))
+                target = state_dir / name
+                # A different file already has this name (e.g. a re-posted
+                # link): keep both
+                if target.exists():
+                    target = target.with_name(f"{target.stem}_{sha256[:8]}{target.suffix}")
+                os.replace(tmp, target)
+                path = target.relative_to(self.dest_dir).as_posix()
+                status = "downloaded"
+
+            self.manifest[url] = {
+                "state": state,
+                "path": path,
+                "sha256": sha256,
+                "etag": response["headers"].get("etag"),
+                "last_modified": response["headers"].get("last-modified"),
+                "fetched_at": now if status == "downloaded" else (known or {}).get("fetched_at", now),
+                "checked_at": now,
+            }
+            return {"url": url, "status": status, "path": path, "sha256": sha256, "error": None}
+
+        except (HTTPError, URLError, OSError, ValueError) as e:
+            if tmp.exists():
+                tmp.unlink()
+            logger.warning(f"{state}: download failed for {url}: {e}")
+            return {"url": url, "status": "failed", "path": None, "sha256": None, "error": str(e)}
+
+    async def fetch_source(self, source: Dict) -> Dict:
+        """
+        Discover and download one state's rate files.
+
+        Returns:
+            Dict with state, status (success, partial, failed, pending),
+            files_found, downloaded (paths), unchanged, failed, files
+            (per-file results), error and metrics (seconds and stage
+            timings, as stored in medicaid_rate_collection_log)
+        """
+        state = source["state"]
+        result = {"state": state, "status": "failed", "files_found": 0, "downloaded": [],
+                  "unchanged": 0, "failed": 0, "files": [], "error": None, "metrics": None}
+        timer = StageTimer()
+
+        if source.get("requires_user_auth"):
+            result.update(status="pending", error="Requires login - download manually")
+            return result
+        page_url = source.get("source_url")
+        if not page_url:
+            result.update(status="pending", error="No source_url configured")
+            return result
+
+        try:
+            with timer.stage("discover") as timed:
+                # Validators exist only if source_url served the file itself before
+                page = await self._get(page_url, _conditional_headers(self._known(page_url)))
+
+                if page["status"] == 304 or not _is_html(page["headers"]):
+                    # source_url is the rate file itself
+                    links = [page_url]
+                else:
+                    text = page.pop("body").decode("utf-8", errors="replace")
+                    links = discover_links(text, page["url"], source.get("regex_pattern"),
+                                           source.get("file_type"))
+                    page = None
+                timed.rows = len(links)
+        except re.error as e:
+            result["error"] = f"Invalid regex_pattern: {e}"
+            return result
+        except (HTTPError, URLError, OSError) as e:
+            result["error"] = f"Source page failed: {e}"
+            return result
+
+        if not links:
+            result["error"] = "No files matched regex_pattern"
+            return result
+        if len(links) > self.max_files:
+            logger.warning(f"{state}: {len(links)} links matched, fetching the first {self.max_files}")
+            links = links[:self.max_files]
+        result["files_found"] = len(links)
+
+        with timer.stage("download") as timed:
+            if page is not None:
+                files = [await self.fetch_file(source, page_url, response=page)]
+            else:
+                files = await asyncio.gather(*(self.fetch_file(source, url) for url in links))
+            timed.rows = len(files)
+
+        result["files"] = files
+        result["downloaded"] = [f["path"] for f in files if f["status"] == "downloaded"]
+        result["unchanged"] = sum(f["status"] == "unchanged" for f in files)
+        result["failed"] = sum(f["status"] == "failed" for f in files)
+        errors = [f"{f['url']}: {f['error']}" for f in files if f["error"]]
+
+        if not result["failed"]:
+            result["status"] = "success"
+        elif result["failed"] < len(files):
+            result["status"] = "partial"
+        result["error"] = "; ".join(errors) or None
+        result["metrics"] = {"seconds": round(timer.seconds, 4), "rows_per_sec": None,
+                             "stages": timer.summary()}
+        return result
+
+    async def run(self, sources: List[Dict]) -> List[Dict]:
+        """Fetch every source concurrently; results are in source order."""
+        self._limit = asyncio.Semaphore(self.concurrency)
+        self._hosts = {}
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        return list(await asyncio.gather(*(self.fetch_source(source) for source in sources)))
+
+
+def fetch_sources(
+    sources: List[Dict],
+    dest_dir: Path,
+    concurrency: int = MAX_CONCURRENCY,
+    per_host: int = PER_HOST_LIMIT,
+    timeout: float = REQUEST_TIMEOUT,
+    max_files: int = MAX_FILES_PER_SOURCE
+) -> List[Dict]:
+    """
+    Fetch rate files for sources into dest_dir/<STATE>/.
+
+    Args:
+        sources: Source dicts (load_sources_csv / load_sources_db)
+        dest_dir: Download directory (holds the fetch manifest)
+        concurrency: Requests in flight overall
+        per_host: Requests in flight per host
+        timeout: Seconds per request
+        max_files: Most files fetched per source
+
+    Returns:
+        One result dict per source (see RateFetcher.fetch_source)
+    """
+    fetcher = RateFetcher(dest_dir, concurrency, per_host, timeout, max_files)
+    start = time.perf_counter()
+    try:
+        return asyncio.run(fetcher.run(sources))
+    finally:
+        fetcher.save_manifest()
+        logger.info(f"Fetched {len(sources)} sources in {time.perf_counter() - start:.1f}s")
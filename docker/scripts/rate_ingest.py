@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Watched-directory ingest for Medicaid rate files.
+Runs update_rates.py --load automatically: files named XX_YYYY-MM_rates.*
+(csv, xlsx, xls) dropped into the ingest directory are parsed, applied as
+a delta to medicaid_rates with the period from the file name as the
+effective date, and the state's new unmatched rates are matched to
+property_master.
+
+- The directory is watched with inotify on Linux, and polled elsewhere
+  (or when inotify is unavailable).
+- A file is picked up once its size and modification time have not
+  changed for the debounce period, so half-copied files are left alone.
+- Files are loaded by a bounded process pool, one file per state at a
+  time, earliest period first.
+- Every file is recorded by SHA-256 in a ledger before it is loaded, so
+  each file's contents are ingested at most once - renamed or re-copied
+  files are skipped, and a file that failed (or was interrupted) stays
+  failed until it is forgotten with --forget.
+
+Usage:
+    python update_rates.py --watch                      # Watch data/medicaid_rates/incoming
+    python update_rates.py --watch /path/to/drop --once # Load what is there, then exit
+    python rate_ingest.py --list                        # Show the ledger
+    python rate_ingest.py --forget FL_2026-01_rates.xlsx  # Allow a file to load again
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import select
+import signal
+import sqlite3
+import struct
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# The loader stack (load_medicaid_rates, update_rates, match_facilities) is
+# imported where files are claimed and loaded, so the watcher starts light
+try:
+    from parse_cache import file_sha256
+except ImportError:
+    # If running from different directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from parse_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+INGEST_DIR = Path(os.getenv(
+    "RATE_INGEST_DIR",
+    Path(__file__).resolve().parents[2] / "data" / "medicaid_rates" / "incoming"
+))
+
+# Ledger of ingested files, kept in the ingest directory unless overridden
+LEDGER_NAME = ".ingest_ledger.sqlite"
+LEDGER_PATH = os.getenv("RATE_INGEST_LEDGER")
+
+INGEST_FILE_PATTERN = re.compile(r"^([A-Z]{2})_(\d{4})-(\d{2})_rates\.(?:csv|xlsx|xls)$", re.IGNORECASE)
+
+# Seconds a file's size and mtime must hold still before it is loaded
+DEBOUNCE_SECONDS = 10
+
+# Directory scan interval without inotify, and the longest inotify wait
+POLL_INTERVAL = 5
+
+DEFAULT_WORKERS = 2
+
+# inotify(7) event masks and inotify_init1 flags
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+# ============================================
+# WATCHING
+# ============================================
+
+class DirectoryWatcher:
+    """
+    Wakes the ingest loop when the directory may have changed.
+
+    With inotify, wait() returns as soon as a file is created, written or
+    moved in; otherwise it sleeps for the timeout and the caller rescans.
+    Either way the caller decides what changed by scanning the directory.
+    """
+
+    def __init__(self, directory: Path, use_inotify: bool = True):
+        self.directory = directory
+        self.fd: Optional[int] = None
+        if use_inotify:
+            try:
+                self.fd = self._open_inotify(directory)
+            except (OSError, AttributeError) as e:
+                logger.info(f"inotify unavailable ({e}), polling {directory}")
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self.fd is not None else "polling"
+
+    @staticmethod
+    def _open_inotify(directory: Path) -> int:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+        return fd
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to timeout seconds; True if the directory reported a change."""
+        if self.fd is None:
+            time.sleep(timeout)
+            return False
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain the queued events; only the wakeup matters
+        try:
+            while os.read(self.fd, 64 * INOTIFY_EVENT.size + 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def scan_directory(directory: Path) -> Dict[Path, Tuple[int, float]]:
+    """(size, mtime) of every ingestable file directly in directory."""
+    files = {}
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return files
+    for entry in entries:
+        if not entry.is_file() or not INGEST_FILE_PATTERN.match(entry.name):
+            continue
+        try:
+            info = entry.stat()
+        except FileNotFoundError:
+            continue
+        if info.st_size:
+            files[Path(entry.path)] = (info.st_size, info.st_mtime)
+    return files
+
+
+class Debouncer:
+    """
+    Holds files back until they stop changing.
+
+    A file is ready once its (size, mtime) has been the same for
+    quiet_seconds. A file seen for the first time counts from its mtime,
+    so files already sitting in the directory at startup are ready at once.
+    """
+
+    def __init__(self, quiet_seconds: float):
+        self.quiet_seconds = quiet_seconds
+        self.pending: Dict[Path, Tuple[Tuple[int, float], float]] = {}
+        self.emitted: Dict[Path, Tuple[int, float]] = {}
+
+    def update(self, files: Dict[Path, Tuple[int, float]], now: Optional[float] = None) -> List[Path]:
+        """Feed a directory scan; returns the files that just became ready."""
+        now = time.time() if now is None else now
+        ready = []
+
+        for path in list(self.pending):
+            if path not in files:
+                del self.pending[path]
+        for path in list(self.emitted):
+            if path not in files:
+                del self.emitted[path]
+
+        for path, signature in files.items():
+            if self.emitted.get(path) == signature:
+                continue
+            previous = self.pending.get(path)
+            if previous is None:
+                # First sight: quiet since its last modification
+                self.pending[path] = (signature, min(signature[1], now))
+            elif previous[0] != signature:
+                self.pending[path] = (signature, now)
+
+            signature, since = self.pending[path]
+            if now - since >= self.quiet_seconds:
+                del self.pending[path]
+                self.emitted[path] = signature
+                ready.append(path)
+        return ready
+
+    def next_deadline(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the next pending file could be ready, or None."""
+        if not self.pending:
+            return None
+        now = time.time() if now is None else now
+        return max(0.0, min(since for _, since in self.pending.values()) + self.quiet_seconds - now)
+
+
+# ============================================
+# LEDGER
+# ============================================
+
+class IngestLedger:
+    """
+    SQLite record of every file the ingest has taken, keyed by SHA-256.
+
+    claim() inserts the file before it is loaded and fails if its hash is
+    already there, so a file's contents are loaded at most once even if
+    the ingest stops mid-load.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingested_files (
+                sha256 TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                state TEXT NOT NULL,
+                period TEXT NOT NULL,
+                status TEXT NOT NULL,
+                claimed_at TEXT NOT NULL,
+                finished_at TEXT,
+                inserted INTEGER,
+                closed INTEGER,
+                matched INTEGER,
+                error TEXT
+            )
+        """)
+        self.conn.commit()
+
+    def claim(self, sha256: str, path: Path, state: str, period: date) -> Optional[Dict]:
+        """
+        Record a file as being loaded.
+
+        Returns:
+            None if claimed, else the existing ledger entry for these contents
+        """
+        try:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO ingested_files (sha256, path, state, period, status, claimed_at) "
+                    "VALUES (?, ?, ?, ?, 'loading', ?)",
+                    (sha256, str(path), state, period.isoformat(),
+                     datetime.now().isoformat(timespec="seconds"))
+                )
+            return None
+        except sqlite3.IntegrityError:
+            return self.get(sha256)
+
+    def finish(self, sha256: str, status: str, inserted: Optional[int] = None,
+               closed: Optional[int] = None, matched: Optional[int] = None,
+               error: Optional[str] = None):
+        """Record the outcome of a claimed file."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE ingested_files SET status = ?, finished_at = ?, inserted = ?, "
+                "closed = ?, matched = ?, error = ? WHERE sha256 = ?",
+                (status, datetime.now().isoformat(timespec="seconds"),
+                 inserted, closed, matched, error, sha256)
+            )
+
+    def get(self, sha256: str) -> Optional[Dict]:
+        self.conn.row_factory = sqlite3.Row
+        try:
+            row = self.conn.execute("SELECT * FROM ingested_files WHERE sha256 = ?", (sha256,)).fetchone()
+        finally:
+            self.conn.row_factory = None
+        return dict(row) if row else None
+
+    def entries(self) -> List[Dict]:
+        """Ledger entries, newest first."""
+        self.conn.row_factory = sqlite3.Row
+        try:
+            rows = self.conn.execute("SELECT * FROM ingested_files ORDER BY claimed_at DESC").fetchall()
+        finally:
+            self.conn.row_factory = None
+        return [dict(row) for row in rows]
+
+    def forget(self, key: str) -> int:
+        """Delete entries by SHA-256 (or prefix), path or file name."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM ingested_files WHERE sha256 LIKE ? OR path = ? OR path LIKE ?",
+                (f"{key}%", key, f"%{os.sep}{Path(key).name}")
+            )
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
+
+
+def default_ledger_path(directory: Path) -> Path:
+    return Path(LEDGER_PATH) if LEDGER_PATH else directory / LEDGER_NAME
+
+
+# ============================================
+# LOADING
+# ============================================
+
+def _init_worker():
+    """Leave Ctrl+C and SIGTERM to the parent, which lets running loads finish."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+def ingest_file(filepath: Path, state: str, period: date, match: bool = True) -> Dict:
+    """
+    Load one file as update_rates.py --load does, then match the state.
+
+    Runs in a pool worker; the loader and matcher are imported here so the
+    watching process stays light.
+
+    Returns:
+        Dict with status, inserted, closed, unchanged, carried, matched,
+        error and seconds
+    """
+    start = time.perf_counter()
+    result = {"status": "failed", "inserted": None, "closed": None, "unchanged": None,
+              "carried": None, "matched": None, "error": None}
+    try:
+        from update_rates import load_new_rates
+        loaded = load_new_rates(state, filepath, period)
+        result.update(
+            inserted=loaded["inserted"],
+            closed=loaded["closed"],
+            unchanged=loaded["unchanged"],
+            carried=loaded["carried"]["facility_id"] + loaded["carried"]["name"],
+        )
+
+        if match and loaded["carried"]["unmatched"]:
+            import match_facilities
+            conn = match_facilities.get_db_connection()
+            try:
+                stats = match_facilities.match_state(conn, state, preview=False, engine="batch")
+            finally:
+                conn.close()
+            result["matched"] = stats["matched"]
+
+        result["status"] = "success"
+    except Exception as e:
+        logger.error(f"{state}: ingest of {filepath.name} failed: {e}")
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def claim_file(ledger: IngestLedger, path: Path) -> Optional[Dict]:
+    """
+    Hash a ready file and claim it in the ledger.
+
+    Returns:
+        Job dict (path, state, period, sha256), or None when the file
+        was already ingested or its name has no valid period
+    """
+    from load_medicaid_rates import parse_compiled_filename
+
+    parsed = parse_compiled_filename(path, INGEST_FILE_PATTERN)
+    if parsed is None:
+        logger.warning(f"Skipping {path.name}: no valid period in the file name")
+        return None
+    state, period = parsed
+
+    try:
+        sha256 = file_sha256(path)
+    except OSError as e:
+        logger.warning(f"Skipping {path.name}: {e}")
+        return None
+
+    existing = ledger.claim(sha256, path, state, period)
+    if existing is not None:
+        # Files already loaded from this path are only worth a note at debug level
+        log = logger.debug if existing["path"] == str(path) else logger.info
+        log(f"Skipping {path.name}: same contents as {Path(existing['path']).name} "
+                    f"({existing['status']} {existing['claimed_at']})")
+        return None
+    return {"path": path, "state": state, "period": period, "sha256": sha256}
+
+
+def _finish(ledger: IngestLedger, job: Dict, future: Future) -> Dict:
+    """Record a finished load in the ledger and return the job with its result."""
+    try:
+        result = future.result()
+    except Exception as e:
+        # The worker itself died (e.g. out of memory)
+        result = {"status": "failed", "inserted": None, "closed": None, "matched": None,
+                  "error": f"worker failed: {e}"}
+    ledger.finish(job["sha256"], result["status"], result["inserted"], result["closed"],
+                  result["matched"], result["error"])
+    _print_result(job, result)
+    return {**job, "result": result}
+
+
+def _print_result(job: Dict, result: Dict):
+    label = f"{job['state']} {job['period']} {job['path'].name}"
+    if result["status"] == "success":
+        matched = f", {result['matched']} matched" if result["matched"] is not None else ""
+        print(f"[{datetime.now():%H:%M:%S}] LOADED {label}: {result['inserted']} inserted, "
+              f"{result['closed']} closed, {result['unchanged']} unchanged, "
+              f"{result['carried']} carried{matched} ({result['seconds']:.1f}s)")
+    else:
+        print(f"[{datetime.now():%H:%M:%S}] FAILED {label}: {result['error']}")
+
+
+def run_ingest(
+    directory: Path = INGEST_DIR,
+    workers: int = DEFAULT_WORKERS,
+    match: bool = True,
+    once: bool = False,
+    debounce: float = DEBOUNCE_SECONDS,
+    poll_interval: float = POLL_INTERVAL,
+    ledger_path: Optional[Path] = None,
+    use_inotify: bool = True
+) -> List[Dict]:
+    """
+    Watch directory and load new rate files until interrupted.
+
+    Args:
+        directory: Directory receiving XX_YYYY-MM_rates.* files
+        workers: Files loaded at once (process pool size)
+        match: Match the state's unmatched rates after each load
+        once: Load the files already in the directory, then return
+        debounce: Seconds a file must stay unchanged before loading
+        poll_interval: Seconds between scans without inotify
+        ledger_path: Ledger file (default: <directory>/.ingest_ledger.sqlite)
+        use_inotify: If False, always poll
+
+    Returns:
+        Finished jobs, each with its ingest_file result under "result"
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    ledger = IngestLedger(ledger_path or default_ledger_path(directory))
+    watcher = DirectoryWatcher(directory, use_inotify=use_inotify and not once)
+    debouncer = Debouncer(debounce)
+
+    waiting: List[Dict] = []
+    running: Dict[Future, Dict] = {}
+    finished: List[Dict] = []
+
+    if once:
+        print(f"Loading rate files in {directory} ({workers} workers)")
+    else:
+        print(f"Watching {directory} ({watcher.mode}, {workers} workers, "
+              f"debounce {debounce:g}s) - Ctrl+C to stop")
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    previous_handler = signal.signal(signal.SIGTERM, stop)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    try:
+        while True:
+            for path in debouncer.update(scan_directory(directory)):
+                job = claim_file(ledger, path)
+                if job:
+                    waiting.append(job)
+
+            # One file per state at a time, earliest period first
+            waiting.sort(key=lambda job: (job["period"], job["state"]))
+            busy = {job["state"] for job in running.values()}
+            for job in list(waiting):
+                if len(running) >= workers:
+                    break
+                if job["state"] in busy:
+                    continue
+                waiting.remove(job)
+                busy.add(job["state"])
+                running[pool.submit(ingest_file, job["path"], job["state"], job["period"], match)] = job
+
+            if once and not running and not waiting and not debouncer.pending:
+                break
+
+            timeout = poll_interval
+            deadline = debouncer.next_deadline()
+            if deadline is not None:
+                timeout = min(timeout, deadline + 0.1)
+            if running:
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                watcher.wait(timeout)
+                done = set()
+
+            for future in done:
+                finished.append(_finish(ledger, running.pop(future), future))
+
+    except KeyboardInterrupt:
+        print(f"\nStopping - waiting for {len(running)} running loads")
+        for future, job in running.items():
+            finished.append(_finish(ledger, job, future))
+        # Files claimed but not started stay out of the ledger
+        for job in waiting:
+            ledger.forget(job["sha256"])
+    finally:
+        pool.shutdown(wait=True)
+        signal.signal(signal.SIGTERM, previous_handler)
+        watcher.close()
+        ledger.close()
+
+    return finished
+
+
+# ============================================
+# REPORTING
+# ============================================
+
+def show_ledger(directory: Path = INGEST_DIR, ledger_path: Optional[Path] = None):
+    """Print the ingest ledger."""
+    path = ledger_path or default_ledger_path(directory)
+    ledger = IngestLedger(path)
+    entries = ledger.entries()
+    ledger.close()
+
+    print("\n" + "=" * 100)
+    print(f"INGEST LEDGER: {path}")
+    print("=" * 100)
+
+    if not entries:
+        print("\nNo files ingested")
+        return
+
+    print(f"\n{'Claimed':<20} {'State':<6} {'Period':<11} {'Status':<8} {'Inserted':>8} "
+          f"{'Closed':>7} {'Matched':>8}  {'SHA-256':<12} File")
+    print("-" * 100)
+    for entry in entries:
+        counts = [entry[k] if entry[k] is not None else "-" for k in ("inserted", "closed", "matched")]
+        print(f"{entry['claimed_at']:<20} {entry['state']:<6} {entry['period']:<11} {entry['status']:<8} "
+              f"{counts[0]:>8} {counts[1]:>7} {counts[2]:>8}  {entry['sha256'][:12]:<12} "
+              f"{Path(entry['path']).name}")
+        if entry["error"]:
+            print(f"{'':<20} {entry['error'][:78]}")
+
+
+# ============================================
+# CLI ENTRY POINT
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect the rate file ingest ledger (run the ingest with update_rates.py --watch)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python rate_ingest.py --list
+    python rate_ingest.py --forget FL_2026-01_rates.xlsx
+    python rate_ingest.py --list --dir /path/to/drop
+        """
+    )
+
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Show ingested files"
+    )
+
+    parser.add_argument(
+        "--forget",
+        type=str,
+        metavar="FILE_OR_HASH",
+        help="Remove a file (name, path or SHA-256 prefix) from the ledger so it loads again"
+    )
+
+    parser.add_argument(
+        "--dir",
+        type=str,
+        default=str(INGEST_DIR),
+        help=f"Ingest directory (default: {INGEST_DIR})"
+    )
+
+    args = parser.parse_args()
+    directory = Path(args.dir)
+
+    if args.forget:
+        ledger = IngestLedger(default_ledger_path(directory))
+        removed = ledger.forget(args.forget)
+        ledger.close()
+        print(f"Removed {removed} ledger entries for {args.forget}")
+    elif args.list:
+        show_ledger(directory)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
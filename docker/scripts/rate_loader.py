@@ -0,0 +1,1106 @@
+"""
+Bulk loader for medicaid_rates.
+Streams a DataFrame, CSV file or iterable of dict rows into medicaid_rates
+with chunked executemany (sent as multi-row INSERTs) instead of one
+execute per row. A chunk that fails is retried row by row, and rows that
+still fail are written to a rejects CSV next to the error message.
+
+upsert_rates applies a new rate period as a delta: rows are compared with
+the state's current rates on a natural key (state_facility_id, else the
+normalized name), and only changed, new and dropped facilities are written.
+backfill_rates loads many periods at once (a melted multi-period file) as
+effective_date/end_date chains merged into the history already loaded.
+RateStage builds a full state reload in a session-private staging table,
+validates it, and publishes it as the same delta, diffed in SQL against
+the current rows, in one transaction.
+
+Usage:
+    from rate_loader import bulk_insert_rates, upsert_rates
+
+    result = bulk_insert_rates(conn, df, defaults={"rate_type": "total"})
+    print(result["inserted"], result["rows_per_sec"])
+
+    result = upsert_rates(conn, "FL", df, effective_date=date(2026, 1, 1))
+    print(result["inserted"], result["closed"], result["unchanged"])
+
+    result = backfill_rates(conn, "MO", history_df)   # one row per facility per period
+
+    with RateStage(conn, "FL") as stage:
+        stage.insert(df)
+        stage.check()                                  # raises ValueError on bad data
+        stage.publish()                                # delta UPDATE/INSERT ... SELECT
+"""
+
+import csv
+import hashlib
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from mysql.connector import Error
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    from match_memory import normalize_facility_id
+    from name_normalizer import normalize_facility_name
+except ImportError:
+    # If running from different directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from match_memory import normalize_facility_id
+    from name_normalizer import normalize_facility_name
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# medicaid_rates columns written by the loader, in INSERT order
+# (rate_hash is filled in by bulk_insert_rates; see _with_rate_hash)
+RATE_COLUMNS = (
+    "state", "facility_name", "state_facility_id", "daily_rate",
+    "rate_type", "effective_date", "source_file", "data_source",
+    "natural_key", "end_date", "rate_hash",
+)
+
+# Rows per executemany call
+LOAD_CHUNK_SIZE = 5000
+
+# Ids per UPDATE ... WHERE id IN (...) when closing rows
+CLOSE_CHUNK_SIZE = 1000
+
+# medicaid_rates.natural_key column width
+MAX_NATURAL_KEY_LENGTH = 255
+
+# Where rejected rows go when no rejects_path is given
+REJECTS_DIR = Path(__file__).parent / "rejects"
+
+# Session-private table a reload is staged in (see RateStage)
+STAGE_TABLE = "tmp_medicaid_rates_stage"
+
+# A reload may not shrink a state's current rates below this fraction
+MIN_RETAINED_FRACTION = 0.5
+
+
+def _insert_sql(table: str) -> str:
+    return f"""
+    INSERT INTO {table} ({", ".join(RATE_COLUMNS)})
+    VALUES ({", ".join(["%s"] * len(RATE_COLUMNS))})
+"""
+
+
+INSERT_SQL = _insert_sql("medicaid_rates")
+
+RateSource = Union["pd.DataFrame", str, Path, Iterable[Dict]]
+
+
+# ============================================
+# ROW SOURCES
+# ============================================
+
+def _frame_chunk_rows(
+    df: "pd.DataFrame",
+    defaults: Dict,
+    overrides: Dict
+) -> List[Tuple]:
+    """Convert a DataFrame chunk to INSERT tuples (NaN -> None)."""
+    chunk = df.reindex(columns=RATE_COLUMNS)
+    for column, value in defaults.items():
+        if column not in df.columns:
+            chunk[column] = value
+    for column, value in overrides.items():
+        chunk[column] = value
+
+    # object dtype yields Python scalars, which mysql.connector can convert
+    chunk = chunk.astype(object).where(chunk.notna(), None)
+    return list(chunk.itertuples(index=False, name=None))
+
+
+def _iter_chunks(
+    source: RateSource,
+    defaults: Dict,
+    overrides: Dict,
+    chunk_size: int
+) -> Iterator[List[Tuple]]:
+    """Yield lists of INSERT tuples from any supported source."""
+    import pandas as pd
+
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield _frame_chunk_rows(source.iloc[start:start + chunk_size], defaults, overrides)
+        return
+
+    if isinstance(source, (str, Path)):
+        # IDs stay strings so leading zeros survive
+        reader = pd.read_csv(
+            source, chunksize=chunk_size, dtype={"state_facility_id": str}
+        )
+        for chunk in reader:
+            yield _frame_chunk_rows(chunk, defaults, overrides)
+        return
+
+    batch: List[Tuple] = []
+    for row in source:
+        batch.append(tuple(
+            overrides[column] if column in overrides
+            else row.get(column, defaults.get(column))
+            for column in RATE_COLUMNS
+        ))
+        if len(batch) >= chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+_HASH_FIELDS = tuple(RATE_COLUMNS.index(column) for column in ("facility_name", "daily_rate", "rate_type"))
+
+
+def _with_rate_hash(rows: List[Tuple]) -> List[Tuple]:
+    """Fill in rate_hash (the last column) where a row does not carry one."""
+    name, rate, rate_type = _HASH_FIELDS
+    return [
+        row if row[-1] else row[:-1] + (rate_hash(row[name], row[rate], row[rate_type]),)
+        for row in rows
+    ]
+
+
+# ============================================
+# REJECTS
+# ============================================
+
+class RejectsWriter:
+    """CSV side file for rows the database refused, opened on first reject."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, row: Tuple, error: Exception):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(RATE_COLUMNS + ("error",))
+        self._writer.writerow(row + (str(error),))
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def default_rejects_path(label: str) -> Path:
+    """Timestamped rejects file under REJECTS_DIR."""
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return REJECTS_DIR / f"{label}_rejects_{stamp}.csv"
+
+
+# ============================================
+# LOADER
+# ============================================
+
+def bulk_insert_rates(
+    conn,
+    source: RateSource,
+    defaults: Optional[Dict] = None,
+    overrides: Optional[Dict] = None,
+    chunk_size: int = LOAD_CHUNK_SIZE,
+    rejects_path: Optional[Path] = None,
+    commit: bool = True,
+    label: str = "medicaid_rates",
+    table: str = "medicaid_rates"
+) -> Dict:
+    """
+    Insert rate rows into medicaid_rates (or a staging copy) in chunks.
+
+    Args:
+        conn: Database connection
+        source: DataFrame, path to a CSV file, or iterable of dict rows
+        defaults: Values for columns the source does not have
+        overrides: Values applied to every row (e.g. state, data_source)
+        chunk_size: Rows per executemany call
+        rejects_path: CSV for rejected rows (default: REJECTS_DIR/<label>_rejects_<ts>.csv)
+        commit: Commit when done; pass False to keep the caller's transaction open
+        label: Name used in log lines and the default rejects file name
+        table: Target table with the medicaid_rates columns
+
+    Returns:
+        Dict with inserted, rejected, seconds, rows_per_sec and rejects_path
+        (None when nothing was rejected)
+    """
+    insert_sql = INSERT_SQL if table == "medicaid_rates" else _insert_sql(table)
+    defaults = defaults or {}
+    overrides = overrides or {}
+    rejects = RejectsWriter(Path(rejects_path) if rejects_path else default_rejects_path(label))
+
+    inserted = 0
+    start = time.perf_counter()
+    cursor = conn.cursor()
+
+    try:
+        for rows in _iter_chunks(source, defaults, overrides, chunk_size):
+            if not rows:
+                continue
+            rows = _with_rate_hash(rows)
+            try:
+                cursor.executemany(insert_sql, rows)
+                inserted += len(rows)
+                continue
+            except Error:
+                # The multi-row INSERT is rolled back as one statement;
+                # retry row by row to find the bad rows
+                pass
+
+            for row in rows:
+                try:
+                    cursor.execute(insert_sql, row)
+                    inserted += 1
+                except Error as e:
+                    logger.warning(f"Insert failed for {row[1]}: {e}")
+                    rejects.write(row, e)
+
+        if commit:
+            conn.commit()
+    finally:
+        cursor.close()
+        rejects.close()
+
+    elapsed = time.perf_counter() - start
+    rows_per_sec = inserted / elapsed if elapsed else 0.0
+
+    logger.info(f"{label}: Inserted {inserted:,} rows in {elapsed:.2f}s ({rows_per_sec:,.0f} rows/sec)")
+    if rejects.count:
+        logger.warning(f"{label}: {rejects.count} rows rejected - see {rejects.path}")
+
+    return {
+        "inserted": inserted,
+        "rejected": rejects.count,
+        "seconds": elapsed,
+        "rows_per_sec": rows_per_sec,
+        "rejects_path": rejects.path if rejects.count else None,
+    }
+
+
+# ============================================
+# DELTA UPSERT (SCD2)
+# ============================================
+
+def natural_key(state_facility_id, facility_name: Optional[str]) -> Optional[str]:
+    """
+    A facility's key within its state: the normalized state_facility_id
+    when there is one, else the normalized facility name. Leading zeros of
+    numeric IDs are dropped - spreadsheets keep them only sometimes.
+    """
+    facility_id = normalize_facility_id(state_facility_id)
+    if facility_id and facility_id.isdigit():
+        facility_id = facility_id.lstrip("0") or "0"
+    if facility_id:
+        return f"id:{facility_id}"[:MAX_NATURAL_KEY_LENGTH]
+
+    name = normalize_facility_name(facility_name) if facility_name else ""
+    if name:
+        return f"name:{name}"[:MAX_NATURAL_KEY_LENGTH]
+    return None
+
+
+def rate_hash(facility_name: Optional[str], daily_rate, rate_type: Optional[str]) -> str:
+    """Hash of the fields that make a rate row different from its predecessor."""
+    name = normalize_facility_name(facility_name) if facility_name else ""
+    try:
+        rate = f"{float(daily_rate):.2f}"
+    except (TypeError, ValueError):
+        rate = str(daily_rate or "")
+    blob = f"{name}|{rate}|{rate_type or 'total'}"
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _as_date(value) -> Optional[date]:
+    import pandas as pd
+
+    if value is None or (not isinstance(value, date) and pd.isna(value)):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def _source_frame(source: RateSource, defaults: Dict, overrides: Dict) -> "pd.DataFrame":
+    """Materialize any supported source as a RATE_COLUMNS frame."""
+    import pandas as pd
+
+    if isinstance(source, pd.DataFrame):
+        df = source.copy()
+    elif isinstance(source, (str, Path)):
+        df = pd.read_csv(source, dtype={"state_facility_id": str})
+    else:
+        df = pd.DataFrame(list(source))
+
+    frame = df.reindex(columns=RATE_COLUMNS)
+    for column, value in defaults.items():
+        if column not in df.columns:
+            frame[column] = value
+    for column, value in overrides.items():
+        frame[column] = value
+
+    return frame.astype(object).where(frame.notna(), None)
+
+
+def _fetch_current(conn, state: str) -> Tuple[Dict[str, Dict], List[Tuple[int, Optional[date]]]]:
+    """
+    Current rows for a state keyed by natural key.
+
+    Returns:
+        ({natural_key: row}, (id, effective_date of the row replacing it)
+        for older current rows sharing a key)
+    """
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT id, state_facility_id, facility_name, daily_rate, rate_type,
+                   effective_date, natural_key, rate_hash
+            FROM medicaid_rates
+            WHERE state = %s AND end_date IS NULL
+            ORDER BY effective_date, id
+        """, (state,))
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    current: Dict[str, Dict] = {}
+    duplicates: List[Tuple[int, Optional[date]]] = []
+    for row in rows:
+        key = natural_key(row["state_facility_id"], row["facility_name"])
+        if key is None:
+            continue
+        row["key"] = key
+        row["stored_hash"] = row.pop("rate_hash")
+        row["hash"] = rate_hash(row["facility_name"], row["daily_rate"], row["rate_type"])
+        row["effective_date"] = _as_date(row["effective_date"])
+        if key in current:
+            # Legacy full reloads left several current rows - keep the newest
+            # (rows come oldest first) and end the older one where it starts
+            duplicates.append((current[key]["id"], row["effective_date"]))
+        current[key] = row
+
+    return current, duplicates
+
+
+def _fetch_closed_periods(conn, state: str) -> Dict[str, date]:
+    """
+    Latest end_date of each facility's closed rows. Rows loaded before
+    natural_key existed are keyed here, as _fetch_current does.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT natural_key, MAX(COALESCE(end_date, effective_date))
+            FROM medicaid_rates
+            WHERE state = %s AND end_date IS NOT NULL AND natural_key IS NOT NULL
+            GROUP BY natural_key
+        """, (state,))
+        closed = {key: _as_date(latest) for key, latest in cursor.fetchall()}
+
+        cursor.execute("""
+            SELECT state_facility_id, facility_name, MAX(COALESCE(end_date, effective_date))
+            FROM medicaid_rates
+            WHERE state = %s AND end_date IS NOT NULL AND natural_key IS NULL
+            GROUP BY state_facility_id, facility_name
+        """, (state,))
+        legacy = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    for facility_id, name, latest in legacy:
+        key = natural_key(facility_id, name)
+        latest = _as_date(latest)
+        if key and latest and (key not in closed or latest > closed[key]):
+            closed[key] = latest
+    return closed
+
+
+def _close_rows(cursor, closes: Dict[date, List[int]]) -> int:
+    """Set end_date on rows, grouped by end date."""
+    closed = 0
+    for end_date, ids in closes.items():
+        for start in range(0, len(ids), CLOSE_CHUNK_SIZE):
+            chunk = ids[start:start + CLOSE_CHUNK_SIZE]
+            cursor.execute(
+                f"UPDATE medicaid_rates SET end_date = %s "
+                f"WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                (end_date, *chunk)
+            )
+            closed += cursor.rowcount
+    return closed
+
+
+def upsert_rates(
+    conn,
+    state: str,
+    source: RateSource,
+    effective_date: Optional[date] = None,
+    defaults: Optional[Dict] = None,
+    overrides: Optional[Dict] = None,
+    chunk_size: int = LOAD_CHUNK_SIZE,
+    rejects_path: Optional[Path] = None,
+    commit: bool = True,
+    label: Optional[str] = None
+) -> Dict:
+    """
+    Apply a rate file to a state's current rates as a delta (SCD type 2).
+
+    Incoming rows are keyed by natural_key and compared with the current
+    row for the same key by rate_hash:
+      - same hash: left alone (the current row stays open)
+      - different hash: current row closed at the new effective_date and
+        the new row inserted (corrected in place if the dates are equal)
+      - no current row: inserted
+      - current row not in the file: closed (facility dropped out)
+    Rows no newer than what is already loaded for their key are ignored,
+    so re-running the same or an older file is a no-op.
+
+    Args:
+        conn: Database connection
+        state: Two-letter state code
+        source: DataFrame, path to a CSV file, or iterable of dict rows
+        effective_date: Effective date for every row; None uses each row's
+            own effective_date
+        defaults: Values for columns the source does not have
+        overrides: Values applied to every row (e.g. data_source)
+        chunk_size: Rows per executemany call for inserts
+        rejects_path: CSV for rejected rows (see bulk_insert_rates)
+        commit: Commit when done; pass False to keep the caller's transaction open
+        label: Name used in log lines (default: state)
+
+    Returns:
+        Dict with inserted, closed, unchanged, corrected, retired, stale,
+        rejected, seconds, rows_per_sec and rejects_path
+    """
+    label = label or state
+    overrides = {**(overrides or {}), "state": state}
+    if effective_date is not None:
+        overrides["effective_date"] = effective_date
+
+    start = time.perf_counter()
+    frame = _source_frame(source, {"rate_type": "total", **(defaults or {})}, overrides)
+    frame["effective_date"] = [_as_date(value) for value in frame["effective_date"]]
+    if frame["effective_date"].isna().any():
+        raise ValueError(f"{label}: rows without an effective_date and none given")
+
+    frame["natural_key"] = [
+        natural_key(facility_id, name)
+        for facility_id, name in zip(frame["state_facility_id"], frame["facility_name"])
+    ]
+    keyless = frame["natural_key"].isna().sum()
+    if keyless:
+        logger.warning(f"{label}: skipped {keyless} rows with no facility ID or name")
+    frame = frame[frame["natural_key"].notna()]
+
+    before = len(frame)
+    frame = frame.drop_duplicates(subset=["natural_key"], keep="first")
+    if len(frame) < before:
+        logger.warning(f"{label}: dropped {before - len(frame)} rows with a repeated facility key")
+
+    current, duplicates = _fetch_current(conn, state)
+    closed_periods = _fetch_closed_periods(conn, state)
+
+    closes: Dict[date, List[int]] = defaultdict(list)
+    corrections: List[Tuple] = []
+    key_backfill: List[Tuple] = []
+    insert_mask: List[bool] = []
+    unchanged = corrected = stale = 0
+
+    latest = max(frame["effective_date"], default=None)
+    for duplicate_id, replaced_at in duplicates:
+        if replaced_at or latest:
+            closes[replaced_at or latest].append(duplicate_id)
+
+    seen = set()
+    for row in frame.itertuples(index=False):
+        seen.add(row.natural_key)
+        existing = current.get(row.natural_key)
+        if existing is None:
+            # A closed facility only comes back from a period starting on
+            # or after its history ended (e.g. not from an older file
+            # loaded after it was retired)
+            closed_at = closed_periods.get(row.natural_key)
+            if closed_at and row.effective_date < closed_at:
+                stale += 1
+                insert_mask.append(False)
+            else:
+                insert_mask.append(True)
+            continue
+
+        insert_mask.append(False)
+        if existing["effective_date"] and existing["effective_date"] > row.effective_date:
+            stale += 1
+        elif existing["hash"] == rate_hash(row.facility_name, row.daily_rate, row.rate_type):
+            unchanged += 1
+            if existing["natural_key"] != row.natural_key or existing["stored_hash"] != existing["hash"]:
+                key_backfill.append((row.natural_key, existing["hash"], existing["id"]))
+        elif existing["effective_date"] == row.effective_date:
+            corrected += 1
+            corrections.append((
+                row.facility_name, row.state_facility_id, row.daily_rate, row.rate_type,
+                row.source_file, row.data_source, row.natural_key,
+                rate_hash(row.facility_name, row.daily_rate, row.rate_type), existing["id"]
+            ))
+        else:
+            closes[row.effective_date].append(existing["id"])
+            insert_mask[-1] = True
+
+    retired = 0
+    for key, existing in current.items():
+        if key not in seen and latest and (
+            not existing["effective_date"] or existing["effective_date"] <= latest
+        ):
+            closes[latest].append(existing["id"])
+            retired += 1
+
+    cursor = conn.cursor()
+    try:
+        closed = _close_rows(cursor, closes)
+        if key_backfill:
+            cursor.executemany(
+                "UPDATE medicaid_rates SET natural_key = %s, rate_hash = %s WHERE id = %s",
+                key_backfill
+            )
+        if corrections:
+            cursor.executemany("""
+                UPDATE medicaid_rates
+                SET facility_name = %s, state_facility_id = %s, daily_rate = %s,
+                    rate_type = %s, source_file = %s, data_source = %s, natural_key = %s,
+                    rate_hash = %s
+                WHERE id = %s
+            """, corrections)
+    finally:
+        cursor.close()
+
+    result = bulk_insert_rates(
+        conn,
+        frame[insert_mask],
+        chunk_size=chunk_size,
+        rejects_path=rejects_path,
+        commit=commit,
+        label=label
+    )
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"{label}: {result['inserted']:,} inserted, {closed:,} closed, "
+        f"{unchanged:,} unchanged, {corrected:,} corrected in {elapsed:.2f}s"
+    )
+    if stale:
+        logger.warning(f"{label}: {stale:,} rows already loaded for the same or a newer period were ignored")
+
+    return {
+        **result,
+        "closed": closed,
+        "unchanged": unchanged,
+        "corrected": corrected,
+        "retired": retired,
+        "stale": stale,
+        "seconds": elapsed,
+    }
+
+
+# ============================================
+# MULTI-PERIOD BACKFILL
+# ============================================
+
+def collapse_rate_runs(frame: "pd.DataFrame", periods: List[date]) -> "pd.DataFrame":
+    """
+    Collapse a long history (one row per facility per period) into runs.
+
+    Consecutive periods with the same rate_hash for a facility become one
+    row effective from the first period; its end_date is the next period
+    after the run's last, or None when the run reaches the latest period.
+    A facility missing from a period ends its run there.
+
+    Args:
+        frame: Rows with natural_key, effective_date and the rate_hash fields
+        periods: Every period in the file, oldest first
+
+    Returns:
+        One row per run with an end_date column
+    """
+    import pandas as pd
+
+    period_index = {period: i for i, period in enumerate(periods)}
+
+    frame = frame.sort_values(["natural_key", "effective_date"], kind="stable")
+    position = frame["effective_date"].map(period_index)
+    row_hash = pd.Series(
+        [rate_hash(name, rate, rate_type) for name, rate, rate_type
+         in zip(frame["facility_name"], frame["daily_rate"], frame["rate_type"])],
+        index=frame.index
+    )
+
+    continues = (
+        frame["natural_key"].eq(frame["natural_key"].shift())
+        & row_hash.eq(row_hash.shift())
+        & position.eq(position.shift() + 1)
+    )
+    run_id = (~continues).cumsum()
+    last_position = position.groupby(run_id).transform("max")
+
+    runs = frame[~continues].copy()
+    runs["end_date"] = [
+        periods[i + 1] if i + 1 < len(periods) else None
+        for i in last_position[~continues]
+    ]
+    return runs
+
+
+def _fetch_history(conn, state: str) -> Dict[str, List[Dict]]:
+    """Every row for a state, keyed by natural key (key and hash computed for legacy rows)."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT id, state_facility_id, facility_name, daily_rate, rate_type,
+                   effective_date, end_date, rate_hash
+            FROM medicaid_rates
+            WHERE state = %s
+        """, (state,))
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    history: Dict[str, List[Dict]] = defaultdict(list)
+    for row in rows:
+        key = natural_key(row["state_facility_id"], row["facility_name"])
+        if key is None:
+            continue
+        row["effective_date"] = _as_date(row["effective_date"])
+        row["end_date"] = _as_date(row["end_date"])
+        row["hash"] = row["rate_hash"] or rate_hash(row["facility_name"], row["daily_rate"], row["rate_type"])
+        history[key].append(row)
+    return history
+
+
+def backfill_rates(
+    conn,
+    state: str,
+    history: RateSource,
+    defaults: Optional[Dict] = None,
+    overrides: Optional[Dict] = None,
+    chunk_size: int = LOAD_CHUNK_SIZE,
+    rejects_path: Optional[Path] = None,
+    commit: bool = True,
+    label: Optional[str] = None
+) -> Dict:
+    """
+    Load a multi-period rate history for a state in one pass.
+
+    history has one row per facility per period (see
+    load_medicaid_rates.process_file_periods). Unchanged consecutive
+    periods are collapsed (collapse_rate_runs), and the resulting runs are
+    merged into each facility's existing chain: periods already loaded are
+    skipped, a run next to an existing row with the same rate_hash extends
+    that row (its effective_date moves earlier or its end_date later)
+    instead of adding a boundary where nothing changed, and every row's
+    end_date - new or existing - is capped at the next row's
+    effective_date, so v_rate_history and v_rate_changes see one continuous
+    chain however the periods arrived.
+
+    Args:
+        conn: Database connection
+        state: Two-letter state code
+        history: DataFrame, path to a CSV file, or iterable of dict rows,
+            each with its own effective_date
+        defaults: Values for columns the source does not have
+        overrides: Values applied to every row (e.g. data_source)
+        chunk_size: Rows per executemany call for inserts
+        rejects_path: CSV for rejected rows (see bulk_insert_rates)
+        commit: Commit when done; pass False to keep the caller's transaction open
+        label: Name used in log lines (default: state)
+
+    Returns:
+        Dict with periods, runs, inserted, already_loaded, extended (runs
+        merged into an existing row), end_dates_updated, rejected, seconds,
+        rows_per_sec and rejects_path
+    """
+    label = label or state
+    start = time.perf_counter()
+
+    frame = _source_frame(
+        history, {"rate_type": "total", **(defaults or {})}, {**(overrides or {}), "state": state}
+    )
+    frame["effective_date"] = [_as_date(value) for value in frame["effective_date"]]
+    if frame["effective_date"].isna().any():
+        raise ValueError(f"{label}: history rows must each have an effective_date")
+
+    frame["natural_key"] = [
+        natural_key(facility_id, name)
+        for facility_id, name in zip(frame["state_facility_id"], frame["facility_name"])
+    ]
+    frame = frame[frame["natural_key"].notna()]
+    frame = frame.drop_duplicates(subset=["natural_key", "effective_date"], keep="first")
+
+    periods = sorted(frame["effective_date"].unique())
+    runs = collapse_rate_runs(frame, periods)
+    runs["rate_hash"] = [
+        rate_hash(name, rate, rate_type) for name, rate, rate_type
+        in zip(runs["facility_name"], runs["daily_rate"], runs["rate_type"])
+    ]
+    run_count = len(runs)
+
+    existing = _fetch_history(conn, state)
+    new_end_dates: Dict = {}
+    updates: List[Tuple] = []
+    already_loaded = 0
+    extended = 0
+
+    for key, key_runs in runs.groupby("natural_key", sort=False):
+        rows = existing.get(key, [])
+        loaded = {row["effective_date"] for row in rows}
+
+        chain = [dict(row, new=False) for row in rows]
+        for index, run in zip(key_runs.index, key_runs.itertuples(index=False)):
+            if run.effective_date in loaded:
+                already_loaded += 1
+                continue
+            chain.append({
+                "index": index, "effective_date": run.effective_date,
+                "end_date": run.end_date, "hash": run.rate_hash, "new": True,
+            })
+        chain.sort(key=lambda item: item["effective_date"])
+
+        # A new run touching a row with the same hash is the same rate:
+        # extend the existing row rather than start a new one
+        merged: List[Dict] = []
+        for item in chain:
+            previous = merged[-1] if merged else None
+            if (previous is not None and previous["hash"] == item["hash"]
+                    and (previous["new"] or item["new"])
+                    and (previous["end_date"] is None
+                         or previous["end_date"] >= item["effective_date"])):
+                survivor = item if previous["new"] and not item["new"] else previous
+                merged[-1] = dict(survivor, effective_date=previous["effective_date"],
+                                  end_date=item["end_date"])
+                extended += not (previous["new"] and item["new"])
+                continue
+            merged.append(item)
+
+        originals = {row["id"]: row for row in rows}
+        for item, following in zip(merged, merged[1:] + [None]):
+            end_date = item["end_date"]
+            if following and (end_date is None or end_date > following["effective_date"]):
+                end_date = following["effective_date"]
+            if item["new"]:
+                new_end_dates[item["index"]] = end_date
+                continue
+            original = originals[item["id"]]
+            if (item["effective_date"], end_date) != (original["effective_date"], original["end_date"]):
+                updates.append((item["effective_date"], end_date, item["id"]))
+
+    runs = runs[runs.index.isin(list(new_end_dates))].copy()
+    runs["end_date"] = [new_end_dates[index] for index in runs.index]
+
+    if updates:
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(
+                "UPDATE medicaid_rates SET effective_date = %s, end_date = %s WHERE id = %s", updates
+            )
+        finally:
+            cursor.close()
+
+    result = bulk_insert_rates(
+        conn,
+        runs,
+        chunk_size=chunk_size,
+        rejects_path=rejects_path,
+        commit=commit,
+        label=label
+    )
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"{label}: {len(periods)} periods, {len(frame):,} facility-periods -> "
+        f"{run_count:,} runs; {result['inserted']:,} inserted, {already_loaded:,} already "
+        f"loaded, {extended:,} extended, {len(updates):,} rows updated in {elapsed:.2f}s"
+    )
+
+    return {
+        **result,
+        "periods": len(periods),
+        "runs": run_count,
+        "already_loaded": already_loaded,
+        "extended": extended,
+        "end_dates_updated": len(updates),
+        "seconds": elapsed,
+    }
+
+
+# ============================================
+# STAGED RELOAD
+# ============================================
+
+class RateStage:
+    """
+    Staged full reload of one state's current rates.
+
+    Rows are inserted into a temporary copy of medicaid_rates (private to
+    this connection, so nothing is visible while the load runs), checked,
+    and published in one transaction that applies them the way
+    upsert_rates does, so a reload keeps the same effective_date/end_date
+    history as an update: unchanged rows stay, rows from an older period
+    than the current rates are ignored and a rerun of the same file adds
+    nothing. The diff runs in SQL on natural_key and rate_hash, so neither
+    the file nor the current rates are held in memory. Readers of
+    medicaid_rates and v_current_medicaid_rates see either the old rates
+    or the new ones, never a half-loaded state.
+    """
+
+    def __init__(self, conn, state: str, label: Optional[str] = None):
+        self.conn = conn
+        self.state = state
+        self.label = label or state
+        self.staged = 0
+        self.rejected = 0
+
+    def __enter__(self) -> "RateStage":
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGE_TABLE}")
+            # LIKE copies columns and indexes (not foreign keys)
+            cursor.execute(f"CREATE TEMPORARY TABLE {STAGE_TABLE} LIKE medicaid_rates")
+        finally:
+            cursor.close()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGE_TABLE}")
+        finally:
+            cursor.close()
+
+    def insert(self, source: RateSource, **kwargs) -> Dict:
+        """Stage rows (bulk_insert_rates arguments); may be called once per chunk."""
+        overrides = {**kwargs.pop("overrides", {}), "state": self.state}
+        defaults = {"rate_type": "total", **(kwargs.pop("defaults", None) or {})}
+        frame = _source_frame(source, defaults, overrides)
+        frame["natural_key"] = [
+            natural_key(facility_id, name)
+            for facility_id, name in zip(frame["state_facility_id"], frame["facility_name"])
+        ]
+        result = bulk_insert_rates(self.conn, frame, label=self.label, table=STAGE_TABLE, **kwargs)
+        self.staged += result["inserted"]
+        self.rejected += result["rejected"]
+        return result
+
+    def validate(self, min_retained: float = MIN_RETAINED_FRACTION) -> List[str]:
+        """
+        Check the staged rows before publishing.
+
+        Returns:
+            Problems found (empty when the stage can be published)
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT
+                    COUNT(*),
+                    SUM(facility_name IS NULL OR TRIM(facility_name) = ''),
+                    SUM(daily_rate IS NULL OR daily_rate <= 0),
+                    SUM(effective_date IS NULL),
+                    COUNT(*) - COUNT(DISTINCT CAST(facility_name AS BINARY)),
+                    COUNT(natural_key) - COUNT(DISTINCT natural_key),
+                    SUM(natural_key IS NULL),
+                    MAX(effective_date)
+                FROM {STAGE_TABLE}
+            """)
+            (staged, blank_names, bad_rates, no_dates, duplicates,
+             duplicate_keys, keyless, staged_period) = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT COUNT(*), MAX(effective_date) FROM medicaid_rates
+                WHERE state = %s AND end_date IS NULL
+            """, (self.state,))
+            current, current_period = cursor.fetchone()
+        finally:
+            cursor.close()
+
+        problems = []
+        if not staged:
+            problems.append("no rows staged")
+        if self.rejected:
+            # e.g. a repeated facility key and period, refused by the
+            # unique index the stage copies from medicaid_rates
+            problems.append(f"{self.rejected} rows rejected while staging")
+        if blank_names:
+            problems.append(f"{blank_names} rows without a facility name")
+        if bad_rates:
+            problems.append(f"{bad_rates} rows without a positive daily_rate")
+        if no_dates:
+            problems.append(f"{no_dates} rows without an effective_date")
+        if duplicates:
+            problems.append(f"{duplicates} duplicate facility names")
+        if duplicate_keys:
+            problems.append(f"{duplicate_keys} rows repeat another row's facility ID or name")
+        if keyless:
+            problems.append(f"{keyless} rows with no usable facility ID or name")
+        staged_period, current_period = _as_date(staged_period), _as_date(current_period)
+        if staged_period and current_period and current_period > staged_period:
+            problems.append(
+                f"current rates are for {current_period}, newer than the staged {staged_period}"
+            )
+        if current and staged < current * min_retained:
+            problems.append(
+                f"{staged} staged rows would replace {current} current rates "
+                f"(below {min_retained:.0%})"
+            )
+        return problems
+
+    def check(self, min_retained: float = MIN_RETAINED_FRACTION):
+        """validate(), raising ValueError if anything is wrong."""
+        problems = self.validate(min_retained)
+        if problems:
+            raise ValueError(f"{self.label}: staged reload rejected - {'; '.join(problems)}")
+
+    def publish(self) -> Dict:
+        """
+        Apply the staged rows as the state's current rates.
+
+        The same delta as upsert_rates, in SQL: current rows are matched to
+        staged rows on natural_key; same-period changes are corrected in
+        place, changed rows are closed at the staged effective_date and
+        current rows missing from the stage at its latest period, and the
+        staged rows with no current row (and no history ending after them)
+        are copied in with INSERT ... SELECT. Committed as one transaction.
+
+        Returns:
+            Dict with inserted, closed, unchanged, corrected, retired,
+            stale and seconds (time the publish took)
+        """
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT MAX(effective_date) FROM {STAGE_TABLE}")
+            latest = cursor.fetchone()[0]
+
+            closed = self._key_current_rows(cursor, _as_date(latest))
+
+            cursor.execute(f"""
+                SELECT COUNT(*)
+                FROM {STAGE_TABLE} s
+                JOIN medicaid_rates m ON m.state = %s AND m.natural_key = s.natural_key
+                WHERE m.end_date IS NULL
+                  AND m.rate_hash = s.rate_hash
+                  AND m.effective_date <= s.effective_date
+            """, (self.state,))
+            unchanged = cursor.fetchone()[0]
+
+            cursor.execute(f"""
+                UPDATE medicaid_rates m
+                JOIN {STAGE_TABLE} s
+                  ON s.natural_key = m.natural_key AND s.effective_date = m.effective_date
+                SET m.facility_name = s.facility_name, m.state_facility_id = s.state_facility_id,
+                    m.daily_rate = s.daily_rate, m.rate_type = s.rate_type,
+                    m.source_file = s.source_file, m.data_source = s.data_source,
+                    m.rate_hash = s.rate_hash
+                WHERE m.state = %s AND m.end_date IS NULL AND m.rate_hash <> s.rate_hash
+            """, (self.state,))
+            corrected = cursor.rowcount
+
+            cursor.execute(f"""
+                UPDATE medicaid_rates m
+                JOIN {STAGE_TABLE} s ON s.natural_key = m.natural_key
+                SET m.end_date = s.effective_date
+                WHERE m.state = %s AND m.end_date IS NULL
+                  AND m.effective_date < s.effective_date AND m.rate_hash <> s.rate_hash
+            """, (self.state,))
+            closed += cursor.rowcount
+
+            cursor.execute(f"""
+                UPDATE medicaid_rates SET end_date = %s
+                WHERE state = %s AND end_date IS NULL AND natural_key IS NOT NULL
+                  AND effective_date <= %s
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {STAGE_TABLE} s WHERE s.natural_key = medicaid_rates.natural_key
+                  )
+            """, (latest, self.state, latest))
+            retired = cursor.rowcount
+            closed += retired
+
+            # A current row (unchanged, corrected or newer) or a closed one
+            # ending after the staged period keeps the staged row out
+            columns = ", ".join(RATE_COLUMNS)
+            staged_columns = ", ".join(f"s.{column}" for column in RATE_COLUMNS)
+            cursor.execute(f"""
+                INSERT INTO medicaid_rates ({columns})
+                SELECT {staged_columns}
+                FROM {STAGE_TABLE} s
+                LEFT JOIN medicaid_rates m
+                  ON m.state = %s AND m.natural_key = s.natural_key
+                 AND (m.end_date IS NULL OR m.end_date > s.effective_date)
+                WHERE m.id IS NULL
+            """, (self.state,))
+            inserted = cursor.rowcount
+
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        stale = self.staged - unchanged - corrected - inserted
+        elapsed = time.perf_counter() - start
+        logger.info(f"{self.label}: published {inserted:,} rates, closed {closed:,}, "
+                    f"{unchanged:,} unchanged, {corrected:,} corrected in {elapsed * 1000:.0f} ms")
+        if stale:
+            logger.warning(f"{self.label}: {stale:,} rows already loaded for the same or a newer period were ignored")
+        return {
+            "inserted": inserted,
+            "closed": closed,
+            "unchanged": unchanged,
+            "corrected": corrected,
+            "retired": retired,
+            "stale": stale,
+            "seconds": elapsed,
+        }
+
+    def _key_current_rows(self, cursor, latest: Optional[date]) -> int:
+        """
+        Give the state's current rows a natural_key and rate_hash where they
+        lack one (rows loaded before those columns existed), closing older
+        duplicates as upsert_rates does. Only runs when such rows exist.
+
+        Returns:
+            Number of duplicate rows closed
+        """
+        cursor.execute("""
+            SELECT COUNT(*) FROM medicaid_rates
+            WHERE state = %s AND end_date IS NULL AND (natural_key IS NULL OR rate_hash IS NULL)
+        """, (self.state,))
+        if not cursor.fetchone()[0]:
+            return 0
+
+        current, duplicates = _fetch_current(self.conn, self.state)
+        updates = [
+            (row["key"], row["hash"], row["id"]) for row in current.values()
+            if row["natural_key"] != row["key"] or row["stored_hash"] != row["hash"]
+        ]
+        cursor.executemany(
+            "UPDATE medicaid_rates SET natural_key = %s, rate_hash = %s WHERE id = %s", updates
+        )
+
+        closes: Dict[date, List[int]] = defaultdict(list)
+        for duplicate_id, replaced_at in duplicates:
+            if replaced_at or latest:
+                closes[replaced_at or latest].append(duplicate_id)
+        return _close_rows(cursor, closes)
@@ -3,16 +3,66 @@ State-specific column mappings for Medicaid rate files.
 Each state publishes rates in different formats - this module provides
 configuration-driven column detection for the ETL pipeline.
 
+Detection results are cached on a hash of the state's config and the
+file's header row, in memory and in a small SQLite store that persists
+between runs, so repeat loads of a known file layout skip the fuzzy
+column search.
+
 Usage:
     from state_mappings import STATE_CONFIGS, find_matching_column
+    from state_mappings import find_period_columns   # every dated rate column
+    from state_mappings import detect_columns, clear_detection_cache
 """
 
-from typing import List, Optional, Dict, Any, Tuple
-from rapidfuzz import fuzz, process
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Persistent detection cache (set RATE_DETECTION_CACHE=off to disable)
+DETECTION_CACHE_PATH = os.getenv(
+    "RATE_DETECTION_CACHE",
+    str(Path(__file__).parent / ".parse_cache" / "detected_columns.sqlite")
+)
+
+# Bump when detect_columns' logic changes, invalidating cached detections
+DETECTION_VERSION = "2"
+
+# Rows of each sheet scanned for the header row (see locate_header)
+HEADER_SCAN_ROWS = 30
+
+# Header-row scoring: points per field found (x2 for an exact match)
+HEADER_FIELD_WEIGHTS = {"facility_name_cols": 3, "rate_cols": 3, "id_cols": 1, "effective_date_col": 1}
+
+# Header cells shorter than this only count as exact matches - data rows are
+# full of short values ("A", "NH") contained in the configured header names
+HEADER_MIN_CONTAINS_LENGTH = 4
+
+# Score of an exact facility name column plus a partly matched rate column;
+# callers with a known layout treat weaker rows as "not found" and use
+# their configured skip_rows (see locate_header's min_score)
+HEADER_STRONG_SCORE = 9
+
+# Date headers: (pattern, strptime format); see find_date_columns
+DATE_COLUMN_PATTERNS = [
+    (re.compile(r'(\d{2})/(\d{2})/(\d{2,4})'), '%m/%d/%y'),  # MM/DD/YY or MM/DD/YYYY
+    (re.compile(r'(\d{4})-(\d{2})-(\d{2})'), '%Y-%m-%d'),    # YYYY-MM-DD
+    (re.compile(r'(\d{2})-(\d{2})-(\d{4})'), '%m-%d-%Y'),    # MM-DD-YYYY
+]
 
 # ============================================
 # STATE CONFIGURATIONS
 # Maps state-specific column names to standard schema fields
+# ("ids_are_ccns": True marks states whose six-character provider numbers
+# are CMS CCNs, so match_facilities accepts them without a name check)
 # ============================================
 
 STATE_CONFIGS: Dict[str, Dict[str, Any]] = {
@@ -88,6 +138,15 @@ STATE_CONFIGS: Dict[str, Dict[str, Any]] = {
         "sheet_name": 0,
         "notes": "Provider Index Report from Myers and Stauffer"
     },
+    "RI": {
+        "facility_name_cols": ["Provider Name", "Alternate Name"],
+        "rate_cols": ["AAA", "Provider Base Rate"],
+        "id_cols": ["NPI #", "NPI"],
+        "effective_date_col": ["Effective Date"],
+        "skip_rows": 1,
+        "sheet_name": 0,
+        "notes": "RUG rate table - header row 2, AAA is the base rate (extract_ri.py)"
+    },
     "MS": {
         "facility_name_cols": [
             "Facility Name", "Provider Name", "Name", "Facility",
@@ -106,6 +165,18 @@ STATE_CONFIGS: Dict[str, Dict[str, Any]] = {
         "sheet_name": 0,
         "notes": "Quarterly NF rate files"
     },
+    "MO": {
+        "facility_name_cols": ["Provider Name", "Provider"],
+        "rate_cols": [],
+        # One "Effective" column per rate period, oldest first
+        "repeated_rate_col": "Effective",
+        "header_cols": {"rate_cols": ["Effective"]},
+        "id_cols": ["Pseudo", "Provider Number"],
+        "effective_date_col": [],
+        "skip_rows": 14,
+        "sheet_name": 0,
+        "notes": "SFY rate listing - header row 15, extracted by extract_mo.py"
+    },
     "NY": {
         "facility_name_cols": [
             "Facility Name", "Provider Name", "Nursing Home Name",
@@ -283,18 +354,30 @@ def find_matching_column(
     Returns:
         Best matching column name or None if no match found
     """
-    # Normalize available columns - handle datetime objects
+    return _match_column(_column_map(available_columns), target_patterns, min_score)
+
+
+def _column_map(available_columns: List[Any]) -> Dict[str, Any]:
+    """Lowercased, stripped text headers -> original header (datetimes skipped)."""
     col_map = {}
     for col in available_columns:
         if hasattr(col, 'strip'):
             col_map[col.strip().lower()] = col
-        else:
-            # Skip datetime columns for text matching
-            continue
+    return col_map
+
 
-    for pattern in target_patterns:
-        pattern_lower = pattern.strip().lower()
+@lru_cache(maxsize=None)
+def _lowered(patterns: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(pattern.strip().lower() for pattern in patterns)
 
+
+def _match_column(
+    col_map: Dict[str, Any],
+    target_patterns: List[str],
+    min_score: int = 80
+) -> Optional[Any]:
+    """find_matching_column against a prebuilt _column_map."""
+    for pattern_lower in _lowered(tuple(target_patterns)):
         # Priority 1: Exact match
         if pattern_lower in col_map:
             return col_map[pattern_lower]
@@ -306,6 +389,8 @@ def find_matching_column(
 
     # Priority 3: Fuzzy match
     if col_map:
+        from rapidfuzz import fuzz, process
+
         all_patterns = " ".join(target_patterns)
         matches = process.extract(
             all_patterns,
@@ -326,9 +411,6 @@ def find_date_columns(available_columns: List[Any]) -> List[Tuple[Any, Any]]:
     Find columns that represent dates (for rate data).
     Returns list of (column_name, parsed_date) sorted by date descending.
     """
-    from datetime import datetime
-    import re
-
     date_cols = []
 
     for col in available_columns:
@@ -343,14 +425,8 @@ def find_date_columns(available_columns: List[Any]) -> List[Tuple[Any, Any]]:
         # Handle string date formats
         if isinstance(col, str):
             # Try common date patterns
-            patterns = [
-                (r'(\d{2})/(\d{2})/(\d{2,4})', '%m/%d/%y'),  # MM/DD/YY or MM/DD/YYYY
-                (r'(\d{4})-(\d{2})-(\d{2})', '%Y-%m-%d'),    # YYYY-MM-DD
-                (r'(\d{2})-(\d{2})-(\d{4})', '%m-%d-%Y'),    # MM-DD-YYYY
-            ]
-
-            for regex, fmt in patterns:
-                if re.match(regex, col.strip()):
+            for regex, fmt in DATE_COLUMN_PATTERNS:
+                if regex.match(col.strip()):
                     try:
                         # Handle 2-digit year
                         test_col = col.strip()
@@ -379,6 +455,32 @@ def get_most_recent_rate_column(available_columns: List[Any]) -> Optional[Tuple[
     return date_cols[0] if date_cols else None
 
 
+# Period rate headers: "Rate_2025_07", "Rate 2024-01", "2023-07", "2023/7"
+# (CMI_2025_07 and other non-rate period columns do not match)
+PERIOD_COLUMN_PATTERN = re.compile(r'^(?:rate)?[\s_\-]*(\d{4})[\s_\-/](\d{1,2})$', re.IGNORECASE)
+
+
+def find_period_columns(available_columns: List[Any]) -> List[Tuple[Any, Any]]:
+    """
+    Find every rate column that carries its own period, for multi-period
+    (wide) files: date headers (see find_date_columns) plus period headers
+    like Rate_2025_07, which mean the first of that month.
+    Returns list of (column_name, period_date) sorted oldest first.
+    """
+    period_cols = find_date_columns(available_columns)
+    found = {id(col) for col, _ in period_cols}
+
+    for col in available_columns:
+        if id(col) in found or not isinstance(col, str):
+            continue
+        match = PERIOD_COLUMN_PATTERN.match(col.strip())
+        if match and 1 <= int(match.group(2)) <= 12:
+            period_cols.append((col, datetime(int(match.group(1)), int(match.group(2)), 1)))
+
+    period_cols.sort(key=lambda x: x[1])
+    return period_cols
+
+
 def get_state_config(state: str) -> Dict[str, Any]:
     """
     Get column configuration for a specific state.
@@ -395,26 +497,56 @@ def get_state_config(state: str) -> Dict[str, Any]:
 
 def detect_columns(
     state: str,
-    available_columns: List[Any]
+    available_columns: List[Any],
+    use_cache: bool = True
 ) -> Dict[str, Optional[Any]]:
     """
     Detect all required columns for a state's rate file.
     Handles both named columns and date-based rate columns.
 
+    Results are cached on the state's config and the exact header row
+    (see _detection_key), so a layout seen before - in this run or an
+    earlier one - is resolved without fuzzy matching.
+
     Args:
         state: Two-letter state code
         available_columns: Columns found in the file
+        use_cache: If False, always run detection (and do not cache it)
 
     Returns:
         Dict mapping standard fields to detected column names
     """
+    available_columns = list(available_columns)
+    if not use_cache:
+        return _detect_columns(state, available_columns)
+
+    key = _detection_key(state, available_columns)
+    positions = _detection_memory.get(key)
+    if positions is None:
+        positions = _load_detection(key)
+    if positions is not None:
+        _detection_memory[key] = positions
+        return _from_positions(positions, available_columns)
+
+    detected = _detect_columns(state, available_columns)
+    positions = _to_positions(detected, available_columns)
+    _detection_memory[key] = positions
+    _store_detection(key, state, positions)
+    return detected
+
+
+def _detect_columns(state: str, available_columns: List[Any]) -> Dict[str, Optional[Any]]:
+    """Uncached body of detect_columns."""
     config = get_state_config(state)
+    col_map = _column_map(available_columns)
 
     # Try to find named rate column first
-    rate_col = find_matching_column(
-        available_columns,
-        config["rate_cols"]
-    )
+    rate_col = _match_column(col_map, config["rate_cols"])
+
+    # Period columns sharing one header (Effective, Effective.1, ...) are
+    # in period order - the last is the current rate
+    if not rate_col and config.get("repeated_rate_col"):
+        rate_col = _last_repeated_column(available_columns, config["repeated_rate_col"])
 
     # If no named rate column, use most recent date column
     effective_date = None
@@ -424,26 +556,158 @@ def detect_columns(
             rate_col, effective_date = date_result
 
     # Try to find named effective date column
-    date_col = find_matching_column(
-        available_columns,
-        config["effective_date_col"]
-    )
+    date_col = _match_column(col_map, config["effective_date_col"])
 
     return {
-        "facility_name": find_matching_column(
-            available_columns,
-            config["facility_name_cols"]
-        ),
+        "facility_name": _match_column(col_map, config["facility_name_cols"]),
         "daily_rate": rate_col,
-        "state_facility_id": find_matching_column(
-            available_columns,
-            config["id_cols"]
-        ),
+        "state_facility_id": _match_column(col_map, config["id_cols"]),
         "effective_date": date_col,
         "_rate_date": effective_date,  # Store the actual date if from column header
     }
 
 
+def _last_repeated_column(available_columns: List[Any], header: str) -> Optional[Any]:
+    """Last column named header, or header.N as pandas names repeats."""
+    pattern = re.compile(rf"{re.escape(header.strip())}(\.\d+)?", re.IGNORECASE)
+    matches = [
+        col for col in available_columns
+        if isinstance(col, str) and pattern.fullmatch(col.strip())
+    ]
+    return matches[-1] if matches else None
+
+
+# ============================================
+# DETECTION CACHE
+# Detected columns are stored as positions in the header row (headers may
+# be datetimes), plus the _rate_date as ISO text
+# ============================================
+
+DETECTED_FIELDS = ["facility_name", "daily_rate", "state_facility_id", "effective_date"]
+
+# key -> positions, for files seen earlier in this process
+_detection_memory: Dict[str, Dict[str, Any]] = {}
+
+
+def _detection_key(state: str, available_columns: List[Any]) -> str:
+    """Hash of the detection version, the state's config and the header row."""
+    blob = json.dumps(
+        [
+            DETECTION_VERSION,
+            state.upper(),
+            get_state_config(state),
+            [f"{type(col).__name__}:{col}" for col in available_columns],
+        ],
+        sort_keys=True,
+        default=str
+    ).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+def _to_positions(detected: Dict[str, Optional[Any]], available_columns: List[Any]) -> Dict[str, Any]:
+    positions = {}
+    for field in DETECTED_FIELDS:
+        column = detected.get(field)
+        positions[field] = None if column is None else next(
+            i for i, col in enumerate(available_columns) if col is column or col == column
+        )
+    rate_date = detected.get("_rate_date")
+    positions["_rate_date"] = rate_date.isoformat() if rate_date is not None else None
+    return positions
+
+
+def _from_positions(positions: Dict[str, Any], available_columns: List[Any]) -> Dict[str, Optional[Any]]:
+    detected = {
+        field: None if positions[field] is None else available_columns[positions[field]]
+        for field in DETECTED_FIELDS
+    }
+    rate_date = positions.get("_rate_date")
+    detected["_rate_date"] = datetime.fromisoformat(rate_date) if rate_date else None
+    return detected
+
+
+def _detection_db() -> Optional[sqlite3.Connection]:
+    """Open the persistent cache, or None when it is disabled."""
+    if DETECTION_CACHE_PATH.strip().lower() in ("", "off", "0", "false"):
+        return None
+    path = Path(DETECTION_CACHE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Parse workers share the file; wait out each other's writes
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS detected_columns (
+            detection_key TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            positions TEXT NOT NULL,
+            created TEXT NOT NULL
+        )
+    """)
+    return conn
+
+
+def _load_detection(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        conn = _detection_db()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT positions FROM detected_columns WHERE detection_key = ?", (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Column detection cache unavailable: {e}")
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def _store_detection(key: str, state: str, positions: Dict[str, Any]):
+    try:
+        conn = _detection_db()
+        if conn is None:
+            return
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO detected_columns VALUES (?, ?, ?, ?)",
+                    (key, state.upper(), json.dumps(positions),
+                     datetime.now().isoformat(timespec="seconds"))
+                )
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        # A cache write failure must never fail the load itself
+        logger.warning(f"Could not cache column detection for {state}: {e}")
+
+
+def clear_detection_cache(state: Optional[str] = None) -> int:
+    """
+    Forget cached column detections.
+
+    Args:
+        state: Only this state's detections (all states if None)
+
+    Returns:
+        Number of persisted detections deleted
+    """
+    _detection_memory.clear()
+    conn = _detection_db()
+    if conn is None:
+        return 0
+    try:
+        with conn:
+            if state:
+                cursor = conn.execute(
+                    "DELETE FROM detected_columns WHERE state = ?", (state.upper(),)
+                )
+            else:
+                cursor = conn.execute("DELETE FROM detected_columns")
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
 def validate_required_columns(
     detected: Dict[str, Optional[str]],
     required: List[str] = ["facility_name", "daily_rate"]
@@ -461,6 +725,160 @@ def validate_required_columns(
     return all(detected.get(field) is not None for field in required)
 
 
+# ============================================
+# HEADER LOCATION
+# Finds the header row (and sheet) of a workbook from its first rows, so
+# title blocks above the header need no per-state skip_rows
+# ============================================
+
+def _is_date_header(value: Any) -> bool:
+    if hasattr(value, 'date'):
+        return True
+    if isinstance(value, str):
+        text = value.strip()
+        return (
+            any(regex.match(text) for regex, _ in DATE_COLUMN_PATTERNS)
+            or PERIOD_COLUMN_PATTERN.match(text) is not None
+        )
+    return False
+
+
+def score_header_row(values: Tuple, config: Dict[str, Any]) -> Tuple[int, bool]:
+    """
+    Score how much a row looks like the state's header row.
+
+    Each configured field (facility_name_cols, rate_cols, ...) found among
+    the row's text cells adds its HEADER_FIELD_WEIGHTS weight, doubled for
+    an exact match; numeric cells count against the row. Dated headers
+    (7/1/2025, Rate_2025_07) stand in for a rate column. A config's
+    header_cols adds patterns per field that only count here, not in
+    detect_columns (e.g. MO's repeated "Effective" rate headers).
+
+    Args:
+        values: Cell values of one row
+        config: State configuration (see get_state_config)
+
+    Returns:
+        (score, usable) - usable when a facility name and a rate (or
+        dated rate) column were both found
+    """
+    cells = [
+        value.strip().lower() for value in values
+        if isinstance(value, str) and value.strip()
+    ]
+    numeric = sum(
+        1 for value in values
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    )
+
+    score = -numeric
+    found = set()
+    header_cols = config.get("header_cols", {})
+    for field, weight in HEADER_FIELD_WEIGHTS.items():
+        best = 0
+        patterns = tuple(config.get(field, [])) + tuple(header_cols.get(field, []))
+        for pattern in _lowered(patterns):
+            for cell in cells:
+                if cell == pattern:
+                    best = 2
+                    break
+                if len(cell) >= HEADER_MIN_CONTAINS_LENGTH and (pattern in cell or cell in pattern):
+                    best = max(best, 1)
+            if best == 2:
+                break
+        if best:
+            score += weight * best
+            found.add(field)
+
+    if "rate_cols" not in found and any(_is_date_header(value) for value in values):
+        score += HEADER_FIELD_WEIGHTS["rate_cols"]
+        found.add("rate_cols")
+
+    return score, {"facility_name_cols", "rate_cols"} <= found
+
+
+def _iter_top_rows(path: Path, max_rows: int) -> Iterator[Tuple[int, str, List[Tuple]]]:
+    """
+    (sheet index, sheet title, first max_rows rows) for each sheet of a workbook.
+
+    .xlsx files are streamed with openpyxl in read-only mode, so only the
+    top of each sheet is read.
+    """
+    if path.suffix.lower() in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+
+        book = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for index, worksheet in enumerate(book.worksheets):
+                yield index, worksheet.title, list(
+                    worksheet.iter_rows(max_row=max_rows, values_only=True)
+                )
+        finally:
+            book.close()
+        return
+
+    import pandas as pd
+
+    sheets = pd.read_excel(path, sheet_name=None, header=None, nrows=max_rows)
+    for index, (title, frame) in enumerate(sheets.items()):
+        yield index, title, [
+            tuple(None if pd.isna(value) else value for value in row)
+            for row in frame.itertuples(index=False)
+        ]
+
+
+def locate_header(
+    path: Path,
+    state: str,
+    max_rows: int = HEADER_SCAN_ROWS,
+    sheet_name: Optional[Any] = None,
+    min_score: int = 0
+) -> Optional[Dict[str, Any]]:
+    """
+    Find a workbook's header row by scoring its first rows.
+
+    The state's configured sheet is tried first; other sheets are only
+    used when it has no usable header row. Within a sheet the best-scoring
+    row wins, ties going to the configured skip_rows and then the topmost
+    row. The result is meant to be passed straight to the reader, so the
+    data is parsed exactly once.
+
+    Args:
+        path: Workbook path (.xlsx/.xlsm streamed; .xls parsed with pandas)
+        state: Two-letter state code (selects the column patterns)
+        max_rows: Rows scanned per sheet
+        sheet_name: Only look at this sheet (index or title)
+        min_score: Ignore rows scoring below this (e.g. HEADER_STRONG_SCORE)
+
+    Returns:
+        Dict with sheet_name (index), skip_rows (rows above the header,
+        as pandas' skiprows), score and header (the row's values), or None
+        when no sheet has a row with a facility name and a rate column
+        scoring at least min_score
+    """
+    config = get_state_config(state)
+    configured_sheet = config.get("sheet_name", 0)
+    configured_skip = config.get("skip_rows", 0)
+
+    candidates = []
+    for sheet, title, rows in _iter_top_rows(Path(path), max_rows):
+        if sheet_name is not None and sheet_name not in (sheet, title):
+            continue
+        is_configured = configured_sheet in (sheet, title)
+        for index, values in enumerate(rows):
+            score, usable = score_header_row(values, config)
+            if not usable or score < min_score:
+                continue
+            candidates.append((
+                not is_configured, -score, index != configured_skip, index,
+                {"sheet_name": sheet, "skip_rows": index, "score": score, "header": list(values)},
+            ))
+
+    if not candidates:
+        return None
+    return min(candidates, key=lambda candidate: candidate[:4])[4]
+
+
 # ============================================
 # CLI Testing
 # ============================================
@@ -488,3 +906,13 @@ if __name__ == "__main__":
             status = "+" if col else "x"
             print(f"  [{status}] {field}: {col}")
         print(f"  Valid: {valid}")
+
+    # MO SFY listing: the rate must come from the newest period column
+    mo_columns = [
+        "Count", "Pseudo", "Provider Name", "Rate Type", "City", "County",
+        "Location", "FYE", "Entity Type", "Lic Beds", "Mcd Beds", "Effective",
+        "Unnamed: 12"
+    ] + [f"Effective.{i}" for i in range(1, 8)]
+    mo_rate = detect_columns("MO", mo_columns, use_cache=False)["daily_rate"]
+    print(f"\nMO SFY listing rate column: {mo_rate} "
+          f"[{'OK' if mo_rate == 'Effective.7' else 'FAIL - expected Effective.7'}]")
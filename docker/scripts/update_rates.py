@@ -5,13 +5,14 @@ Updates rates from source sites while preserving history.
 
 Usage:
     python update_rates.py --check          # Check which states need updates
-    python update_rates.py --fetch FL       # Fetch latest rates for a state
-    python update_rates.py --load FL        # Load new rates (closes old, inserts new)
+    python update_rates.py --fetch FL GA    # Download new rate files (all states if none given)
+    python update_rates.py --load FL        # Load new rates (closes changed, inserts new)
+    python update_rates.py --watch          # Load XX_YYYY-MM_rates.* files as they arrive
     python update_rates.py --history FL     # Show rate history for a state
     python update_rates.py --changes        # Show period-over-period changes
 
 Dependencies:
-    pip install pandas openpyxl mysql-connector-python requests beautifulsoup4
+    pip install pandas openpyxl mysql-connector-python
 """
 
 import argparse
@@ -22,7 +23,6 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import logging
 
-import pandas as pd
 import mysql.connector
 from mysql.connector import Error
 
@@ -43,8 +43,14 @@ DB_CONFIG = {
     "password": os.getenv("DB_PASSWORD", "devpass"),
 }
 
-# Source file directory
-SOURCE_DIR = Path(r"G:\My Drive\3G\Source NF Rates")
+# Downloaded source files (--fetch saves to SOURCE_DIR/<STATE>/)
+SOURCE_DIR = Path(os.getenv(
+    "RATE_SOURCE_DIR",
+    Path(__file__).resolve().parents[2] / "data" / "medicaid_rates" / "source"
+))
+
+# Successful loads per state compared by --check (latest vs the ones before)
+LOAD_TREND_WINDOW = 5
 
 
 def get_db_connection():
@@ -82,9 +88,11 @@ def check_update_status():
     """)
 
     results = cursor.fetchall()
+    load_times = get_load_times(cursor)
 
-    print(f"\n{'State':<6} {'Frequency':<12} {'Auth':<5} {'Latest Rate':<12} {'Periods':<8} {'Status'}")
-    print("-" * 90)
+    print(f"\n{'State':<6} {'Frequency':<12} {'Auth':<5} {'Latest Rate':<12} {'Periods':<8} "
+          f"{'Last Load':>9} {'Rows/s':>8} {'Trend':>7}  {'Status'}")
+    print("-" * 100)
 
     today = date.today()
     for row in results:
@@ -106,11 +114,65 @@ def check_update_status():
             else:
                 status = "Current"
 
-        print(f"{row['state']:<6} {freq:<12} {auth:<5} {str(latest):<12} {row['periods_loaded']:<8} {status}")
+        timing = load_times.get(row['state'])
+        if timing:
+            seconds = f"{timing['seconds']:.1f}s"
+            rate = f"{timing['rows_per_sec']:,.0f}" if timing['rows_per_sec'] else "-"
+            trend = f"{timing['trend']:+.0%}" if timing['trend'] is not None else "-"
+        else:
+            seconds = rate = trend = "-"
+
+        print(f"{row['state']:<6} {freq:<12} {auth:<5} {str(latest):<12} {row['periods_loaded']:<8} "
+              f"{seconds:>9} {rate:>8} {trend:>7}  {status}")
+
+    print("\nLast Load: stage time of the latest successful load; Trend: its duration vs the")
+    print(f"average of up to {LOAD_TREND_WINDOW - 1} loads before it (positive = slower)")
 
     conn.close()
 
 
+def get_load_times(cursor) -> Dict[str, Dict]:
+    """
+    Latest load duration per state, with its trend against earlier loads.
+
+    Reads the timings load_medicaid_rates.py and --load store in
+    medicaid_rate_collection_log; --fetch attempts (stage timings with a
+    download stage) are not loads and are skipped. States without timed
+    loads are omitted.
+
+    Returns:
+        Dict of state -> seconds, rows_per_sec, trend (fractional change in
+        duration vs the average of the previous LOAD_TREND_WINDOW - 1 loads,
+        None with only one load)
+    """
+    cursor.execute("""
+        SELECT mrs.state, rcl.duration_seconds, rcl.rows_per_second
+        FROM medicaid_rate_collection_log rcl
+        JOIN medicaid_rate_sources mrs ON mrs.id = rcl.rate_source_id
+        WHERE rcl.status = 'success' AND rcl.duration_seconds IS NOT NULL
+          AND NOT COALESCE(JSON_CONTAINS_PATH(rcl.stage_timings, 'one', '$.download'), 0)
+        ORDER BY mrs.state, rcl.collection_date DESC, rcl.id DESC
+    """)
+
+    history: Dict[str, List[Dict]] = {}
+    for row in cursor.fetchall():
+        loads = history.setdefault(row['state'], [])
+        if len(loads) < LOAD_TREND_WINDOW:
+            loads.append(row)
+
+    load_times = {}
+    for state, loads in history.items():
+        latest = float(loads[0]['duration_seconds'])
+        earlier = [float(load['duration_seconds']) for load in loads[1:]]
+        baseline = sum(earlier) / len(earlier) if earlier else 0
+        load_times[state] = {
+            "seconds": latest,
+            "rows_per_sec": float(loads[0]['rows_per_second'] or 0),
+            "trend": (latest - baseline) / baseline if baseline else None,
+        }
+    return load_times
+
+
 def show_source_urls():
     """Display source URLs for all states."""
     conn = get_db_connection()
@@ -230,87 +292,195 @@ def show_rate_changes():
     conn.close()
 
 
-def load_new_rates(state: str, filepath: Path, effective_date: date):
+def load_new_rates(state: str, filepath: Path, effective_date: date) -> Dict:
     """
     Load new rates for a state while preserving history.
 
     Process:
-    1. Set end_date on existing current rates for the state
-    2. Insert new rates with the new effective_date
-    3. Run matching against property_master
+    1. Compare the file with the state's current rates (see upsert_rates)
+    2. Close changed and dropped facilities, insert changed and new ones
+       with the new effective_date; unchanged rows are left open
+    3. Carry forward remembered property_master matches
+
+    Stage timings are written to a metrics file and the collection log.
+
+    Returns:
+        upsert_rates counts (inserted, closed, unchanged, ...) plus carried
+        (carry_forward_matches counts)
     """
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
 
     logger.info(f"Loading new rates for {state} from {filepath}")
 
     # Import the ETL functions
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-    from load_medicaid_rates import process_file
+    from etl_metrics import RunMetrics, stage
+    from load_medicaid_rates import log_collection, process_file
+    from match_memory import carry_forward_matches
+    from rate_loader import upsert_rates
     from state_mappings import get_state_config
 
-    try:
-        # 1. Close out existing current rates
-        cursor.execute("""
-            UPDATE medicaid_rates
-            SET end_date = %s
-            WHERE state = %s AND end_date IS NULL
-        """, (effective_date, state))
-        closed = cursor.rowcount
-        logger.info(f"Closed {closed} existing rate records")
-
-        # 2. Process new file
-        df = process_file(filepath, state)
-        df['effective_date'] = effective_date
-
-        # 3. Insert new rates
-        insert_sql = """
-        INSERT INTO medicaid_rates (
-            state, facility_name, state_facility_id, daily_rate,
-            rate_type, effective_date, source_file, data_source
-        ) VALUES (
-            %(state)s, %(facility_name)s, %(state_facility_id)s, %(daily_rate)s,
-            %(rate_type)s, %(effective_date)s, %(source_file)s, %(data_source)s
-        )
-        """
+    metrics = RunMetrics("update_rates")
 
-        rows_inserted = 0
-        for _, row in df.iterrows():
-            try:
-                cursor.execute(insert_sql, {
-                    "state": row["state"],
-                    "facility_name": row["facility_name"],
-                    "state_facility_id": row.get("state_facility_id"),
-                    "daily_rate": row["daily_rate"],
-                    "rate_type": row.get("rate_type", "total"),
-                    "effective_date": effective_date,
-                    "source_file": row.get("source_file"),
-                    "data_source": "state_medicaid_update"
-                })
-                rows_inserted += 1
-            except Error as e:
-                logger.warning(f"Insert failed for {row['facility_name']}: {e}")
-
-        conn.commit()
-        logger.info(f"Inserted {rows_inserted} new rate records")
+    try:
+        with metrics.timer(state):
+            # 1. Process new file
+            df = process_file(filepath, state)
+
+            # 2. Apply it as a delta against the current rates (one transaction)
+            with stage("commit") as timed:
+                result = upsert_rates(
+                    conn,
+                    state,
+                    df,
+                    effective_date=effective_date,
+                    overrides={"data_source": "state_medicaid_update"}
+                )
+                timed.rows = result["inserted"] + result["closed"]
+            rows_inserted = result["inserted"]
+            closed = result["closed"]
+
+            # 3. Re-apply matches from earlier periods
+            with stage("match") as timed:
+                carried = carry_forward_matches(conn, state)
+                carried_total = carried["facility_id"] + carried["name"]
+                timed.rows = carried_total
+
+        record = metrics.finish_state(state, "success", rows=rows_inserted, file=filepath.name)
+        log_collection(conn, state, "success", 1, rows_inserted, metrics=record)
+        metrics.close()
 
         # 4. Summary
         print(f"\n{'=' * 50}")
         print(f"RATE UPDATE COMPLETE: {state}")
         print("=" * 50)
-        print(f"  Previous records closed: {closed}")
-        print(f"  New records inserted: {rows_inserted}")
+        print(f"  Previous records closed: {closed} ({result['retired']} no longer in the file)")
+        print(f"  New records inserted: {rows_inserted} ({result['rows_per_sec']:,.0f} rows/sec)")
+        print(f"  Unchanged records: {result['unchanged']}")
+        if result["corrected"]:
+            print(f"  Corrected in place (same effective date): {result['corrected']}")
+        if result["stale"]:
+            print(f"  Ignored (same or newer period already loaded): {result['stale']}")
+        if result["rejected"]:
+            print(f"  Rejected rows: {result['rejected']} (see {result['rejects_path']})")
         print(f"  Effective date: {effective_date}")
-        print("\nRun facility matching to link new rates to property_master")
+        print(f"  Matches carried forward: {carried_total} "
+              f"({carried['facility_id']} by ID, {carried['name']} by name)")
+        if carried["unmatched"]:
+            print(f"\nRun facility matching to link the {carried['unmatched']} "
+                  "remaining rates to property_master")
+        metrics.print_stages()
+        return {**result, "carried": carried}
 
     except Exception as e:
         conn.rollback()
         logger.error(f"Rate update failed: {e}")
+        record = metrics.finish_state(state, "failed", error=str(e), file=filepath.name)
+        log_collection(conn, state, "failed", 1, 0, str(e), metrics=record)
+        metrics.close()
         raise
     finally:
         conn.close()
 
 
+def fetch_rates(
+    states: Optional[List[str]] = None,
+    dest_dir: Path = SOURCE_DIR,
+    sources_csv: Optional[Path] = None,
+    log: bool = True,
+    concurrency: Optional[int] = None,
+    per_host: Optional[int] = None
+) -> List[Dict]:
+    """
+    Download new rate files for states from their source pages.
+
+    Sources come from medicaid_rate_sources (or sources_csv in the
+    rate_sources.csv layout); files are fetched concurrently with
+    conditional GETs so unchanged files are not downloaded again (see
+    rate_fetcher). Each state's attempt is written to
+    medicaid_rate_collection_log, and last_collected_at is set when new
+    files arrived.
+
+    Args:
+        states: State codes (default: every active source)
+        dest_dir: Download directory (files go to dest_dir/<STATE>/)
+        sources_csv: Read sources from this CSV instead of the database
+        log: Record attempts in medicaid_rate_collection_log
+        concurrency: Requests in flight overall
+        per_host: Requests in flight per host
+
+    Returns:
+        Per-state fetch results (see rate_fetcher.RateFetcher.fetch_source)
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import rate_fetcher
+
+    conn = get_db_connection() if log or sources_csv is None else None
+    try:
+        if sources_csv is not None:
+            sources = rate_fetcher.load_sources_csv(sources_csv, states)
+        else:
+            sources = rate_fetcher.load_sources_db(conn, states)
+
+        missing = sorted(set(states or []) - {source["state"] for source in sources})
+        if missing:
+            print(f"No rate source configured for: {', '.join(missing)}")
+        if not sources:
+            return []
+
+        print(f"\nFetching {len(sources)} sources into {dest_dir}")
+        results = rate_fetcher.fetch_sources(
+            sources,
+            dest_dir,
+            concurrency=concurrency or rate_fetcher.MAX_CONCURRENCY,
+            per_host=per_host or rate_fetcher.PER_HOST_LIMIT
+        )
+
+        if log and conn is not None:
+            from load_medicaid_rates import log_collection
+
+            for result in results:
+                # Stage timings only: a duration would count the fetch as a load
+                # in get_load_times
+                stages = {"stages": result["metrics"]["stages"]} if result["metrics"] else None
+                log_collection(conn, result["state"], result["status"], result["files_found"], 0,
+                               result["error"], metrics=stages)
+                if result["downloaded"]:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        "UPDATE medicaid_rate_sources SET last_collected_at = NOW() WHERE state = %s",
+                        (result["state"],)
+                    )
+                    conn.commit()
+                    cursor.close()
+    finally:
+        if conn is not None:
+            conn.close()
+
+    print("\n" + "=" * 70)
+    print("RATE FETCH RESULTS")
+    print("=" * 70)
+    print(f"{'State':<6} {'Status':<8} {'Found':>6} {'New':>5} {'Same':>5} {'Failed':>7} {'Seconds':>8}")
+    print("-" * 70)
+    for result in results:
+        seconds = f"{result['metrics']['seconds']:.1f}" if result["metrics"] else "-"
+        print(f"{result['state']:<6} {result['status']:<8} {result['files_found']:>6} "
+              f"{len(result['downloaded']):>5} {result['unchanged']:>5} {result['failed']:>7} {seconds:>8}")
+        if result["error"]:
+            print(f"       {result['error'][:100]}")
+
+    new_files = [(r["state"], path) for r in results for path in r["downloaded"]]
+    if new_files:
+        print("\nNew files:")
+        for state, path in new_files:
+            print(f"  {state}: {Path(dest_dir) / path}")
+        print("\nLoad with: python update_rates.py --load STATE --file PATH --date YYYY-MM-DD")
+    else:
+        print("\nNo new files")
+
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Medicaid Rates Update Script",
@@ -321,7 +491,11 @@ Examples:
     python update_rates.py --sources            # Show source URLs
     python update_rates.py --history FL         # Show rate history for FL
     python update_rates.py --changes            # Show period-over-period changes
+    python update_rates.py --fetch GA MS        # Download new GA and MS rate files
+    python update_rates.py --fetch --sources-csv rate_sources.csv --dest downloads --no-log
     python update_rates.py --load FL --file "path/to/file.xlsx" --date 2026-01-01
+    python update_rates.py --watch                        # Ingest data/medicaid_rates/incoming
+    python update_rates.py --watch /path/to/drop --once   # Load what is there, then exit
         """
     )
 
@@ -329,9 +503,26 @@ Examples:
     parser.add_argument("--sources", action="store_true", help="Show source URLs")
     parser.add_argument("--history", type=str, metavar="STATE", help="Show rate history for state")
     parser.add_argument("--changes", action="store_true", help="Show rate changes")
+    parser.add_argument("--fetch", nargs="*", metavar="STATE",
+                        help="Download new rate files (all active states if none given)")
+    parser.add_argument("--dest", type=str, help=f"Download directory for --fetch (default: {SOURCE_DIR})")
+    parser.add_argument("--sources-csv", type=str,
+                        help="Read --fetch sources from a rate_sources.csv instead of the database")
+    parser.add_argument("--no-log", action="store_true",
+                        help="Don't record --fetch attempts in medicaid_rate_collection_log")
+    parser.add_argument("--concurrency", type=int, help="Requests in flight for --fetch (default: 8)")
+    parser.add_argument("--per-host", type=int, help="Requests in flight per host for --fetch (default: 2)")
     parser.add_argument("--load", type=str, metavar="STATE", help="Load new rates for state")
     parser.add_argument("--file", type=str, help="Path to rate file (for --load)")
     parser.add_argument("--date", type=str, help="Effective date YYYY-MM-DD (for --load)")
+    parser.add_argument("--watch", nargs="?", const="", metavar="DIR",
+                        help="Load XX_YYYY-MM_rates.* files dropped into DIR "
+                             "(default: data/medicaid_rates/incoming)")
+    parser.add_argument("--once", action="store_true",
+                        help="With --watch: load the files already there, then exit")
+    parser.add_argument("--workers", type=int, default=2, help="Files loaded at once for --watch (default: 2)")
+    parser.add_argument("--no-match", action="store_true",
+                        help="With --watch: skip facility matching after each load")
 
     args = parser.parse_args()
 
@@ -343,6 +534,25 @@ Examples:
         show_rate_history(args.history.upper())
     elif args.changes:
         show_rate_changes()
+    elif args.fetch is not None:
+        fetch_rates(
+            [state.upper() for state in args.fetch] or None,
+            dest_dir=Path(args.dest) if args.dest else SOURCE_DIR,
+            sources_csv=Path(args.sources_csv) if args.sources_csv else None,
+            log=not args.no_log,
+            concurrency=args.concurrency,
+            per_host=args.per_host
+        )
+    elif args.watch is not None:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from rate_ingest import INGEST_DIR, run_ingest
+
+        run_ingest(
+            Path(args.watch) if args.watch else INGEST_DIR,
+            workers=args.workers,
+            match=not args.no_match,
+            once=args.once
+        )
     elif args.load:
         if not args.file or not args.date:
             print("Error: --load requires --file and --date")
@@ -0,0 +1,232 @@
+"""
+Workbook reader for compiled rate files.
+Opens each workbook once per run and shares it between the scan, validate
+and load phases: the row count comes from the sheet dimensions (or a
+streaming count), the header sample is parsed once, and the full frame is
+parsed at most once.
+
+Usage:
+    from workbook_reader import open_workbook, release_workbook
+
+    workbook = open_workbook(filepath, sheet_name=0, skip_rows=0)
+    workbook.row_count        # cheap - no full parse
+    workbook.columns          # from the cached header sample
+    df = workbook.frame()     # full parse, cached
+    release_workbook(filepath)
+
+    # Bounded-memory alternative to frame() for very large sheets
+    for chunk in iter_sheet_chunks(filepath, sheet_name=0, skip_rows=0):
+        ...
+"""
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rows parsed for the header sample
+HEADER_SAMPLE_ROWS = 5
+
+# Rows per DataFrame yielded by iter_sheet_chunks
+SHEET_CHUNK_ROWS = 5000
+
+SheetName = Union[int, str]
+
+
+class RateWorkbook:
+    """
+    One rate workbook, opened lazily and parsed at most once.
+
+    .xlsx files are opened through openpyxl in read-only mode, so the
+    shared strings table is loaded once for every phase. Other formats
+    (.xls) fall back to counting rows from the parsed frame.
+    """
+
+    def __init__(self, path: Path, sheet_name: SheetName = 0, skip_rows: int = 0):
+        self.path = Path(path)
+        self.sheet_name = sheet_name
+        self.skip_rows = skip_rows
+
+        self._excel: Optional["pd.ExcelFile"] = None
+        self._dimension_rows: Optional[int] = None
+        self._row_count: Optional[int] = None
+        self._sample: Optional["pd.DataFrame"] = None
+        self._frame: Optional["pd.DataFrame"] = None
+
+    def _open(self) -> "pd.ExcelFile":
+        import pandas as pd
+
+        if self._excel is None:
+            self._excel = pd.ExcelFile(self.path)
+            # Dimensions must be read before pandas parses (and resets) the sheet
+            worksheet = self._worksheet()
+            if worksheet is not None:
+                self._dimension_rows = worksheet.max_row
+        return self._excel
+
+    def _worksheet(self):
+        """openpyxl worksheet for sheet_name, or None for non-openpyxl books."""
+        book = self._excel.book
+        if not hasattr(book, "worksheets"):
+            return None
+        if isinstance(self.sheet_name, int):
+            return book.worksheets[self.sheet_name]
+        return book[self.sheet_name]
+
+    def _count_rows(self) -> int:
+        """Data rows below the header, without building a DataFrame."""
+        self._open()
+        if self._dimension_rows is not None:
+            total = self._dimension_rows
+        else:
+            worksheet = self._worksheet()
+            if worksheet is None:
+                return len(self.frame())
+            # Unsized sheet (no <dimension> element) - stream the rows
+            total = sum(
+                1 for row in worksheet.iter_rows(values_only=True)
+                if any(value is not None for value in row)
+            )
+        return max(total - self.skip_rows - 1, 0)
+
+    @property
+    def row_count(self) -> int:
+        """Number of data rows (exact once the frame is parsed)."""
+        if self._frame is not None:
+            return len(self._frame)
+        if self._row_count is None:
+            self._row_count = self._count_rows()
+        return self._row_count
+
+    def header_sample(self, nrows: int = HEADER_SAMPLE_ROWS) -> "pd.DataFrame":
+        """First rows of the sheet, parsed once (or sliced from the frame)."""
+        if self._frame is not None:
+            return self._frame.head(nrows)
+        if self._sample is None or len(self._sample) < nrows:
+            self._sample = self._open().parse(
+                self.sheet_name, skiprows=self.skip_rows, nrows=nrows
+            )
+        return self._sample.head(nrows)
+
+    @property
+    def columns(self) -> List:
+        """Column headers as pandas parses them."""
+        return list(self.header_sample().columns)
+
+    def frame(self) -> "pd.DataFrame":
+        """The full sheet, parsed on first call and cached."""
+        if self._frame is None:
+            self._frame = self._open().parse(self.sheet_name, skiprows=self.skip_rows)
+            # Everything else can now be answered from the frame
+            self.close()
+        return self._frame
+
+    def close(self):
+        """Release the file handle (cached frames are kept)."""
+        if self._excel is not None:
+            self._excel.close()
+            self._excel = None
+
+
+# One RateWorkbook per (path, sheet, skip_rows) for the current run
+_workbooks: Dict[Tuple[Path, SheetName, int], RateWorkbook] = {}
+
+
+def open_workbook(path: Path, sheet_name: SheetName = 0, skip_rows: int = 0) -> RateWorkbook:
+    """Return the run's shared RateWorkbook for a file, creating it on first use."""
+    key = (Path(path).resolve(), sheet_name, skip_rows)
+    if key not in _workbooks:
+        _workbooks[key] = RateWorkbook(path, sheet_name, skip_rows)
+    return _workbooks[key]
+
+
+def release_workbook(path: Path):
+    """Close and forget every cached view of a file once it is loaded."""
+    resolved = Path(path).resolve()
+    for key in [k for k in _workbooks if k[0] == resolved]:
+        _workbooks.pop(key).close()
+
+
+# ============================================
+# STREAMING
+# ============================================
+
+def _header_names(values: Tuple) -> List:
+    """Column names the way pandas builds them (Unnamed: i, name.1 for repeats)."""
+    names = []
+    counts: Dict = {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None or value == "" else value
+        if name in counts:
+            counts[name] += 1
+            name = f"{name}.{counts[name]}"
+        else:
+            counts[name] = 0
+        names.append(name)
+    return names
+
+
+def iter_sheet_chunks(
+    path: Path,
+    sheet_name: SheetName = 0,
+    skip_rows: int = 0,
+    chunk_rows: int = SHEET_CHUNK_ROWS
+) -> Iterator["pd.DataFrame"]:
+    """
+    Stream a sheet as DataFrames of at most chunk_rows rows.
+
+    .xlsx files are read with openpyxl in read-only mode and iter_rows, so
+    only one chunk of cell values is in memory at a time however large the
+    sheet is. Blank rows are skipped. Other formats are parsed whole and
+    sliced.
+
+    Args:
+        path: Workbook path
+        sheet_name: Sheet index or name
+        skip_rows: Rows above the header row
+        chunk_rows: Rows per yielded DataFrame
+
+    Yields:
+        DataFrames with the header row as columns
+    """
+    import pandas as pd
+
+    path = Path(path)
+    if path.suffix.lower() not in (".xlsx", ".xlsm"):
+        df = pd.read_excel(path, sheet_name=sheet_name, skiprows=skip_rows)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+
+    from openpyxl import load_workbook
+
+    book = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = (
+            book.worksheets[sheet_name] if isinstance(sheet_name, int) else book[sheet_name]
+        )
+        rows = worksheet.iter_rows(min_row=skip_rows + 1, values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header_names(header)
+        width = len(columns)
+
+        batch: List[Tuple] = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            # Read-only rows can be ragged - pad or trim to the header
+            batch.append((tuple(row) + (None,) * width)[:width])
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        book.close()